@@ -0,0 +1,357 @@
+"""
+Benchmark of the graph build pipeline on synthetic repositories.
+
+A deterministic repository is generated (see `synthetic_repo.py`) and the
+following stages are timed on it: `GraphBuilder`, `JsonConverter`,
+`JsonDeconverter`, lazy `JsonDeconverter` (load and materialize ten
+components), `SnapshotConverter`, `SnapshotDeconverter`, `SqliteConverter`
+(into a new database), `SqliteDeconverter`, `ShardedConverter` (into a new
+directory), `ShardedDeconverter`, `RegExpFinder` (one pattern, and one
+lookup per module in a single call), `CodeIndexer` and a `CodeSearch`
+substring query, `DuplicateFinder` (hashing all components, and with
+cached signatures), `GraphUpdater` (after modifying a share of the files and
+staging the changes with git) and `SqliteConverter`, `ShardedConverter`,
+`JournalConverter` and `CodeIndexer` applying the update to the existing
+storage. For every stage the best wall time over `--repeat` runs and the
+throughput are recorded, as well as the peak of memory allocated during
+one more run of the stage, traced with `tracemalloc` (Python objects and
+NumPy arrays; memory that C libraries such as SQLite allocate themselves
+is not included). The peak RSS of the whole process, which only grows
+from stage to stage, is recorded once for the run.
+
+Usage:
+    python benchmarks/build_pipeline.py --files 50 --output baseline.json
+    python benchmarks/build_pipeline.py --files 50 --compare baseline.json
+"""
+import io
+import copy
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import shutil
+import tempfile
+import subprocess
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_repo import LANGUAGES, append_component, generate_repository  # noqa: E402
+from reprocess.re_container import ReContainer  # noqa: E402
+from reprocess.re_processors import (  # noqa: E402
+    CodeIndexer, CodeSearch, DuplicateFinder, GraphBuilder, GraphUpdater,
+    JsonConverter, JsonDeconverter, RegExpFinder, JournalConverter,
+    ShardedConverter, ShardedDeconverter, SnapshotConverter,
+    SnapshotDeconverter, SqliteConverter, SqliteDeconverter)
+
+REPO_NAME = "synthetic_repo"
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_kb():
+    """Returns the peak resident set size of the process so far in kilobytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def traced_peak_kb(stage_function, setup=None):
+    """
+    Runs `stage_function` once more (after `setup`, which is not traced)
+    and returns the peak of the memory allocated during it in kilobytes.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            stage_function()
+            return tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+
+
+def git(repo_path, *args):
+    subprocess.run([
+        "git", "-C", repo_path, "-c", "user.name=bench", "-c",
+        "user.email=bench@localhost", *args
+    ],
+                   capture_output=True,
+                   check=True)
+
+
+def measure(stage_function, repeat, items):
+    """Runs `stage_function` `repeat` times and keeps the fastest run."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = stage_function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, {
+        "seconds": best,
+        "items": items,
+        "items_per_second": items / best if best else None,
+        "peak_traced_kb": traced_peak_kb(stage_function)
+    }
+
+
+def measure_update(full_save, update_save, repeat, items):
+    """Times `update_save` applied on top of a fresh `full_save`, keeping the fastest run."""
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            full_save()
+            start = time.perf_counter()
+            update_save()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "seconds": best,
+        "items": items,
+        "items_per_second": items / best if best else None,
+        "peak_traced_kb": traced_peak_kb(update_save, full_save)
+    }
+
+
+def run_benchmark(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = os.path.join(temp_dir, REPO_NAME)
+        db_path = os.path.join(temp_dir, "db")
+        generation_start = time.perf_counter()
+        repo_stats = generate_repository(repo_path, args.languages, args.files,
+                                         args.components, args.call_density,
+                                         args.body_lines, args.seed)
+        repo_stats["generation_seconds"] = time.perf_counter(
+        ) - generation_start
+        git(repo_path, "init", "-q")
+        git(repo_path, "add", "-A")
+        git(repo_path, "commit", "-q", "-m", "synthetic")
+
+        container = ReContainer(REPO_NAME, repo_path, db_path)
+        built, results["GraphBuilder"] = measure(
+            lambda: GraphBuilder()(container), args.repeat,
+            repo_stats["files"])
+        components = len(built.code_components)
+        repo_stats["built_components"] = components
+
+        _, results["JsonConverter"] = measure(lambda: JsonConverter()(built),
+                                              args.repeat, components)
+        data_path = os.path.join(db_path, REPO_NAME, "data.json")
+        repo_stats["json_bytes"] = os.path.getsize(data_path)
+
+        _, results["JsonDeconverter"] = measure(
+            lambda: JsonDeconverter()(container), args.repeat, components)
+
+        def lazy_load():
+            restored = JsonDeconverter(lazy=True)(container)
+            return restored.code_components[:10]
+
+        _, results["JsonDeconverterLazy"] = measure(lazy_load, args.repeat,
+                                                    min(10, components))
+
+        _, results["SnapshotConverter"] = measure(
+            lambda: SnapshotConverter()(built), args.repeat, components)
+        snapshot_path = os.path.join(db_path, REPO_NAME, "data.snapshot")
+        repo_stats["snapshot_bytes"] = os.path.getsize(snapshot_path)
+
+        _, results["SnapshotDeconverter"] = measure(
+            lambda: SnapshotDeconverter()(container), args.repeat, components)
+
+        sqlite_path = os.path.join(db_path, REPO_NAME, "data.sqlite")
+
+        def full_sqlite_save():
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(sqlite_path + suffix):
+                    os.remove(sqlite_path + suffix)
+            return SqliteConverter()(built)
+
+        _, results["SqliteConverter"] = measure(full_sqlite_save, args.repeat,
+                                                components)
+        _, results["SqliteDeconverter"] = measure(
+            lambda: SqliteDeconverter()(container), args.repeat, components)
+
+        shards_path = os.path.join(db_path, REPO_NAME, "shards")
+
+        def full_sharded_save():
+            shutil.rmtree(shards_path, ignore_errors=True)
+            return ShardedConverter()(built)
+
+        _, results["ShardedConverter"] = measure(full_sharded_save,
+                                                 args.repeat, components)
+        _, results["ShardedDeconverter"] = measure(
+            lambda: ShardedDeconverter()(container), args.repeat, components)
+
+        _, results["RegExpFinder"] = measure(
+            lambda: RegExpFinder(r"func_\d+_0$")(built), args.repeat,
+            components)
+        lookups = [f"func_{module}_1$" for module in range(args.files)]
+        _, results["RegExpFinderLookups"] = measure(
+            lambda: RegExpFinder(lookups)(built), args.repeat, components)
+
+        code_index_path = os.path.join(db_path, REPO_NAME, "code_index.json")
+
+        def full_code_index():
+            if os.path.exists(code_index_path):
+                os.remove(code_index_path)
+            return CodeIndexer()(built)
+
+        _, results["CodeIndexer"] = measure(full_code_index, args.repeat,
+                                            components)
+        _, results["CodeSearch"] = measure(
+            lambda: CodeSearch("func_1_2(value)")(built), args.repeat,
+            components)
+
+        def cold_duplicate_finder():
+            # a shallow copy does not carry the signatures kept with `built`
+            return DuplicateFinder()(copy.copy(built))
+
+        _, results["DuplicateFinder"] = measure(cold_duplicate_finder,
+                                                args.repeat, components)
+        _, results["DuplicateFinderCached"] = measure(
+            lambda: DuplicateFinder()(built), args.repeat, components)
+
+        changed = max(1, int(args.files * args.changed_share))
+        for language in args.languages:
+            for module in range(changed):
+                append_component(repo_path, language, module, args.components,
+                                 args.body_lines)
+        git(repo_path, "add", "-A")
+        updated, results["GraphUpdater"] = measure(
+            lambda: GraphUpdater()(built), args.repeat,
+            changed * len(args.languages))
+
+        updated_files = changed * len(args.languages)
+        results["SqliteConverterUpdate"] = measure_update(
+            full_sqlite_save, lambda: SqliteConverter()(updated), args.repeat,
+            updated_files)
+        results["ShardedConverterUpdate"] = measure_update(
+            full_sharded_save, lambda: ShardedConverter()(updated),
+            args.repeat, updated_files)
+
+        journal_path = os.path.join(db_path, REPO_NAME, "journal")
+
+        def journal_base_save():
+            shutil.rmtree(journal_path, ignore_errors=True)
+            return JournalConverter(commit="base")(built)
+
+        results["JournalConverterUpdate"] = measure_update(
+            journal_base_save, lambda: JournalConverter(commit="update")
+            (updated), args.repeat, updated_files)
+        results["CodeIndexerUpdate"] = measure_update(
+            full_code_index, lambda: CodeIndexer()(updated), args.repeat,
+            updated_files)
+        repo_stats["journal_record_bytes"] = os.path.getsize(
+            os.path.join(journal_path, "journal.jsonl"))
+
+    return {
+        "config": {
+            "languages": list(args.languages),
+            "files": args.files,
+            "components": args.components,
+            "call_density": args.call_density,
+            "body_lines": args.body_lines,
+            "changed_share": args.changed_share,
+            "repeat": args.repeat,
+            "seed": args.seed
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "repository": repo_stats,
+        "results": results,
+        "process_peak_rss_kb": peak_rss_kb()
+    }
+
+
+def compare(current, baseline, threshold):
+    """
+    Compares stage times with a baseline.
+
+    Returns:
+        List[str]: Names of stages slower than the baseline by more than `threshold`.
+    """
+    if current["config"] != baseline["config"]:
+        print("Warning: benchmark configuration differs from the baseline")
+    regressions = []
+    for stage, stats in current["results"].items():
+        if stage not in baseline["results"]:
+            continue
+        old = baseline["results"][stage]["seconds"]
+        new = stats["seconds"]
+        change = (new - old) / old if old else 0.0
+        line = f"{stage:16} {old:10.4f}s -> {new:10.4f}s ({change:+.1%})"
+        if change > threshold:
+            line += "  REGRESSION"
+            regressions.append(stage)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--languages",
+                        nargs="+",
+                        default=list(LANGUAGES),
+                        choices=LANGUAGES)
+    parser.add_argument("--files",
+                        type=int,
+                        default=20,
+                        help="Files per language")
+    parser.add_argument("--components",
+                        type=int,
+                        default=5,
+                        help="Components per file")
+    parser.add_argument("--call-density",
+                        type=int,
+                        default=2,
+                        help="Calls made by every component")
+    parser.add_argument("--body-lines",
+                        type=int,
+                        default=5,
+                        help="Filler statements per component (file size)")
+    parser.add_argument("--changed-share",
+                        type=float,
+                        default=0.1,
+                        help="Share of files modified before GraphUpdater")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Save results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare with")
+    parser.add_argument("--threshold",
+                        type=float,
+                        default=0.25,
+                        help="Allowed relative slowdown before flagging")
+    args = parser.parse_args()
+
+    current = run_benchmark(args)
+    print(json.dumps(current, indent=4))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=4)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if compare(current, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of dependency graph queries on a generated graph.
+
+A random graph with `--components` nodes and `--edges` links is turned
+into a `ComponentGraph`, and the time of building it is recorded together
+with the average time of: callers of a component found by scanning all
+components (the only option without reverse edges) and with the reverse
+adjacency, a breadth-first traversal limited to `--depth` hops,
+transitive dependencies and dependents (first and memoized repeated
+queries), shortest paths and the topological levels of the condensed
+graph. Building the NumPy `LinkMatrix` and computing all centrality
+scores (degrees, PageRank and HITS) is timed as well.
+
+Usage:
+    python benchmarks/graph_queries.py --components 100000 --edges 1000000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reprocess.utils.centrality import LinkMatrix  # noqa: E402
+from reprocess.utils.graph_query import ComponentGraph  # noqa: E402
+
+
+def generate_links(components, edges, seed):
+    rng = random.Random(seed)
+    ids = [f"component_{number}" for number in range(components)]
+    links = [[] for _ in ids]
+    for _ in range(edges):
+        links[rng.randrange(components)].append(ids[rng.randrange(components)])
+    return ids, links
+
+
+def average(function, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--components", type=int, default=100000)
+    parser.add_argument("--edges", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ids, links = generate_links(args.components, args.edges, args.seed)
+    start = time.perf_counter()
+    graph = ComponentGraph(ids, links)
+    build_seconds = time.perf_counter() - start
+
+    rng = random.Random(args.seed + 1)
+    queried = rng.sample(ids, args.queries)
+    pairs = list(zip(queried, rng.sample(ids, args.queries)))
+
+    def scan_callers(component_id):
+        return [
+            ids[position] for position, linked_ids in enumerate(links)
+            if component_id in linked_ids
+        ]
+
+    results = {
+        "components":
+        len(graph),
+        "edges":
+        graph.edge_count,
+        "build_seconds":
+        build_seconds,
+        "callers_scan_seconds":
+        average(scan_callers, queried[:3]),
+        "callers_seconds":
+        average(graph.callers, queried),
+        "bfs_seconds":
+        average(
+            lambda component_id: graph.traverse([component_id],
+                                                max_depth=args.depth),
+            queried),
+        "dependencies_seconds":
+        average(graph.dependencies, queried),
+        "dependencies_repeated_seconds":
+        average(graph.dependencies, queried),
+        "dependents_seconds":
+        average(graph.dependents, queried),
+        "shortest_path_seconds":
+        average(lambda pair: graph.shortest_path(*pair), pairs)
+    }
+    start = time.perf_counter()
+    levels = graph.topological_levels()
+    results["topological_levels_seconds"] = time.perf_counter() - start
+    results["levels"] = len(levels)
+    results["groups"] = len(graph.condensation())
+
+    start = time.perf_counter()
+    matrix = LinkMatrix(ids, links)
+    results["link_matrix_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    matrix.scores()
+    results["centrality_seconds"] = time.perf_counter() - start
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
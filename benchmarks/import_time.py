@@ -0,0 +1,133 @@
+"""
+Import-time benchmark for `reprocess.re_processors`.
+
+Measures, each in a fresh interpreter:
+    - the cold import of a module (by default `reprocess.re_processors`),
+      or of an arbitrary import statement given with `--statement`;
+    - the creation of a number of synthetic `ReProcessor` subclasses,
+      which exercises the metaclass machinery.
+
+Usage:
+    python benchmarks/import_time.py --runs 10 --processors 80
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+PROCESSOR_TEMPLATE = '''
+class SyntheticProcessor{index}(ReProcessor):
+
+    def __call__(self, repository_container: ReContainer):
+        value = repository_container.attr_{previous}
+        return {{"attr_{index}": value}}
+'''
+
+PROCESSORS_SNIPPET = """
+import time
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def run_snippet(snippet: str, env: dict, extra_path: str = None) -> float:
+    """Runs `snippet` in a fresh interpreter and returns the time it prints."""
+    python_path = [REPO_ROOT]
+    if extra_path:
+        python_path.append(extra_path)
+    env = dict(env, PYTHONPATH=os.pathsep.join(python_path))
+    result = subprocess.run([sys.executable, "-c", snippet],
+                            capture_output=True,
+                            text=True,
+                            check=True,
+                            env=env)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "runs": len(samples)
+    }
+
+
+def bench_import(statement: str, runs: int, env: dict) -> dict:
+    samples = [
+        run_snippet(IMPORT_SNIPPET.format(statement=statement), env)
+        for _ in range(runs)
+    ]
+    return summarize(samples)
+
+
+def bench_processors(count: int, runs: int, env: dict) -> dict:
+    with tempfile.TemporaryDirectory() as module_dir:
+        module_name = "synthetic_processors"
+        with open(os.path.join(module_dir, f"{module_name}.py"), "w") as file:
+            file.write("from reprocess.re_processors.processor import "
+                       "ReProcessor\n")
+            file.write("from reprocess.re_container import ReContainer\n")
+            for index in range(count):
+                file.write(
+                    PROCESSOR_TEMPLATE.format(index=index,
+                                              previous=max(index - 1, 0)))
+        snippet = PROCESSORS_SNIPPET.format(module=module_name)
+        samples = [
+            run_snippet(snippet, env, extra_path=module_dir)
+            for _ in range(runs)
+        ]
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--module", default="reprocess.re_processors")
+    parser.add_argument("--statement",
+                        help="Import statement to time instead of --module")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--processors", type=int, default=80)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    statement = args.statement or f"import {args.module}"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # an isolated cache keeps results independent of earlier runs
+        env = dict(os.environ, REPROCESS_CACHE_DIR=cache_dir)
+        results = {
+            "module_import": {
+                "statement": statement,
+                **bench_import(statement, args.runs, env)
+            },
+            "processor_definitions": {
+                "count": args.processors,
+                **bench_processors(args.processors, args.runs, env)
+            },
+            "timestamp": time.time()
+        }
+
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Benchmark of `Neo4jConverter` writes against a mocked driver.
+
+No database is needed: the driver only counts transactions, statements
+and rows. It compares the former per-item transactions with the batched
+`UNWIND` writes for the graph of a synthetic repository (see
+`synthetic_repo.py`), or for a generated graph with `--components` nodes
+and `--edges` edges. `Neo4jSync` is then measured after
+`--changed-components` components were modified and one removed. An
+estimate of the wall time for a given round-trip latency is printed as
+well.
+
+Usage:
+    python benchmarks/neo4j_writes.py --components 20000 --edges 200000
+    python benchmarks/neo4j_writes.py --files 10 --latency-ms 1
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from copy import deepcopy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_repo import generate_repository  # noqa: E402
+from reprocess.code_component import CodeComponentContainer  # noqa: E402
+from reprocess.file_analyzer import FileContainer  # noqa: E402
+from reprocess.re_container import ReContainer  # noqa: E402
+from reprocess.re_processors import GraphBuilder, Neo4jConverter, Neo4jSync  # noqa: E402
+from reprocess.utils.graph_export import component_row, external_component_rows, file_row  # noqa: E402
+
+
+class CountingTransaction:
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **parameters):
+        self.driver.statements += 1
+        self.driver.rows += max([
+            len(value) for value in parameters.values() if
+            isinstance(value, list) and value and isinstance(value[0], dict)
+        ] or [1])
+
+
+class CountingSession:
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query, **parameters):
+        # auto-commit query: one round trip
+        self.driver.transactions += 1
+        CountingTransaction(self.driver).run(query, **parameters)
+        if query.startswith("MATCH (n:"):
+            label = query[len("MATCH (n:"):].split(" ", 1)[0]
+            return self.driver.stored.get(label, [])
+
+    def execute_write(self, work, *args):
+        self.driver.transactions += 1
+        return work(CountingTransaction(self.driver), *args)
+
+    write_transaction = execute_write
+
+
+class CountingDriver:
+    """Mocked Neo4j driver counting round trips instead of sending them."""
+
+    def __init__(self, previous=None):
+        # label -> records of the stored nodes
+        self.stored = {}
+        if previous:
+            for label, rows, key in (("CodeComponent",
+                                      map(component_row,
+                                          previous.code_components),
+                                      "component_id"),
+                                     ("File", map(file_row,
+                                                  previous.files), "file_id"),
+                                     ("ExternalComponent",
+                                      external_component_rows(
+                                          getattr(previous,
+                                                  "external_components",
+                                                  None)), "component_id")):
+                self.stored[label] = [{
+                    "id": row[key],
+                    "hash": row["hash"]
+                } for row in rows]
+        self.transactions = 0
+        self.statements = 0
+        self.rows = 0
+
+    def session(self, **kwargs):
+        return CountingSession(self)
+
+    def close(self):
+        pass
+
+
+def legacy_create_node(tx, label, key, node_id, properties):
+    tx.run(
+        f"MERGE (n:{label} {{{key}: $node_id}}) ON CREATE SET n += $properties",
+        node_id=node_id,
+        properties=properties)
+
+
+def legacy_create_relationship(tx, source_id, target_id, source_type,
+                               target_type, relationship_type):
+    source_property = "component_id" if source_type == "CodeComponent" else "file_id"
+    target_property = "component_id" if target_type == "CodeComponent" else "file_id"
+    tx.run(f"""
+        MATCH (a:{source_type} {{{source_property}: $source_id}})
+        MATCH (b:{target_type} {{{target_property}: $target_id}})
+        MERGE (a)-[r:{relationship_type}]->(b)
+        """,
+           source_id=source_id,
+           target_id=target_id)
+
+
+def legacy_write(converter, container):
+    """The former `Neo4jConverter.__call__`: one transaction per node and edge."""
+    with converter.driver.session(database="neo4j") as session:
+        for component in container.code_components:
+            session.write_transaction(
+                legacy_create_node, "CodeComponent", "component_id",
+                component.component_id, {
+                    "name": component.component_name,
+                    "code": component.component_code,
+                    "type": component.component_type
+                })
+        for file in container.files:
+            session.write_transaction(
+                legacy_create_node, "File", "file_id", file.file_id, {
+                    "path": file.file_path,
+                    "imports": file.imports,
+                    "called_components": file.called_components,
+                    "callable_components": file.callable_components
+                })
+        for component in container.code_components:
+            for linked_id in component.linked_component_ids:
+                session.write_transaction(legacy_create_relationship,
+                                          component.component_id, linked_id,
+                                          "CodeComponent", "CodeComponent",
+                                          "USES")
+            session.write_transaction(legacy_create_relationship,
+                                      component.file_id,
+                                      component.component_id, "File",
+                                      "CodeComponent", "INSIDE")
+
+
+def generated_container(components, edges, files, seed):
+    rng = random.Random(seed)
+    container = ReContainer("generated", "", "")
+    ids = [f"component-{index}" for index in range(components)]
+    links = [[] for _ in range(components)]
+    for _ in range(edges):
+        links[rng.randrange(components)].append(ids[rng.randrange(components)])
+    container.code_components = [
+        CodeComponentContainer(ids[index], f"module.func_{index}", "pass",
+                               links[index], f"file-{index % files}", [], [],
+                               "function") for index in range(components)
+    ]
+    container.files = [
+        FileContainer(f"file-{index}", f"module_{index}.py", [], [], [], "")
+        for index in range(files)
+    ]
+    return container
+
+
+def synthetic_container(files):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = os.path.join(temp_dir, "synthetic_repo")
+        generate_repository(repo_path, files=files)
+        return GraphBuilder()(ReContainer("synthetic_repo", repo_path,
+                                          os.path.join(temp_dir, "db")))
+
+
+def run(write,
+        container,
+        batch_size,
+        latency,
+        processor=Neo4jConverter,
+        previous=None):
+    converter = processor(None, None, None, batch_size=batch_size)
+    converter.driver = CountingDriver(previous)
+    start = time.perf_counter()
+    write(converter, container)
+    elapsed = time.perf_counter() - start
+    driver = converter.driver
+    return {
+        "transactions": driver.transactions,
+        "statements": driver.statements,
+        "rows": driver.rows,
+        "client_seconds": elapsed,
+        "estimated_seconds": elapsed + driver.transactions * latency
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--files",
+                        type=int,
+                        help="Files per language of a synthetic repository "
+                        "(built with GraphBuilder)")
+    parser.add_argument("--components", type=int, default=20000)
+    parser.add_argument("--edges", type=int, default=200000)
+    parser.add_argument("--graph-files", type=int, default=1000)
+    parser.add_argument("--changed-components",
+                        type=int,
+                        default=30,
+                        help="Components modified before synchronization")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--latency-ms",
+                        type=float,
+                        default=1.0,
+                        help="Assumed round-trip latency of a transaction")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.files:
+        container = synthetic_container(args.files)
+    else:
+        container = generated_container(args.components, args.edges,
+                                        args.graph_files, args.seed)
+    latency = args.latency_ms / 1000
+    updated = deepcopy(container)
+    updated.code_components.pop()
+    for component in updated.code_components[:args.changed_components]:
+        component.component_code += "\n"
+    results = {
+        "components":
+        len(container.code_components),
+        "edges":
+        sum(
+            len(component.linked_component_ids)
+            for component in container.code_components),
+        "per_item":
+        run(legacy_write, container, args.batch_size, latency),
+        "batched":
+        run(lambda converter, container: converter(container), container,
+            args.batch_size, latency),
+        "sync":
+        run(lambda converter, container: converter(container),
+            updated,
+            args.batch_size,
+            latency,
+            processor=Neo4jSync,
+            previous=container)
+    }
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Deterministic generator of synthetic repositories for benchmarks.
+
+Every supported language gets its own directory with `files` modules, each
+defining `components` functions. Every function performs `call_density`
+calls to other generated functions (in the same file or, through the
+language's import mechanism, in other files of the same language) and has
+`body_lines` filler statements, which controls the file size.
+The same arguments and seed always produce byte-identical repositories.
+"""
+import os
+import random
+from typing import Dict, List, Sequence, Tuple
+
+LANGUAGES = ("python", "c", "cpp", "java", "go", "javascript", "typescript")
+
+EXTENSIONS = {
+    "python": ".py",
+    "c": ".c",
+    "cpp": ".cpp",
+    "java": ".java",
+    "go": ".go",
+    "javascript": ".js",
+    "typescript": ".ts"
+}
+
+# (callee module index, callee component index)
+Call = Tuple[int, int]
+
+
+def module_name(language: str, module: int) -> str:
+    if language == "java":
+        return f"Mod{module}"
+    return f"mod_{module}"
+
+
+def function_name(language: str, module: int, component: int) -> str:
+    if language == "go":
+        return f"Func_{module}_{component}"
+    return f"func_{module}_{component}"
+
+
+def render_python(module: int, calls: List[List[Call]],
+                  body_lines: int) -> str:
+    imports = sorted({(m, c)
+                      for component_calls in calls
+                      for m, c in component_calls if m != module})
+    lines = [
+        f"from python_pkg.mod_{m} import {function_name('python', m, c)}"
+        for m, c in imports
+    ]
+    for component, component_calls in enumerate(calls):
+        lines += [
+            "", "", f"def {function_name('python', module, component)}(x):"
+        ]
+        lines.append("    value = x")
+        lines += [f"    value = value + {i}" for i in range(body_lines)]
+        lines += [
+            f"    value = value + {function_name('python', m, c)}(value)"
+            for m, c in component_calls
+        ]
+        lines.append("    return value")
+    return "\n".join(lines) + "\n"
+
+
+def render_c_like(language: str, module: int, calls: List[List[Call]],
+                  body_lines: int) -> str:
+    # CppFileParser cannot resolve calls to names it saw in declarations,
+    # so prototypes of functions from other files are emitted for C only
+    prototypes = sorted({(m, c)
+                         for component_calls in calls
+                         for m, c in component_calls
+                         if m != module}) if language == "c" else []
+    lines = [
+        f"int {function_name(language, m, c)}(int x);" for m, c in prototypes
+    ]
+    for component, component_calls in enumerate(calls):
+        lines += [
+            "", f"int {function_name(language, module, component)}(int x) {{"
+        ]
+        lines.append("    int value = x;")
+        lines += [f"    value = value + {i};" for i in range(body_lines)]
+        lines += [
+            f"    value = value + {function_name(language, m, c)}(value);"
+            for m, c in component_calls
+        ]
+        lines += ["    return value;", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def render_java(module: int, calls: List[List[Call]], body_lines: int) -> str:
+    lines = ["package java_pkg;", "", f"public class Mod{module} {{"]
+    for component, component_calls in enumerate(calls):
+        lines += [
+            "",
+            f"    public static int {function_name('java', module, component)}(int x) {{"
+        ]
+        lines.append("        int value = x;")
+        lines += [f"        value = value + {i};" for i in range(body_lines)]
+        lines += [
+            f"        value = value + Mod{m}.{function_name('java', m, c)}(value);"
+            for m, c in component_calls
+        ]
+        lines += ["        return value;", "    }"]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def render_go(module: int, calls: List[List[Call]], body_lines: int) -> str:
+    lines = ["package go_pkg"]
+    for component, component_calls in enumerate(calls):
+        lines += [
+            "", f"func {function_name('go', module, component)}(x int) int {{"
+        ]
+        lines.append("\tvalue := x")
+        lines += [f"\tvalue = value + {i}" for i in range(body_lines)]
+        lines += [
+            f"\tvalue = value + {function_name('go', m, c)}(value)"
+            for m, c in component_calls
+        ]
+        lines += ["\treturn value", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def render_js_like(language: str, module: int, calls: List[List[Call]],
+                   body_lines: int) -> str:
+    typed = language == "typescript"
+    extension = EXTENSIONS[language]
+    imports = {}
+    for component_calls in calls:
+        for m, c in component_calls:
+            if m != module:
+                imports.setdefault(m, set()).add(function_name(language, m, c))
+    lines = [
+        f"import {{ {', '.join(sorted(names))} }} from './mod_{m}{extension}';"
+        for m, names in sorted(imports.items())
+    ]
+    signature = "(x: number): number" if typed else "(x)"
+    for component, component_calls in enumerate(calls):
+        lines += [
+            "",
+            f"export function {function_name(language, module, component)}{signature} {{"
+        ]
+        lines.append("    let value = x;")
+        lines += [f"    value = value + {i};" for i in range(body_lines)]
+        lines += [
+            f"    value = value + {function_name(language, m, c)}(value);"
+            for m, c in component_calls
+        ]
+        lines += ["    return value;", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def render_file(language: str, module: int, calls: List[List[Call]],
+                body_lines: int) -> str:
+    if language == "python":
+        return render_python(module, calls, body_lines)
+    if language in ("c", "cpp"):
+        return render_c_like(language, module, calls, body_lines)
+    if language == "java":
+        return render_java(module, calls, body_lines)
+    if language == "go":
+        return render_go(module, calls, body_lines)
+    return render_js_like(language, module, calls, body_lines)
+
+
+def language_directory(language: str) -> str:
+    return f"{language}_pkg"
+
+
+def generate_calls(rng: random.Random, files: int, components: int,
+                   call_density: int) -> List[List[List[Call]]]:
+    """Chooses `call_density` callees for every component of every module."""
+    return [[[(rng.randrange(files), rng.randrange(components))
+              for _ in range(call_density)] for _ in range(components)]
+            for _ in range(files)]
+
+
+def generate_repository(repo_path: str,
+                        languages: Sequence[str] = LANGUAGES,
+                        files: int = 10,
+                        components: int = 5,
+                        call_density: int = 2,
+                        body_lines: int = 5,
+                        seed: int = 0) -> Dict[str, int]:
+    """
+    Writes a synthetic repository to `repo_path`.
+
+    Args:
+        repo_path (str): Directory of the repository; created if absent.
+        languages (Sequence[str]): Languages to generate, a subset of `LANGUAGES`.
+        files (int): Number of files per language.
+        components (int): Number of functions per file.
+        call_density (int): Number of calls made by every function.
+        body_lines (int): Number of filler statements in every function.
+        seed (int): Seed of the random call graph.
+
+    Returns:
+        Dict[str, int]: Numbers of generated files, components and bytes.
+    """
+    stats = {"files": 0, "components": 0, "bytes": 0}
+    for language in languages:
+        if language not in EXTENSIONS:
+            raise ValueError(f"Unsupported language: {language}")
+        # every language gets its own stream so subsets stay comparable
+        rng = random.Random(f"{seed}-{language}")
+        directory = os.path.join(repo_path, language_directory(language))
+        os.makedirs(directory, exist_ok=True)
+        all_calls = generate_calls(rng, files, components, call_density)
+        for module, calls in enumerate(all_calls):
+            code = render_file(language, module, calls, body_lines)
+            path = os.path.join(
+                directory,
+                module_name(language, module) + EXTENSIONS[language])
+            with open(path, "w") as file:
+                file.write(code)
+            stats["files"] += 1
+            stats["components"] += components
+            stats["bytes"] += len(code.encode("utf-8"))
+    return stats
+
+
+def append_component(repo_path: str, language: str, module: int,
+                     component: int, body_lines: int) -> str:
+    """
+    Appends a new function to an existing generated file to simulate a change.
+
+    Returns:
+        str: Path of the modified file relative to `repo_path`.
+    """
+    relative_path = os.path.join(
+        language_directory(language),
+        module_name(language, module) + EXTENSIONS[language])
+    calls = [[] for _ in range(component)] + [[(module, 0)]]
+    code = render_file(language, module, calls, body_lines)
+    # only the rendered last function is appended
+    marker = {
+        "python": "\n\ndef ",
+        "java": "\n    public static ",
+        "go": "\nfunc ",
+        "javascript": "\nexport function ",
+        "typescript": "\nexport function "
+    }.get(language, "\nint ")
+    new_function = code[code.rindex(marker):]
+    path = os.path.join(repo_path, relative_path)
+    if language == "java":
+        # the method has to go inside the class body
+        with open(path) as file:
+            content = file.read().rstrip()
+        new_method = new_function.rstrip()[:-1].rstrip()
+        content = content[:-1].rstrip() + "\n" + new_method + "\n}\n"
+        with open(path, "w") as file:
+            file.write(content)
+    else:
+        with open(path, "a") as file:
+            file.write(new_function)
+    return relative_path
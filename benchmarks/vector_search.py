@@ -0,0 +1,86 @@
+"""
+Benchmark of the vector index on generated components.
+
+`--components` random snippets are embedded with `HashingVectorizer`, and
+the time of embedding them and of training the IVF quantizer is recorded
+together with the average time of a query scored exactly (batched matrix
+products over all rows) and through the quantizer, and the recall of the
+quantizer's top `--k` against the exact one.
+
+Usage:
+    python benchmarks/vector_search.py --components 100000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reprocess.utils.vector_index import VectorIndex  # noqa: E402
+
+
+def generate_components(count, seed):
+    rng = random.Random(seed)
+    words = [f"name{number}" for number in range(5000)]
+    return [
+        SimpleNamespace(component_id=f"component_{number}",
+                        component_code=" ".join(
+                            rng.choice(words) for _ in range(40)))
+        for number in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--components", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    components = generate_components(args.components, args.seed)
+    index = VectorIndex()
+    start = time.perf_counter()
+    index.update(components)
+    results = {
+        "components": len(index),
+        "embed_seconds": time.perf_counter() - start
+    }
+    start = time.perf_counter()
+    index.train()
+    results["train_seconds"] = time.perf_counter() - start
+    results["lists"] = len(index.centroids)
+
+    rng = random.Random(args.seed + 1)
+    queries = [
+        component.component_code
+        for component in rng.sample(components, args.queries)
+    ]
+    timings = {}
+    found = {}
+    for name, nprobe in (("exact", None), ("ivf", args.nprobe)):
+        start = time.perf_counter()
+        found[name] = [
+            index.search([query], args.k, nprobe)[0] for query in queries
+        ]
+        timings[name] = (time.perf_counter() - start) / len(queries)
+    results["exact_query_seconds"] = timings["exact"]
+    results["ivf_query_seconds"] = timings["ivf"]
+    results["ivf_recall"] = sum(
+        len({component_id
+             for component_id, _ in exact}
+            & {component_id
+               for component_id, _ in approximate})
+        for exact, approximate in zip(found["exact"], found["ivf"])) / (
+            args.k * len(queries))
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from reprocess.parsers.tree_sitter_parser import TreeSitterFileParser, TreeSitterComponentFillerHelper
+from reprocess.parsers.tree_sitter_parser import TreeSitterFileParser, TreeSitterComponentFillerHelper, extract_chunk_signature
 from typing import List
 import tree_sitter_c as tsc
 from tree_sitter import Language, Parser
@@ -16,6 +16,11 @@ CHUNK_QUERY = """
 """.strip()
 
 
+def extract_code_signature(code: str) -> str:
+    """Returns the code with only the first line of every definition in it."""
+    return extract_chunk_signature(Language(tsc.language()), CHUNK_QUERY, code)
+
+
 class CFileParser(TreeSitterFileParser):
     """
     Concrete implementation of TreeSitterFileParser for parsing C files.
@@ -398,31 +403,4 @@ class CComponentFillerHelper(TreeSitterComponentFillerHelper):
         return ""
 
     def extract_signature(self):
-        C_LANGUAGE = Language(tsc.language())
-        parser = Parser(C_LANGUAGE)
-        query = C_LANGUAGE.query(CHUNK_QUERY)
-        tree = parser.parse(bytes(self.component_code, encoding="UTF-8"))
-
-        processed_lines = set()
-        source_lines = self.component_code.splitlines()
-        simplified_lines = source_lines[:]
-
-        captured = query.captures(tree.root_node)
-
-        for name in captured:
-            for node in captured[name]:
-                start_line = node.start_point[0]
-                end_line = node.end_point[0]
-
-                lines = list(range(start_line, end_line + 1))
-                if any(line in processed_lines for line in lines):
-                    continue
-
-                simplified_lines[start_line] = source_lines[start_line]
-
-                for line_num in range(start_line + 1, end_line + 1):
-                    simplified_lines[line_num] = None  # type: ignore
-
-                processed_lines.update(lines)
-
-        return "\n".join(line for line in simplified_lines if line is not None)
+        return extract_code_signature(self.component_code)
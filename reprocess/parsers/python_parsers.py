@@ -5,6 +5,26 @@ import uuid
 from typing import List, Tuple
 
 
+def extract_code_signature(code: str) -> str:
+    """Returns the code with the bodies of its functions and classes removed."""
+    tree = ast.parse(code)
+    source_lines = code.splitlines()
+    simplified_lines = source_lines[:]
+
+    indices_to_del: List[Tuple[int, int]] = []
+    for node in ast.iter_child_nodes(tree):
+        if isinstance(node,
+                      (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start, end = node.lineno - 1, node.end_lineno
+            assert isinstance(end, int)
+            indices_to_del.append((start + 1, end))
+
+    for start, end in reversed(indices_to_del):
+        del simplified_lines[start + 0:end]
+
+    return "\n".join(simplified_lines)
+
+
 class PythonFileParser(TreeSitterFileParser):
     """
     Parses Python files using the Python standard library's ast module.
@@ -412,20 +432,4 @@ class PythonComponentFillerHelper(TreeSitterComponentFillerHelper):
         return resulted_array
 
     def extract_signature(self):
-        tree = ast.parse(self.component_code)
-        source_lines = self.component_code.splitlines()
-        simplified_lines = source_lines[:]
-
-        indices_to_del: List[Tuple[int, int]] = []
-        for node in ast.iter_child_nodes(tree):
-            if isinstance(
-                    node,
-                (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-                start, end = node.lineno - 1, node.end_lineno
-                assert isinstance(end, int)
-                indices_to_del.append((start + 1, end))
-
-        for start, end in reversed(indices_to_del):
-            del simplified_lines[start + 0:end]
-
-        return "\n".join(simplified_lines)
+        return extract_code_signature(self.component_code)
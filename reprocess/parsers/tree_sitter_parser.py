@@ -1,5 +1,41 @@
 from abc import ABC, abstractmethod
 import uuid
+from tree_sitter import Language, Parser
+
+
+def extract_chunk_signature(language: Language, chunk_query: str,
+                            code: str) -> str:
+    """
+    Keeps the first line of every chunk (function, class, ...) captured by
+    `chunk_query` and drops the other lines of the chunk.
+    """
+    parser = Parser(language)
+    query = language.query(chunk_query)
+    tree = parser.parse(bytes(code, encoding="UTF-8"))
+
+    processed_lines = set()
+    source_lines = code.splitlines()
+    simplified_lines = source_lines[:]
+
+    captured = query.captures(tree.root_node)
+
+    for name in captured:
+        for node in captured[name]:
+            start_line = node.start_point[0]
+            end_line = node.end_point[0]
+
+            lines = list(range(start_line, end_line + 1))
+            if any(line in processed_lines for line in lines):
+                continue
+
+            simplified_lines[start_line] = source_lines[start_line]
+
+            for line_num in range(start_line + 1, end_line + 1):
+                simplified_lines[line_num] = None  # type: ignore
+
+            processed_lines.update(lines)
+
+    return "\n".join(line for line in simplified_lines if line is not None)
 
 
 class TreeSitterFileParser(ABC):
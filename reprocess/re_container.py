@@ -1,7 +1,13 @@
 import os
+import copy
+from typing import Any, Callable, Optional, Sequence
+from reprocess.utils.lookup_index import DerivedValue, LookupIndex
 
 
 class ReContainer:
+    # lookup indexes and derived values are kept in a slot, out of `vars()`,
+    # so they are neither compared nor saved with the repository's data
+    __slots__ = ("__dict__", "_lookup_indexes")
 
     def __init__(self, repo_name: str, repo_path: str, db_path: str) -> None:
         self.repo_name = repo_name
@@ -25,3 +31,124 @@ class ReContainer:
             return True
         else:
             return False
+
+    def __setattr__(self, name, value) -> None:
+        super().__setattr__(name, value)
+        self._drop_lookup_indexes(name)
+
+    def __delattr__(self, name) -> None:
+        super().__delattr__(name)
+        self._drop_lookup_indexes(name)
+
+    def __getstate__(self):
+        # copies and pickles rebuild their indexes when needed
+        return dict(vars(self))
+
+    def __setstate__(self, state) -> None:
+        vars(self).update(state)
+
+    def __deepcopy__(self, memo):
+        copied = self.__class__.__new__(self.__class__)
+        memo[id(self)] = copied
+        copied.__setstate__(copy.deepcopy(self.__getstate__(), memo))
+        # indexes of lists copied along are valid for the copies, so the
+        # copies processors work on do not rebuild them
+        indexes = getattr(self, "_lookup_indexes", None)
+        if indexes:
+            attributes = vars(self)
+            copied._lookup_indexes = {
+                index_key: index.rebound(memo[id(attributes[index_key[0]])])
+                for index_key, index in indexes.items()
+                if index_key[0] in attributes
+                and index.is_valid_for(attributes[index_key[0]])
+                and id(attributes[index_key[0]]) in memo
+            }
+        return copied
+
+    def _drop_lookup_indexes(self, attribute: str) -> None:
+        indexes = getattr(self, "_lookup_indexes", None)
+        if indexes:
+            for index_key in [
+                    index_key for index_key in indexes
+                    if index_key[0] == attribute
+            ]:
+                del indexes[index_key]
+
+    def _indexes(self) -> dict:
+        try:
+            return self._lookup_indexes
+        except AttributeError:
+            self._lookup_indexes = {}
+            return self._lookup_indexes
+
+    def lookup(self, attribute: str, key: str, value) -> list:
+        """
+        Returns the elements of a list attribute whose `key` equals `value`.
+
+        The index of the key is built on the first lookup and reused until
+        the attribute is replaced (e.g. by a processor) or its length
+        changes, so further lookups take constant time instead of scanning
+        the list. Deep copies of the container get the index as well.
+
+        :param attribute: The list attribute, e.g. `code_components` or `files`.
+        :param key: A field of the elements (e.g. `component_id`, `component_name`,
+            `file_id`, `file_path`) or `short_name`, the last part of `component_name`.
+        """
+        elements = getattr(self, attribute)
+        indexes = self._indexes()
+        index = indexes.get((attribute, key))
+        if index is None or not index.is_valid_for(elements):
+            index = indexes[(attribute, key)] = LookupIndex(elements, key)
+        return index.get(value)
+
+    def derived(self, attribute: str, name: str, build: Callable[[Sequence],
+                                                                 Any]):
+        """
+        Returns a value built from a list attribute, e.g. the dependency
+        graph of `code_components`.
+
+        `build(elements)` is called on the first request of `name`, and the
+        value is kept like a lookup index: until the attribute is replaced
+        or its length changes, and in deep copies of the container.
+        """
+        elements = getattr(self, attribute)
+        indexes = self._indexes()
+        derived = indexes.get((attribute, "derived", name))
+        if derived is None or not derived.is_valid_for(elements):
+            derived = indexes[(attribute, "derived",
+                               name)] = DerivedValue(elements, build)
+        return derived.value
+
+    def get_component(self, component_id: str):
+        """Returns the component with the given id, or None."""
+        found = self.lookup("code_components", "component_id", component_id)
+        return found[0] if found else None
+
+    def get_file(self,
+                 file_id: Optional[str] = None,
+                 file_path: Optional[str] = None):
+        """Returns the file with the given id or path (relative to the repository), or None."""
+        if file_id is not None:
+            found = self.lookup("files", "file_id", file_id)
+        else:
+            found = self.lookup("files", "file_path", file_path)
+        return found[0] if found else None
+
+    def components_by_name(self, name: str, short: bool = False) -> list:
+        """
+        Returns the components with the given qualified name (e.g.
+        `module.Class.method`), or the given short name (`method`) if `short`.
+        """
+        return self.lookup("code_components",
+                           "short_name" if short else "component_name", name)
+
+    def components_in_file(self,
+                           file_id: Optional[str] = None,
+                           file_path: Optional[str] = None) -> list:
+        """Returns the components of the file with the given id or path."""
+        if file_id is None:
+            code_file = self.get_file(file_path=file_path)
+            if code_file is None:
+                return []
+            file_id = code_file.file_id
+        return self.lookup("code_components", "file_id", file_id)
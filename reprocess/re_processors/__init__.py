@@ -1,18 +1,90 @@
-from .graph_builder import GraphBuilder
-from .graph_updater import GraphUpdater
-from .json_converter import JsonConverter
-from .json_deconverter import JsonDeconverter
-from .compose import Compose
-from .regexp_finder import RegExpFinder
-from .clone_repository import CloneRepository
-from .neo4j_converter import Neo4jConverter
+import importlib
+from typing import TYPE_CHECKING
 
-if __file__ == "__main__":
-    GraphBuilder()
-    GraphUpdater()
-    JsonConverter()
-    JsonDeconverter
-    Compose([])
-    CloneRepository("")
-    RegExpFinder(".a")
-    Neo4jConverter("", "", "", "")
\ No newline at end of file
+# Processors are exported lazily: importing the package must not pull in
+# heavy optional dependencies (neo4j, tree-sitter grammars, ...) that only
+# some processors need. Each name is resolved on first attribute access.
+_LAZY_EXPORTS = {
+    "GraphBuilder": ".graph_builder",
+    "GraphUpdater": ".graph_updater",
+    "JsonConverter": ".json_converter",
+    "JsonDeconverter": ".json_deconverter",
+    "Compose": ".compose",
+    "RegExpFinder": ".regexp_finder",
+    "CloneRepository": ".clone_repository",
+    "Neo4jConverter": ".neo4j_converter",
+    "Neo4jSync": ".neo4j_sync",
+    "SnapshotConverter": ".snapshot_converter",
+    "SnapshotDeconverter": ".snapshot_deconverter",
+    "SqliteConverter": ".sqlite_converter",
+    "SqliteDeconverter": ".sqlite_deconverter",
+    "ShardedConverter": ".sharded_converter",
+    "ShardedDeconverter": ".sharded_deconverter",
+    "JournalConverter": ".journal_converter",
+    "JournalDeconverter": ".journal_deconverter",
+    "GraphExporter": ".graph_exporter",
+    "CodeIndexer": ".code_indexer",
+    "CodeSearch": ".code_search",
+    "DependencyFinder": ".dependency_finder",
+    "ImpactAnalyzer": ".impact_analyzer",
+    "TopologicalScheduler": ".topological_scheduler",
+    "CentralityRanker": ".centrality_ranker",
+    "ContextBuilder": ".context_builder",
+    "DuplicateFinder": ".duplicate_finder",
+    "VectorIndexer": ".vector_indexer",
+    "VectorSearch": ".vector_search",
+}
+
+__all__ = [
+    "GraphBuilder", "GraphUpdater", "JsonConverter", "JsonDeconverter",
+    "Compose", "RegExpFinder", "CloneRepository", "Neo4jConverter",
+    "Neo4jSync", "SnapshotConverter", "SnapshotDeconverter", "SqliteConverter",
+    "SqliteDeconverter", "ShardedConverter", "ShardedDeconverter",
+    "JournalConverter", "JournalDeconverter", "GraphExporter", "CodeIndexer",
+    "CodeSearch", "DependencyFinder", "ImpactAnalyzer", "TopologicalScheduler",
+    "CentralityRanker", "ContextBuilder", "DuplicateFinder", "VectorIndexer",
+    "VectorSearch"
+]
+
+if TYPE_CHECKING:
+    from .graph_builder import GraphBuilder
+    from .graph_updater import GraphUpdater
+    from .json_converter import JsonConverter
+    from .json_deconverter import JsonDeconverter
+    from .compose import Compose
+    from .regexp_finder import RegExpFinder
+    from .clone_repository import CloneRepository
+    from .neo4j_converter import Neo4jConverter
+    from .neo4j_sync import Neo4jSync
+    from .snapshot_converter import SnapshotConverter
+    from .snapshot_deconverter import SnapshotDeconverter
+    from .sqlite_converter import SqliteConverter
+    from .sqlite_deconverter import SqliteDeconverter
+    from .sharded_converter import ShardedConverter
+    from .sharded_deconverter import ShardedDeconverter
+    from .journal_converter import JournalConverter
+    from .journal_deconverter import JournalDeconverter
+    from .graph_exporter import GraphExporter
+    from .code_indexer import CodeIndexer
+    from .code_search import CodeSearch
+    from .dependency_finder import DependencyFinder
+    from .impact_analyzer import ImpactAnalyzer
+    from .topological_scheduler import TopologicalScheduler
+    from .centrality_ranker import CentralityRanker
+    from .context_builder import ContextBuilder
+    from .duplicate_finder import DuplicateFinder
+    from .vector_indexer import VectorIndexer
+    from .vector_search import VectorSearch
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
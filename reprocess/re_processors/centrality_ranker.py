@@ -0,0 +1,50 @@
+from typing import Sequence
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.centrality import METRICS, LinkMatrix
+
+
+class CentralityRanker(ReProcessor):
+    """
+    A class that scores how central the components of the graph are.
+
+    The links are turned into NumPy arrays (see
+    `reprocess.utils.centrality.LinkMatrix`) and in and out degree, PageRank
+    and HITS hub and authority scores are computed with vectorized power
+    iteration. The container gets `centrality`: a dictionary of the scores
+    of every component id by metric, which converters persist with the
+    rest of the container.
+    """
+
+    def __init__(self,
+                 metrics: Sequence[str] = METRICS,
+                 damping: float = 0.85,
+                 **kwargs):
+        """
+        :param metrics: Metrics to compute, a subset of `METRICS`.
+        :param damping: Damping factor of PageRank.
+        """
+        unknown = set(metrics) - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown centrality metrics: {sorted(unknown)}")
+        self.metrics = list(metrics)
+        self.damping = damping
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Computes the centrality scores of the container's components.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        matrix = LinkMatrix.from_components(
+            repository_container.code_components)
+        scores = matrix.scores(self.metrics, damping=self.damping)
+
+        return {
+            "centrality": {
+                metric: dict(zip(matrix.ids, values.tolist()))
+                for metric, values in scores.items()
+            }
+        }
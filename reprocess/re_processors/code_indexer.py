@@ -0,0 +1,42 @@
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.code_index import CodeIndex, get_code_index_path
+
+
+class CodeIndexer(ReProcessor):
+    """
+    A class that maintains a persisted trigram index of the components' code.
+
+    The index is saved to `<db_path>/<repo_name>/code_index.json` and is
+    used by `CodeSearch`. When an index already exists it is updated in
+    place: after `GraphUpdater` only the components of the changed files
+    are added, and removed components are dropped. The update is appended
+    to `code_index.delta.jsonl` instead of rewriting the index, which is
+    written as a whole again when it is compacted.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, **kwargs):
+        """
+        :param index_path: Path of the index; by default `<db_path>/<repo_name>/code_index.json`.
+        """
+        self.index_path = index_path
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Builds or updates the code index of the container and saves it.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        index_path = self.index_path or get_code_index_path(
+            repository_container.db_path, repository_container.repo_name)
+        index = CodeIndex.load(index_path) or CodeIndex()
+        stats = index.update(repository_container.code_components)
+        index.save(index_path)
+        print(f"The code index was saved to {index_path} "
+              f"({stats['added']} components indexed, "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged).")
+
+        return {"is_code_indexed": True}
@@ -0,0 +1,49 @@
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.code_index import CodeIndex, get_code_index_path, load_code_index
+
+
+class CodeSearch(ReProcessor):
+    """
+    Finds components whose code contains a string or matches a regular expression.
+
+    Candidates are taken from the trigram index written by `CodeIndexer`
+    and only they are checked against the code, so with a lazily loaded
+    container (`JsonDeconverter(lazy=True)`) only the candidates are
+    materialized. Without a saved index one is built in memory. Like
+    `RegExpFinder`, the found components are saved in the container under
+    the query.
+    """
+
+    def __init__(self,
+                 query: str,
+                 regex: bool = False,
+                 index_path: Optional[str] = None,
+                 **kwargs):
+        """
+        :param query: The searched substring, or a regular expression if `regex` is set.
+        :param regex: Whether `query` is a regular expression.
+        :param index_path: Path of the index; by default `<db_path>/<repo_name>/code_index.json`.
+        """
+        self.query = query
+        self.regex = regex
+        self.index_path = index_path
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Searches the code of the container's components.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        components = repository_container.code_components
+        index_path = self.index_path or get_code_index_path(
+            repository_container.db_path, repository_container.repo_name)
+        index = load_code_index(index_path)
+        if index is None:
+            index = CodeIndex()
+            index.update(components)
+
+        return {self.query: index.search(components, self.query, self.regex)}
@@ -1,18 +1,32 @@
 from reprocess.re_processors.processor import ReProcessor, AsyncReProcessor
 from reprocess.re_container import ReContainer
-from typing import List, Union
+from reprocess.utils.profiling import ProcessorProfiler
+from typing import List, Optional, Union
 
 
 class Compose:
 
-    def __init__(self, processor_list: List[Union[ReProcessor,
-                                                  AsyncReProcessor]],
+    def __init__(self,
+                 processor_list: List[Union[ReProcessor, AsyncReProcessor]],
+                 profiler: Optional[ProcessorProfiler] = None,
                  **kwargs):
+        """
+        :param processor_list: Processors applied to the container in order.
+        :param profiler: If given, every processor run by the composition is
+            profiled; see `ProcessorProfiler` for the recorded events.
+        """
         self.processor_list = processor_list
+        self.profiler = profiler
 
     def __call__(self, repository_container: ReContainer):
 
-        for processor in self.processor_list:
-            repository_container = processor(repository_container)
+        if self.profiler is None:
+            for processor in self.processor_list:
+                repository_container = processor(repository_container)
+            return repository_container
+
+        with self.profiler:
+            for processor in self.processor_list:
+                repository_container = processor(repository_container)
 
         return repository_container
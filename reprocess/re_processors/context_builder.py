@@ -0,0 +1,74 @@
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.context_builder import ContextAssembler
+from reprocess.utils.graph_query import get_component_graph
+
+
+class ContextBuilder(ReProcessor):
+    """
+    A class that assembles the code a component needs as context, within a token budget.
+
+    The component's code comes first, followed by its dependencies ordered
+    by distance in the dependency graph and then by rank: PageRank from
+    `CentralityRanker` when the container has `centrality`, the number of
+    callers otherwise. Nearby dependencies are included with their code,
+    farther ones with their signature only, and shared import lines are
+    written once (see `reprocess.utils.context_builder.ContextAssembler`).
+    The assembler, with the token counts it caches per component, is kept
+    with the container (see `ReContainer.derived`), so repeated queries
+    against the same components only walk the graph.
+
+    The container gets `dependency_context`: the assembled `text`, its
+    `tokens` and the `included` and `omitted` components.
+    """
+
+    def __init__(self,
+                 component_id: str,
+                 token_budget: int = 4000,
+                 max_depth: Optional[int] = None,
+                 full_code_depth: int = 1,
+                 **kwargs):
+        """
+        :param component_id: Id of the component to build the context for.
+        :param token_budget: Maximal number of tokens of the context.
+        :param max_depth: Maximal number of hops to dependencies; None means unlimited.
+        :param full_code_depth: Dependencies up to this many hops away get their full code.
+        """
+        self.component_id = component_id
+        self.token_budget = token_budget
+        self.max_depth = max_depth
+        self.full_code_depth = full_code_depth
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Builds the dependency context of the component.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        centrality = getattr(repository_container, "centrality", None) or {}
+
+        def build_assembler(components):
+            # `files` is replaced together with `code_components` by the
+            # processors building the graph
+            file_paths = {
+                file.file_id: file.file_path
+                for file in repository_container.files
+            }
+            return ContextAssembler(
+                components,
+                file_paths,
+                graph=get_component_graph(repository_container))
+
+        assembler = repository_container.derived("code_components",
+                                                 "context_assembler",
+                                                 build_assembler)
+        context = assembler.assemble(self.component_id,
+                                     self.token_budget,
+                                     self.max_depth,
+                                     self.full_code_depth,
+                                     ranks=centrality.get("pagerank"))
+
+        return {"dependency_context": context}
@@ -0,0 +1,55 @@
+from typing import Iterable, Optional, Union
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.graph_query import get_component_graph
+
+
+class DependencyFinder(ReProcessor):
+    """
+    Finds components that the given components transitively depend on, or
+    that depend on them.
+
+    The dependency graph is built with precomputed reverse edges (see
+    `reprocess.utils.graph_query.ComponentGraph`), so callers are found
+    without scanning all components for every hop. The found components are
+    saved in the container as `dependencies` or `dependents`, nearest first.
+    """
+
+    def __init__(self,
+                 component_ids: Union[str, Iterable[str]],
+                 direction: str = "dependencies",
+                 max_depth: Optional[int] = None,
+                 **kwargs):
+        """
+        :param component_ids: Id (or ids) of the start components.
+        :param direction: "dependencies" (what they use) or "dependents" (what uses them).
+        :param max_depth: Maximal number of hops; None means unlimited.
+        """
+        if direction not in ("dependencies", "dependents"):
+            raise ValueError(f"Unknown direction: {direction}")
+        self.component_ids = [component_ids] if isinstance(
+            component_ids, str) else list(component_ids)
+        self.direction = direction
+        self.max_depth = max_depth
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Collects the dependencies or dependents of the start components.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        components = repository_container.code_components
+        graph = get_component_graph(repository_container)
+        found = graph.traverse(
+            self.component_ids,
+            "out" if self.direction == "dependencies" else "in",
+            self.max_depth)
+
+        return {
+            self.direction: [
+                components[graph.positions[component_id]]
+                for component_id, _ in found
+            ]
+        }
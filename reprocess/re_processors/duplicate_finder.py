@@ -0,0 +1,69 @@
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.minhash import MinHasher, find_similar_pairs
+
+
+class DuplicateFinder(ReProcessor):
+    """
+    A class that finds near-duplicate (copy-pasted) components.
+
+    Instead of comparing all pairs of components, every component gets a
+    MinHash signature of the shingles of its normalized tokens, computed in
+    vectorized batches, and locality-sensitive hashing over bands of the
+    signatures yields candidate pairs, which are kept when their estimated
+    Jaccard similarity reaches the threshold (see
+    `reprocess.utils.minhash`). The signatures are kept with the container
+    (see `ReContainer.derived`), so further runs on it, e.g. with another
+    threshold, do not hash the components again.
+
+    The container gets `duplicate_pairs`: (component id, component id,
+    similarity) tuples, most similar first.
+    """
+
+    def __init__(self,
+                 threshold: float = 0.8,
+                 num_perm: int = 128,
+                 shingle_size: int = 5,
+                 seed: int = 1,
+                 **kwargs):
+        """
+        :param threshold: Minimal estimated Jaccard similarity of the shingles of a pair.
+        :param num_perm: Number of hash functions of the signatures; more are more accurate.
+        :param shingle_size: Number of tokens per shingle; shorter components are skipped.
+        :param seed: Seed of the hash functions.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Threshold must be in (0, 1]: {threshold}")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Finds pairs of near-duplicate components.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        components = repository_container.code_components
+        component_ids = [component.component_id for component in components]
+
+        def build_signatures(components):
+            return MinHasher(
+                self.num_perm, self.shingle_size, self.seed).signatures_of(
+                    component_ids,
+                    [component.component_code for component in components])
+
+        signatures = repository_container.derived(
+            "code_components",
+            f"minhash_{self.num_perm}_{self.shingle_size}_{self.seed}",
+            build_signatures)
+
+        return {
+            "duplicate_pairs":
+            [(component_ids[first], component_ids[second], similarity)
+             for first, second, similarity in find_similar_pairs(
+                 signatures, self.threshold)]
+        }
@@ -1,7 +1,9 @@
+import time
 from reprocess.re_processors.processor import ReProcessor
 from reprocess.utils.find_code_files import find_code_files
 from reprocess.re_container import ReContainer
 from reprocess.utils.graph_utils import construct_code_components, link_components, create_parsers_map, extract_components, map_files_to_ids, get_residual_cmp
+from reprocess.utils.build_metrics import BuildMetrics, get_language
 
 
 class GraphBuilder(ReProcessor):
@@ -11,14 +13,15 @@ class GraphBuilder(ReProcessor):
     a DAG using these components. The resulting graph is saved within a repository container for further processing or analysis.
 
     Attributes:
-        - None
+        collect_metrics (bool): Whether stage-level metrics of the build are collected and stored in the container as `build_metrics`; otherwise `build_metrics` left by an earlier run is reset to None.
 
     Methods:
         process(repository_container: RepositoryContainer): Constructs the dependency graph and populates the given repository container with the constructed graph and associated data.
     """
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, collect_metrics: bool = False, **kwargs) -> None:
         super().__init__()
+        self.collect_metrics = collect_metrics
 
     def __call__(self, repository_container: ReContainer):
         """
@@ -28,37 +31,62 @@ class GraphBuilder(ReProcessor):
             repository_container (RepositoryContainer): An instance of the RepositoryContainer class that will hold the constructed dependency graph and associated data.
 
         Returns:
-            dict: Contains code components, files, and external components.
+            dict: Contains code components, files, and external components
+                (and `build_metrics` if metrics are collected).
         """
         if not repository_container.not_empty:
             return {}
 
+        start = time.perf_counter()
+        metrics = BuildMetrics() if self.collect_metrics else None
+
+        discovery_start = time.perf_counter()
         files = find_code_files(repository_container.repo_path)
-        parsers_map = create_parsers_map(files, repository_container.repo_name)
+        if metrics is not None:
+            metrics.add_time("discovery",
+                             time.perf_counter() - discovery_start)
+            for file in files:
+                metrics.add_count("discovery", 1, get_language(file))
+
+        parsers_map = create_parsers_map(files, repository_container.repo_name,
+                                         metrics)
 
-        component_names, component_fillers = extract_components(parsers_map)
+        component_names, component_fillers = extract_components(
+            parsers_map, metrics)
         code_components = construct_code_components(
-            list(component_fillers.values()))
+            list(component_fillers.values()), metrics)
 
         component_id_map = {
             component.component_name: component.component_id
             for component in code_components
         }
 
-        id_files_map = map_files_to_ids(parsers_map)
+        id_files_map = map_files_to_ids(parsers_map, metrics)
+        linking_start = time.perf_counter()
         external_components_dict = link_components(code_components,
                                                    component_id_map,
                                                    component_names)
+        if metrics is not None:
+            metrics.add_time("linking", time.perf_counter() - linking_start)
+            metrics.add_count("linking", len(code_components))
 
         file_cmp_map = {}
         files = list(id_files_map.values())
         for cmp in code_components:
             file_cmp_map.setdefault(cmp.file_id, []).append(cmp)
         residual_components = get_residual_cmp(files, file_cmp_map,
-                                               repository_container.repo_path)
+                                               repository_container.repo_path,
+                                               metrics)
 
-        return {
+        result = {
             "code_components": code_components + residual_components,
             "files": files,
             "external_components": external_components_dict
         }
+        if metrics is not None:
+            metrics.total_time = time.perf_counter() - start
+            result["build_metrics"] = metrics
+        elif hasattr(repository_container, "build_metrics"):
+            # metrics of an earlier run do not describe this one
+            result["build_metrics"] = None
+        return result
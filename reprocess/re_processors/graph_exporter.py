@@ -0,0 +1,50 @@
+import os
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.graph_export import export_graph
+
+
+class GraphExporter(ReProcessor):
+    """
+    A class that exports the repository graph for bulk loading into graph stores.
+
+    Nodes (`CodeComponent`, `File`, `ExternalComponent`) and relationships
+    (`USES`, `INSIDE`, `USES_EXTERNAL`) are streamed to files in one of the
+    formats:
+
+    - "neo4j": header and data CSV files per label and relationship type for
+      the offline `neo4j-admin database import`, with the command line in
+      `import_command.txt`;
+    - "graphml": a single GraphML document;
+    - "jsonl": `nodes.jsonl` and `edges.jsonl` with one JSON object per line.
+    """
+
+    def __init__(self,
+                 output_format: str = "neo4j",
+                 output_path: Optional[str] = None,
+                 **kwargs):
+        """
+        :param output_format: "neo4j", "graphml" or "jsonl".
+        :param output_path: Output directory; by default `<db_path>/<repo_name>/export/<output_format>`.
+        """
+        self.output_format = output_format
+        self.output_path = output_path
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Writes the graph of the container in the configured format.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        output_path = self.output_path or os.path.join(
+            repository_container.db_path, repository_container.repo_name,
+            "export", self.output_format)
+        counts = export_graph(repository_container, output_path,
+                              self.output_format)
+        print(f"Exported {counts['nodes']} nodes and "
+              f"{counts['relationships']} relationships to {output_path}.")
+
+        return {"is_exported": True}
@@ -1,9 +1,10 @@
-import subprocess
-import logging
+import time
 from copy import deepcopy
 from reprocess.re_processors.processor import ReProcessor
 from reprocess.re_container import ReContainer
+from reprocess.utils.git_changes import get_changed_files, separate_file_changes
 from reprocess.utils.graph_utils import construct_code_components, link_components, create_parsers_map, extract_components, map_files_to_ids
+from reprocess.utils.build_metrics import BuildMetrics
 
 
 class GraphUpdater(ReProcessor):
@@ -14,65 +15,15 @@ class GraphUpdater(ReProcessor):
     It processes changes in files and components, updates the repository's structure accordingly, and constructs a new dependency graph.
     """
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, collect_metrics: bool = False, **kwargs) -> None:
         """
         Initializes the GraphUpdater.
-        """
-        super().__init__()
-
-    def _get_changed_files(self, local_repo_path: str) -> list:
-        """
-        Retrieves a list of files that have changed in the local repository since the last commit.
-
-        Args:
-            local_repo_path (str): Local path of the repository.
-
-        Returns:
-            list: A list of changed file paths.
-        """
-        try:
-            result = subprocess.run([
-                'git', '-C', local_repo_path, 'diff', '--cached',
-                '--name-status'
-            ],
-                                    capture_output=True,
-                                    text=True,
-                                    check=True)
-            return result.stdout.splitlines()
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Failed to get changed files: {e}")
-            return []
-
-    def is_removed(self, changed_file_status: str) -> bool:
-        """
-        Checks if a file has been removed based on its status string.
-
-        Args:
-            changed_file_status (str): The status string of a file ('A' for added, 'M' for modified, 'D' for deleted).
-
-        Returns:
-            bool: True if the file has been removed, False otherwise.
-        """
-        return changed_file_status[0] == 'D'
-
-    def _separate_file_changes(self, changed_files):
-        """
-        Separates changed files into removed and updated categories.
 
         Args:
-            changed_files (list): List of changed files with their statuses.
-
-        Returns:
-            tuple: Lists of removed file paths and updated file paths.
+            collect_metrics (bool): Whether stage-level metrics of the update are collected and stored in the container as `build_metrics`; otherwise `build_metrics` left by an earlier run is reset to None.
         """
-        status_file_name = [line.split('\t') for line in changed_files]
-        removed_files_relative_paths = [
-            line[1] for line in status_file_name if self.is_removed(line)
-        ]
-        updated_files_relative_paths = [
-            line[1] for line in status_file_name if not self.is_removed(line)
-        ]
-        return removed_files_relative_paths, updated_files_relative_paths
+        super().__init__()
+        self.collect_metrics = collect_metrics
 
     def _filter_repository_files(self, repository_container,
                                  removed_files_relative_paths,
@@ -88,18 +39,23 @@ class GraphUpdater(ReProcessor):
         Returns:
             tuple: Lists of temporary files, removed file IDs, and updated file IDs.
         """
-        removed_file_ids = []
-        updated_files_ids = []
-        for file in repository_container.files:
-            if file.file_path in removed_files_relative_paths:
-                removed_file_ids.append(file.file_id)
-            elif file.file_path in updated_files_relative_paths:
-                updated_files_ids.append(file.file_id)
-
-        temporary_files = list(
-            filter(
-                lambda file: file.file_id not in removed_file_ids and file.
-                file_id not in updated_files_ids, repository_container.files))
+        removed_file_ids = [
+            file.file_id
+            for path in dict.fromkeys(removed_files_relative_paths)
+            for file in repository_container.lookup("files", "file_path", path)
+        ]
+        updated_files_ids = [
+            file.file_id
+            for path in dict.fromkeys(updated_files_relative_paths)
+            for file in repository_container.lookup("files", "file_path", path)
+            if file.file_id not in removed_file_ids
+        ]
+
+        changed_file_ids = set(removed_file_ids) | set(updated_files_ids)
+        temporary_files = [
+            file for file in repository_container.files
+            if file.file_id not in changed_file_ids
+        ]
         return temporary_files, removed_file_ids, updated_files_ids
 
     def _filter_repository_components(self, repository_container,
@@ -115,22 +71,24 @@ class GraphUpdater(ReProcessor):
         Returns:
             tuple: Lists of temporary code components, removed component IDs, and updated component IDs.
         """
-        removed_components_ids = []
-        updated_components_ids = []
-        for code_component in repository_container.code_components:
-            if code_component.file_id in removed_file_ids:
-                removed_components_ids.append(code_component.component_id)
-            elif code_component.file_id in updated_files_ids:
-                updated_components_ids.append(code_component.component_id)
-
-        temporary_code_components = deepcopy(
-            list(
-                filter(
-                    lambda code_component:
-                    (code_component.component_id not in removed_components_ids
-                     and code_component.component_id not in
-                     updated_components_ids),
-                    repository_container.code_components)))
+        removed_components_ids = [
+            component.component_id for file_id in removed_file_ids
+            for component in repository_container.lookup(
+                "code_components", "file_id", file_id)
+        ]
+        updated_components_ids = [
+            component.component_id for file_id in updated_files_ids
+            for component in repository_container.lookup(
+                "code_components", "file_id", file_id)
+        ]
+
+        changed_components_ids = set(removed_components_ids) | set(
+            updated_components_ids)
+        temporary_code_components = deepcopy([
+            code_component
+            for code_component in repository_container.code_components
+            if code_component.component_id not in changed_components_ids
+        ])
 
         return temporary_code_components, removed_components_ids, updated_components_ids
 
@@ -152,31 +110,41 @@ class GraphUpdater(ReProcessor):
                 code_component.linked_component_ids).difference(
                     changed_components_ids)
 
-    def _process_updated_files(self, repository_container, updated_files):
+    def _process_updated_files(self,
+                               repository_container,
+                               updated_files,
+                               metrics=None):
         """
         Processes the updated files by mapping and constructing code components and linking them.
 
         Args:
             repository_container (ReContainer): The repository container instance.
             updated_files (list): List of updated file paths.
+            metrics (Optional[BuildMetrics]): Collector of stage-level metrics, if enabled.
 
         Returns:
             tuple: Updated AST manager, component manager, file manager, package components, and external components dictionary.
         """
         parsers_map = create_parsers_map(updated_files,
-                                         repository_container.repo_name)
+                                         repository_container.repo_name,
+                                         metrics)
 
-        component_names, component_fillers = extract_components(parsers_map)
+        component_names, component_fillers = extract_components(
+            parsers_map, metrics)
         code_components = construct_code_components(
-            list(component_fillers.values()))
+            list(component_fillers.values()), metrics)
         component_id_map = {
             component.component_name: component.component_id
             for component in code_components
         }
-        id_files_map = map_files_to_ids(parsers_map)
+        id_files_map = map_files_to_ids(parsers_map, metrics)
+        linking_start = time.perf_counter()
         external_components_dict = link_components(code_components,
                                                    component_id_map,
                                                    component_names)
+        if metrics is not None:
+            metrics.add_time("linking", time.perf_counter() - linking_start)
+            metrics.add_count("linking", len(code_components))
 
         return id_files_map, external_components_dict, code_components
 
@@ -218,10 +186,17 @@ class GraphUpdater(ReProcessor):
         Args:
             repository_container (ReContainer): The repository container holding the current state of the repository.
         """
+        start = time.perf_counter()
+        metrics = BuildMetrics() if self.collect_metrics else None
+
         # Retrieve and process changed files
-        changed_files = self._get_changed_files(repository_container.repo_path)
-        removed_files_relative_paths, updated_files_relative_paths = self._separate_file_changes(
+        changed_files = get_changed_files(repository_container.repo_path)
+        removed_files_relative_paths, updated_files_relative_paths = separate_file_changes(
             changed_files)
+        if metrics is not None:
+            metrics.add_time("change_detection", time.perf_counter() - start)
+            metrics.add_count("change_detection", len(changed_files))
+            filtering_start = time.perf_counter()
 
         # Filter repository container's files and components
         temporary_files, removed_file_ids, updated_files_ids = self._filter_repository_files(
@@ -234,6 +209,12 @@ class GraphUpdater(ReProcessor):
         self._adjust_linked_component_ids(temporary_code_components,
                                           removed_components_ids,
                                           updated_components_ids)
+        if metrics is not None:
+            metrics.add_time("filtering",
+                             time.perf_counter() - filtering_start)
+            metrics.add_count(
+                "filtering",
+                len(removed_components_ids) + len(updated_components_ids))
 
         # Process updated files and update repository container
         updated_files = [
@@ -242,14 +223,21 @@ class GraphUpdater(ReProcessor):
         ]
 
         id_files_map, external_components_dict, new_code_components = self._process_updated_files(
-            repository_container, updated_files)
+            repository_container, updated_files, metrics)
 
         # Construct code components for updated files
         new_files = list(id_files_map.values())
         new_code_components
 
-        return self._merge_updated_with_existing(repository_container,
-                                                 temporary_files, new_files,
-                                                 temporary_code_components,
-                                                 new_code_components,
-                                                 external_components_dict)
+        result = self._merge_updated_with_existing(repository_container,
+                                                   temporary_files, new_files,
+                                                   temporary_code_components,
+                                                   new_code_components,
+                                                   external_components_dict)
+        if metrics is not None:
+            metrics.total_time = time.perf_counter() - start
+            result["build_metrics"] = metrics
+        elif hasattr(repository_container, "build_metrics"):
+            # metrics of an earlier run do not describe this one
+            result["build_metrics"] = None
+        return result
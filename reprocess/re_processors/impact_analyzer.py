@@ -0,0 +1,133 @@
+import os
+import re
+from typing import Sequence
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.git_changes import get_changed_files, separate_file_changes
+from reprocess.utils.graph_query import get_component_graph
+from reprocess.utils.graph_utils import construct_code_components, create_parsers_map, extract_components, get_residual_cmp, map_files_to_ids
+
+# Paths of test files in the supported languages
+DEFAULT_TEST_PATTERN = (r"(^|/)(tests?|__tests__)/|(^|/)test_[^/]*$"
+                        r"|_test\.[^/.]+$|\.(test|spec)\.[jt]s$|Tests?\.java$")
+
+
+class ImpactAnalyzer(ReProcessor):
+    """
+    A class that finds the components, and the tests, affected by changes in git.
+
+    Changed files are taken from `git diff --name-status` (staged changes by
+    default) and separated like in `GraphUpdater`, see
+    `reprocess.utils.git_changes`. The current versions of the changed
+    files are parsed, and since component ids are hashes of the name and
+    the code, a component of the graph is changed when its id is not among
+    the ids of the parsed components. Components of removed files are
+    changed as well. The affected components are the changed ones and
+    everything transitively depending on them, found by walking the reverse
+    dependency graph; reverse reachability is memoized per component for
+    the snapshot of the graph, so repeated analyses against the same graph
+    are cheap.
+
+    The container gets `changed_components`, `affected_components` and
+    `affected_tests` (affected components in test files).
+    """
+
+    def __init__(self,
+                 diff_args: Sequence[str] = ("--cached", ),
+                 test_pattern: str = DEFAULT_TEST_PATTERN,
+                 **kwargs):
+        """
+        :param diff_args: Arguments selecting the changes for `git diff`, e.g. `("HEAD~1", "HEAD")`
+            for the last commit. Files are parsed from the working tree.
+        :param test_pattern: Regular expression matching paths of test files.
+        """
+        self.diff_args = list(diff_args)
+        self.test_pattern = re.compile(test_pattern)
+
+    def _parse_current_files(self, repository_container, paths):
+        """
+        Parses the current versions of files.
+
+        Returns:
+            tuple: Ids of the parsed components and residual code by file path.
+        """
+        existing = [
+            os.path.join(repository_container.repo_path, path)
+            for path in sorted(paths) if os.path.isfile(
+                os.path.join(repository_container.repo_path, path))
+        ]
+        parsers_map = create_parsers_map(existing,
+                                         repository_container.repo_name)
+        _, component_fillers = extract_components(parsers_map)
+        code_components = construct_code_components(
+            list(component_fillers.values()))
+        files = list(map_files_to_ids(parsers_map).values())
+        file_cmp_map = {}
+        for component in code_components:
+            file_cmp_map.setdefault(component.file_id, []).append(component)
+        paths_by_id = {file.file_id: file.file_path for file in files}
+        residual_code = {
+            paths_by_id[residual.file_id]: residual.component_code
+            for residual in get_residual_cmp(files, file_cmp_map,
+                                             repository_container.repo_path)
+        }
+        return {component.component_id
+                for component in code_components}, residual_code
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Finds changed and affected components.
+
+        :param repository_container: The repository container holding the graph built before the changes.
+        """
+        components = repository_container.code_components
+        removed_paths, updated_paths = map(
+            set,
+            separate_file_changes(
+                get_changed_files(repository_container.repo_path,
+                                  self.diff_args)))
+        file_paths = {
+            file.file_id: file.file_path
+            for file in repository_container.files
+        }
+        current_ids, residual_code = self._parse_current_files(
+            repository_container, updated_paths)
+
+        changed_ids = set()
+        for component in components:
+            file_path = file_paths.get(component.file_id)
+            if file_path in removed_paths:
+                changed_ids.add(component.component_id)
+            elif file_path in updated_paths:
+                if component.component_type == "residual":
+                    # residual names contain the random file id, so the code is compared
+                    if residual_code.get(
+                            file_path) != component.component_code:
+                        changed_ids.add(component.component_id)
+                elif component.component_id not in current_ids:
+                    changed_ids.add(component.component_id)
+
+        graph = get_component_graph(repository_container)
+        affected_nodes = {
+            graph.positions[component_id]
+            for component_id in changed_ids
+        }
+        for component_id in changed_ids:
+            affected_nodes |= graph.closure(component_id, "in")
+
+        affected = [components[node] for node in sorted(affected_nodes)]
+        return {
+            "changed_components": [
+                component for component in components
+                if component.component_id in changed_ids
+            ],
+            "affected_components":
+            affected,
+            "affected_tests": [
+                component for component in affected
+                if self.test_pattern.search(
+                    file_paths.get(component.file_id) or "")
+            ]
+        }
@@ -0,0 +1,122 @@
+import os
+import json
+import subprocess
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_processors.json_converter import JsonConverter
+from reprocess.re_processors.json_deconverter import JsonDeconverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.change_journal import (append_record, compact,
+                                            diff_states, encode_values,
+                                            is_empty, last_seq, list_bases,
+                                            load_state, new_record, read_state,
+                                            state_digests, write_base,
+                                            write_state)
+
+
+def get_head_commit(repo_path: str) -> Optional[str]:
+    """Returns the hash of the HEAD commit of a git repository, if any."""
+    try:
+        result = subprocess.run(['git', '-C', repo_path, 'rev-parse', 'HEAD'],
+                                capture_output=True,
+                                text=True,
+                                check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class JournalConverter(ReProcessor):
+    """
+    A class that persists the repository container as a base snapshot and an append-only change journal.
+
+    The first save writes a base snapshot (see `SnapshotConverter`) to
+    `<db_path>/<repo_name>/journal`. Every later save, typically after
+    `GraphUpdater`, compares the container with digests of the last saved
+    state (kept next to the journal, so saving does not replay it) and
+    appends one delta record with added, modified and removed components
+    and files, added and removed edges and changed external components and
+    attributes, tagged with the commit. `JournalDeconverter` replays the
+    journal, also up to any recorded commit. Compaction folds records into
+    a new base snapshot.
+    """
+
+    def __init__(self,
+                 commit: Optional[str] = None,
+                 compact_after: Optional[int] = None,
+                 keep: int = 10,
+                 **kwargs):
+        """
+        :param commit: Commit the saved state belongs to; by default the HEAD of `repo_path`.
+        :param compact_after: Compacts the journal once it holds more than this number of records.
+        :param keep: Number of the newest records kept readable by compaction.
+        """
+        self.commit = commit
+        self.compact_after = compact_after
+        self.keep = keep
+        self.json_converter = JsonConverter()
+        self.json_deconverter = JsonDeconverter()
+
+    def set_default(self, obj):
+        """Like `JsonConverter.set_default`, but sets are sorted so unchanged objects encode identically."""
+        if isinstance(obj, set):
+            return sorted(obj)
+        return self.json_converter.set_default(obj)
+
+    def restore(self, value):
+        return self.json_deconverter.dict_to_class(
+            value, self.json_deconverter.class_map)
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Saves the container to `<db_path>/<repo_name>/journal`.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        journal_path = os.path.join(repository_container.db_path,
+                                    repository_container.repo_name, "journal")
+        attributes = dict(vars(repository_container))
+        commit = self.commit or get_head_commit(repository_container.repo_path)
+
+        encoder = json.JSONEncoder(separators=(",", ":"),
+                                   default=self.set_default)
+        encoded = encode_values(attributes, encoder.encode)
+        order = list(attributes)
+
+        if not list_bases(journal_path):
+            write_base(journal_path, attributes, 0, {"commit": commit},
+                       self.set_default)
+            write_state(journal_path,
+                        state_digests(attributes, encoded, order, 0))
+            print(f"The journal base was saved to {journal_path}.")
+            return {"is_journal_saved": True}
+
+        seq = last_seq(journal_path)
+        previous = read_state(journal_path)
+        if previous is None or previous.get("seq") != seq:
+            # the digests are missing or behind the journal (an interrupted
+            # save), so they are rebuilt once by replaying it
+            restored = load_state(journal_path, self.restore)
+            previous = state_digests(restored,
+                                     encode_values(restored, encoder.encode),
+                                     list(restored), seq)
+        delta = diff_states(previous, encoded, order)
+        if is_empty(delta, previous["order"]):
+            print("The journal is up to date.")
+            return {"is_journal_saved": True}
+
+        record = new_record(seq + 1, commit, delta)
+        append_record(journal_path, record)
+        write_state(journal_path,
+                    state_digests(attributes, encoded, order, record["seq"]))
+        print(f"The change #{record['seq']} was appended to {journal_path}.")
+
+        # records are numbered consecutively after the newest base
+        if (self.compact_after is not None
+                and record["seq"] - list_bases(journal_path)[-1]
+                > self.compact_after):
+            compact(journal_path, self.restore, self.set_default, self.keep)
+
+        return {"is_journal_saved": True}
@@ -0,0 +1,44 @@
+import os
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_processors.json_deconverter import JsonDeconverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.change_journal import load_state
+
+
+class JournalDeconverter(ReProcessor):
+    """
+    A class that populates the repository container by replaying the change journal written by `JournalConverter`.
+
+    By default the latest state is restored; a commit or a record number selects an earlier one
+    that has not been compacted yet.
+    """
+
+    def __init__(self,
+                 class_map: dict = {},
+                 commit: Optional[str] = None,
+                 seq: Optional[int] = None,
+                 **kwargs):
+        """
+        :param class_map: A dictionary mapping class names to their corresponding classes (see `JsonDeconverter`).
+        :param commit: Restores the state saved for this commit (a prefix of the hash is enough).
+        :param seq: Restores the state after the journal record with this number.
+        """
+        self.json_deconverter = JsonDeconverter(class_map)
+        self.commit = commit
+        self.seq = seq
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Loads the state from `<db_path>/<repo_name>/journal` into the container.
+
+        :param repository_container: An instance of ReContainer to be populated with the restored state.
+        """
+        journal_path = os.path.join(repository_container.db_path,
+                                    repository_container.repo_name, "journal")
+        class_map = self.json_deconverter.class_map
+        return load_state(
+            journal_path, lambda value: self.json_deconverter.dict_to_class(
+                value, class_map), self.commit, self.seq)
@@ -1,7 +1,10 @@
 import os
 import json
+import uuid
+from typing import Optional
 from reprocess.re_processors.processor import ReProcessor
 from reprocess.re_container import ReContainer
+from reprocess.utils.json_index import INDEXED_LISTS, JsonIndexBuilder, LazyJsonList, get_index_path
 
 
 class JsonConverter(ReProcessor):
@@ -12,64 +15,144 @@ class JsonConverter(ReProcessor):
     It also handles saving this JSON object to a file within the repository's database path.
     """
 
-    def __init__(self, **kwargs):
-        pass
-
-    def class_to_dict(self, obj):
+    def __init__(self,
+                 indent: Optional[int] = None,
+                 write_index: bool = True,
+                 **kwargs):
         """
-            Recursively converts a class instance to a dictionary.
-            
-            This function traverses through the attributes of an object (including nested objects and lists) and converts them into a dictionary representation.
-            
-            :param obj: The object to convert to a dictionary.
-            :return: A dictionary representation of the input object.
-            """
-        if isinstance(obj, dict):
-            return {
-                key: self.class_to_dict(value)
-                for key, value in obj.items()
-            }
-        elif isinstance(obj, list):
-            return [self.class_to_dict(element) for element in obj]
-        elif hasattr(obj, "__dict__"):
-            data = {
-                key: self.class_to_dict(value)
-                for key, value in obj.__dict__.items()
-            }
-            data['__class__'] = obj.__class__.__name__
-            return data
-        else:
-            return obj
+        :param indent: Indentation of the written JSON. By default the output is compact
+            and written incrementally; with an indent the pretty-printed output is still
+            streamed but uses the slower pure-Python encoder.
+        :param write_index: Whether an offset index (`data.index.json`) used by
+            `JsonDeconverter(lazy=True)` is written next to compact output.
+        """
+        self.indent = indent
+        self.write_index = write_index
 
     def set_default(self, obj):
-        if isinstance(obj, set):
+        """
+        Converts objects the JSON encoder does not support natively.
+
+        Sets become lists and class instances become dictionaries of their
+        attributes with a `__class__` entry, which `JsonDeconverter` maps
+        back to the class. Nested attributes are converted lazily by the
+        encoder, so no mirror of the whole container is ever built.
+        """
+        if isinstance(obj, (set, LazyJsonList)):
             return list(obj)
+        if hasattr(obj, "__dict__"):
+            data = dict(obj.__dict__)
+            data['__class__'] = obj.__class__.__name__
+            return data
         raise TypeError(f"{type(obj)}")
 
+    def _code_span(self, encoder, element, start: int):
+        """
+        Locates the encoded `component_code` inside an encoded component.
+
+        Compact encoding of a dictionary is the concatenation of its items, so
+        the offset follows from the length of the items preceding the code.
+        """
+        values = getattr(element, "__dict__", None)
+        if not values or "component_code" not in values:
+            return None
+        keys = list(values)
+        position = keys.index("component_code")
+        before = {key: values[key] for key in keys[:position]}
+        # `{"a":1}` -> `{"a":1` plus `,` before the key of the code
+        offset = len(encoder.encode(before)) - 1 + (1 if position else 0)
+        offset += len('"component_code":')
+        return [
+            start + offset,
+            start + offset + len(encoder.encode(values["component_code"]))
+        ]
+
+    def write_json(self,
+                   file,
+                   attributes: dict,
+                   index: Optional[JsonIndexBuilder] = None):
+        """
+        Streams the given attributes to an open file as a JSON object.
+
+        In compact mode top-level lists and dictionaries (such as
+        `code_components` and `files`) are serialised one element at a time,
+        so memory usage does not grow with the size of the graph.
+
+        :param file: A text file object opened for writing.
+        :param attributes: Attributes of the repository container.
+        :param index: Collects offsets of attributes, components and files (compact mode only).
+        """
+        if self.indent is not None:
+            encoder = json.JSONEncoder(indent=self.indent,
+                                       default=self.set_default)
+            for chunk in encoder.iterencode(attributes):
+                file.write(chunk)
+            return
+
+        encoder = json.JSONEncoder(separators=(",", ":"),
+                                   default=self.set_default)
+        position = 0
+
+        def write(chunk):
+            nonlocal position
+            file.write(chunk)
+            # the output is ASCII, so characters are bytes
+            position += len(chunk)
+
+        write("{")
+        for attribute_index, (key, value) in enumerate(attributes.items()):
+            if attribute_index:
+                write(",")
+            write(encoder.encode(key) + ":")
+            value_start = position
+            if isinstance(value, (list, tuple, set, LazyJsonList)):
+                indexed = index is not None and key in INDEXED_LISTS
+                write("[")
+                for element_index, element in enumerate(value):
+                    if element_index:
+                        write(",")
+                    element_start = position
+                    write(encoder.encode(element))
+                    if indexed:
+                        index.add_element(
+                            key, element, element_start, position,
+                            self._code_span(encoder, element, element_start))
+                write("]")
+            elif isinstance(value, dict):
+                write("{")
+                for item_index, (item_key,
+                                 item_value) in enumerate(value.items()):
+                    if item_index:
+                        write(",")
+                    write(
+                        encoder.encode(item_key) + ":" +
+                        encoder.encode(item_value))
+                write("}")
+            else:
+                write(encoder.encode(value))
+            if index is not None:
+                index.add_attribute(key, value_start, position)
+        write("}")
+
     def __call__(self,
                  repository_container: ReContainer,
                  inplace: bool = True):
         """
         Processes the given repository container and saves its data in JSON format to a file.
+
+        The file is written under a temporary name and atomically renamed
+        when complete, so readers never see a partially written `data.json`.
         
         :param repository_container: An instance of RepositoryContainer containing the repository's data.
         """
 
-        # Function to handle serialization of sets to lists
         predefined_attributes = []
-        result_json = {}
         external_attributes_of_repository = {}
         for attribute in vars(repository_container):
             if attribute not in predefined_attributes:
                 external_attributes_of_repository[
                     attribute] = repository_container.__dict__[attribute]
 
-        # Add these additional attributes to the main JSON structure
-        addition_fields_for_json = self.class_to_dict(
-            external_attributes_of_repository)
-        for key in addition_fields_for_json:
-            result_json[key] = addition_fields_for_json[key]
-
         # Define the path where the JSON will be saved
         db_path = os.path.join(repository_container.db_path,
                                repository_container.repo_name, "data.json")
@@ -79,10 +162,26 @@ class JsonConverter(ReProcessor):
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-        # Save the JSON structure to a file
-        with open(db_path, "w") as file:
-            file.write(
-                json.dumps(result_json, indent=4, default=self.set_default))
-            print(f"The graph was successfully built and saved to {db_path}.")
+        # Stream the JSON structure to a temporary file, then swap it in
+        index = JsonIndexBuilder() if (self.write_index
+                                       and self.indent is None) else None
+        index_path = get_index_path(db_path)
+        tmp_path = f"{db_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                self.write_json(file, external_attributes_of_repository, index)
+                file.flush()
+                os.fsync(file.fileno())
+            # a stale index must never outlive the data it describes
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            os.replace(tmp_path, db_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if index is not None:
+            index.save(db_path)
+        print(f"The graph was successfully built and saved to {db_path}.")
 
         return {"is_converted": True}
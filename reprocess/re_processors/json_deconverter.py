@@ -2,6 +2,8 @@ import os
 import json
 from reprocess.code_component import CodeComponentContainer
 from reprocess.file_analyzer import FileContainer
+from reprocess.utils.build_metrics import BuildMetrics
+from reprocess.utils.json_index import close_lazy_lists, load_index, load_lazy
 from reprocess.re_processors.processor import ReProcessor
 from reprocess.re_container import ReContainer
 
@@ -14,17 +16,24 @@ class JsonDeconverter(ReProcessor):
     It also handles the reconstruction of complex objects like `FileAnalyzer` and `CodeComponent` instances based on the JSON data.
     """
 
-    def __init__(self, class_map: dict = {}, **kwargs):
+    def __init__(self, class_map: dict = {}, lazy: bool = False, **kwargs):
         """
         Initializes the JsonDeconverter with a mapping of class names to classes.
         
         This mapping is used during the conversion of dictionaries back to class instances.
         
         :param class_map: A dictionary mapping class names to their corresponding classes.
+        :param lazy: Whether `code_components` and `files` are loaded lazily. The JSON file is
+            memory-mapped and, using the offset index written by `JsonConverter`, an element is
+            parsed only when it is accessed (see `reprocess.utils.json_index.LazyJsonList`).
+            Without a valid index the file is loaded eagerly. Loading a container again unmaps the
+            file of its lazy lists, which share the mapping with their copies.
         """
         self.class_map = class_map
+        self.lazy = lazy
         self.class_map["CodeComponentContainer"] = CodeComponentContainer
         self.class_map["FileContainer"] = FileContainer
+        self.class_map["BuildMetrics"] = BuildMetrics
 
     def dict_to_class(self, d, class_map):
         """
@@ -70,6 +79,16 @@ class JsonDeconverter(ReProcessor):
                                       repository_container.repo_name,
                                       'data.json')
 
+        # the old mapping would keep the file from being replaced on Windows
+        close_lazy_lists(vars(repository_container))
+
+        if self.lazy:
+            index = load_index(self.json_path)
+            if index is not None:
+                return load_lazy(
+                    self.json_path, index,
+                    lambda value: self.dict_to_class(value, self.class_map))
+
         # Load the JSON data
         with open(self.json_path, 'r') as file:
             json_dict = json.load(file)
@@ -1,5 +1,9 @@
 from reprocess.re_processors.processor import ReProcessor
 from reprocess.re_container import ReContainer
+from reprocess.utils.graph_export import (NODE_KEYS, RELATIONSHIP_KINDS,
+                                          component_relationships,
+                                          component_row,
+                                          external_component_rows, file_row)
 from neo4j import GraphDatabase
 
 
@@ -9,113 +13,170 @@ class Neo4jConverter(ReProcessor):
     
     This class inherits from ReProcessor and overrides the `process` method 
     to store the repository's components and files into a Neo4j graph database. 
-    It creates nodes for code components and files, and establishes relationships
-    between them based on their links.
+    It creates nodes for code components, files and external components, and
+    establishes relationships between them based on their links.
     """
 
-    def __init__(self, uri, user, password, **kwargs):
+    def __init__(self, uri, user, password, batch_size: int = 1000, **kwargs):
         """
         Initializes the Neo4jConverter with the connection details for the Neo4j database.
         
         :param uri: The URI of the Neo4j database.
         :param user: The username for Neo4j authentication.
         :param password: The password for Neo4j authentication.
+        :param batch_size: Number of nodes or relationships written by one `UNWIND` transaction.
         """
+        self.batch_size = batch_size
         if uri:
             self.driver = GraphDatabase.driver(uri, auth=(user, password))
 
     def close(self):
         self.driver.close()
 
-    def create_code_component(self, tx, component):
+    def create_schema(self, session):
         """
-        Creates a node for a code component in the Neo4j database.
-        
+        Creates uniqueness constraints on the repository and id of nodes, which also index them.
+
+        Without them every `MERGE` and `MATCH` by id scans all nodes of the
+        label. Several repositories share the database and may contain the
+        same component (its id is a hash of name and code), so ids are only
+        unique within a repository; constraints on the id alone, created by
+        earlier versions, are dropped.
+
+        :param session: An open Neo4j session.
+        """
+        for label, key in NODE_KEYS.items():
+            session.run(f"DROP CONSTRAINT {label.lower()}_{key} IF EXISTS")
+            session.run(
+                f"CREATE CONSTRAINT {label.lower()}_repo_{key} IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE (n.repo, n.{key}) IS UNIQUE")
+
+    def create_code_components(self, tx, rows, repo):
+        """
+        Creates or updates nodes for a batch of code components.
+
         :param tx: The transaction object.
-        :param component: A dictionary representing the code component.
+        :param rows: A list of dictionaries with component properties.
+        :param repo: The name of the repository the components belong to.
         """
         tx.run("""
-            MERGE (c:CodeComponent {component_id: $component_id})
-            ON CREATE SET c.name = $component_name,
-                          c.code = $component_code,
-                          c.type = $component_type
+            UNWIND $rows AS row
+            MERGE (c:CodeComponent {repo: $repo, component_id: row.component_id})
+            SET c.name = row.component_name,
+                c.code = row.component_code,
+                c.type = row.component_type,
+                c.hash = row.hash
             """,
-               component_id=component.component_id,
-               component_name=component.component_name,
-               component_code=component.component_code,
-               component_type=component.component_type)
+               rows=rows,
+               repo=repo)
 
-    def create_file(self, tx, file):
+    def create_files(self, tx, rows, repo):
         """
-        Creates a node for a file in the Neo4j database.
-        
+        Creates or updates nodes for a batch of files.
+
         :param tx: The transaction object.
-        :param file: A dictionary representing the file.
+        :param rows: A list of dictionaries with file properties.
+        :param repo: The name of the repository the files belong to.
         """
         tx.run("""
-            MERGE (f:File {file_id: $file_id})
-            ON CREATE SET f.path = $file_path,
-                          f.imports = $imports,
-                          f.called_components = $called_components,
-                          f.callable_components = $callable_components
+            UNWIND $rows AS row
+            MERGE (f:File {repo: $repo, file_id: row.file_id})
+            SET f.path = row.file_path,
+                f.imports = row.imports,
+                f.called_components = row.called_components,
+                f.callable_components = row.callable_components,
+                f.hash = row.hash
             """,
-               file_id=file.file_id,
-               file_path=file.file_path,
-               imports=file.imports,
-               called_components=file.called_components,
-               callable_components=file.callable_components)
-
-    def create_relationship(self, tx, source_id, target_id, source_type,
-                            target_type, relationship_type):
+               rows=rows,
+               repo=repo)
+
+    def create_external_components(self, tx, rows, repo):
         """
-        Creates a relationship between two nodes in the Neo4j database.
-        
+        Creates or updates nodes for a batch of external components.
+
         :param tx: The transaction object.
-        :param source_id: The ID of the source node.
-        :param target_id: The ID of the target node.
-        :param source_type: The type of the source node ('CodeComponent' or 'File').
-        :param target_type: The type of the target node ('CodeComponent' or 'File').
-        :param relationship_type: The type of relationship (e.g., 'uses', 'inside').
+        :param rows: A list of dictionaries with external component properties.
+        :param repo: The name of the repository the components are used by.
         """
-        # Determine the property for matching based on the node type
-        source_property = "component_id" if source_type == "CodeComponent" else "file_id"
-        target_property = "component_id" if target_type == "CodeComponent" else "file_id"
+        tx.run("""
+            UNWIND $rows AS row
+            MERGE (e:ExternalComponent {repo: $repo, component_id: row.component_id})
+            SET e.name = row.component_name,
+                e.hash = row.hash
+            """,
+               rows=rows,
+               repo=repo)
+
+    def create_relationships(self, tx, rows, repo, relationship_type):
+        """
+        Creates a batch of relationships between nodes of a repository.
+
+        :param tx: The transaction object.
+        :param rows: A list of dictionaries with `source_id` and `target_id`.
+        :param repo: The name of the repository the nodes belong to.
+        :param relationship_type: The type of relationship ('USES', 'INSIDE' or 'USES_EXTERNAL').
+        """
+        source_type, target_type = RELATIONSHIP_KINDS[relationship_type]
+        source_property = NODE_KEYS[source_type]
+        target_property = NODE_KEYS[target_type]
 
         tx.run(f"""
-            MATCH (a {{{source_property}: $source_id}}), (b {{{target_property}: $target_id}})
+            UNWIND $rows AS row
+            MATCH (a:{source_type} {{repo: $repo, {source_property}: row.source_id}})
+            MATCH (b:{target_type} {{repo: $repo, {target_property}: row.target_id}})
             MERGE (a)-[r:{relationship_type}]->(b)
             """,
-               source_id=source_id,
-               target_id=target_id)
+               rows=rows,
+               repo=repo)
+
+    def write_batches(self, session, write, rows, *args):
+        """Runs `write` in one transaction per `batch_size` rows."""
+        for start in range(0, len(rows), self.batch_size):
+            session.execute_write(write, rows[start:start + self.batch_size],
+                                  *args)
+
+    def write_relationships(self, session, components, repo):
+        """Writes the relationships of the given components in batches of one type each."""
+        rows = {
+            relationship_type: []
+            for relationship_type in RELATIONSHIP_KINDS
+        }
+        for relationship_type, source_id, target_id in component_relationships(
+                components):
+            rows[relationship_type].append({
+                "source_id": source_id,
+                "target_id": target_id
+            })
+        for relationship_type, type_rows in rows.items():
+            self.write_batches(session, self.create_relationships, type_rows,
+                               repo, relationship_type)
 
     def __call__(self, repository_container: ReContainer):
         """
         Processes the given repository container and saves its data into the Neo4j database.
+
+        Nodes and relationships are written in batches with `UNWIND`, after
+        the constraints on node ids are created. Nodes carry the name of the
+        repository (`repo`), so several repositories can share the database.
         
         :param repository_container: An instance of ReContainer containing the repository's data.
         """
+        repo = repository_container.repo_name
+        components = repository_container.code_components
+        component_rows = [component_row(component) for component in components]
+        file_rows = [file_row(file) for file in repository_container.files]
+        external_rows = external_component_rows(
+            getattr(repository_container, "external_components", None))
+
         # Start a session with Neo4j
         with self.driver.session(database="neo4j") as session:
-            # Store code components
-            for component in repository_container.code_components:
-                session.write_transaction(self.create_code_component,
-                                          component)
-
-            # Store files
-            for file in repository_container.files:
-                session.write_transaction(self.create_file, file)
-
-            # Create relationships between code components (linked components)
-            for component in repository_container.code_components:
-                for linked_id in component.linked_component_ids:
-                    session.write_transaction(self.create_relationship,
-                                              component.component_id,
-                                              linked_id, "CodeComponent",
-                                              "CodeComponent", "USES")
-                session.write_transaction(self.create_relationship,
-                                          component.file_id,
-                                          component.component_id, "File",
-                                          "CodeComponent", "INSIDE")
+            self.create_schema(session)
+            self.write_batches(session, self.create_code_components,
+                               component_rows, repo)
+            self.write_batches(session, self.create_files, file_rows, repo)
+            self.write_batches(session, self.create_external_components,
+                               external_rows, repo)
+            self.write_relationships(session, components, repo)
 
         self.close()
         return {"is_saved_to_neo4j": True}
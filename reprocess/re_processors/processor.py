@@ -1,13 +1,13 @@
 from reprocess.re_container import ReContainer
 from reprocess.utils.attribute_linker import get_attribute_linker
+from reprocess.utils.profiling import get_active_profiler
+from reprocess.utils.call_analysis_cache import code_hash, load_analysis, save_analysis
 from abc import ABC, abstractmethod, ABCMeta
 import ast
 import inspect
 import functools
 import copy
 import os
-import aiohttp
-import asyncio
 
 
 def syncify(func):
@@ -15,6 +15,8 @@ def syncify(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         if inspect.iscoroutinefunction(func):
+            import asyncio
+
             # Run the coroutine synchronously
             return asyncio.run(func(*args, **kwargs))
         else:
@@ -81,7 +83,19 @@ class AbsentAttributesException(Exception):
         return answer_string
 
 
-def process_call_method(original_call, cls, name, async_=False):
+def analyze_call_method(original_call):
+    """
+    Analyses the source of a processor's `__call__` method.
+
+    The result lists the container attributes read inside the method and the
+    keys of the dictionaries it returns. Parsing the source is expensive, so
+    results are cached on disk keyed by the hash of the method's code object.
+    """
+    key = code_hash(inspect.unwrap(original_call).__code__)
+    analysis = load_analysis(key)
+    if analysis is not None:
+        return analysis
+
     source = inspect.getsource(original_call)
     lines = source.split('\n')
     first_line = lines[0]
@@ -92,19 +106,77 @@ def process_call_method(original_call, cls, name, async_=False):
     analyzer = FunctionAnalyzer()
     analyzer.visit(tree)
 
-    req_attrs_list = []
-    if 'repository_container' in original_call.__code__.co_varnames:
-        param_index = original_call.__code__.co_varnames.index(
-            'repository_container')
-        param_type = original_call.__annotations__.get('repository_container',
-                                                       None)
-        if param_index == 1 and param_type == ReContainer:
-            req_attrs_list = list(analyzer.used_attrs)
-
-    req_attrs_list = list(filter(lambda x: x[:2] != "__", req_attrs_list))
-    return_attrs = find_return_attributes(normalized_source)
+    analysis = {
+        "used_attrs":
+        sorted(analyzer.used_attrs),
+        # keys computed at runtime (e.g. `{self.name: ...}`) cannot be known
+        "return_attrs": [
+            attr for attr in find_return_attributes(normalized_source)
+            if isinstance(attr, str)
+        ]
+    }
+    save_analysis(key, analysis)
+    return analysis
+
+
+class LazyRequiredAttrs:
+    """
+    Class-level descriptor resolving `required_attrs` on first access.
+
+    Analysing `__call__` at class creation made importing modules with many
+    processors slow, so the analysis is postponed until the attribute is
+    needed (normally the first call of the processor). The computed list then
+    replaces the descriptor on the owning class.
+    """
+
+    def __init__(self, original_call, owner):
+        self.original_call = original_call
+        self.owner = owner
+
+    def resolve(self):
+        original_call = self.original_call
+        req_attrs_list = []
+        if 'repository_container' in original_call.__code__.co_varnames:
+            param_index = original_call.__code__.co_varnames.index(
+                'repository_container')
+            param_type = original_call.__annotations__.get(
+                'repository_container', None)
+            if param_index == 1 and param_type == ReContainer:
+                req_attrs_list = analyze_call_method(
+                    original_call)["used_attrs"]
+
+        # methods of the container (e.g. `lookup`) are not repository data
+        req_attrs_list = [
+            attr for attr in req_attrs_list
+            if attr[:2] != "__" and not hasattr(ReContainer, attr)
+        ]
+        setattr(self.owner, "required_attrs", req_attrs_list)
+        return req_attrs_list
+
+    def __get__(self, instance, owner=None):
+        return self.resolve()
+
+
+def deepcopy_container(repository_container, reason):
+    """Deep-copies the container, timing the copy when profiling is enabled."""
+    profiler = get_active_profiler()
+    if profiler is None:
+        return copy.deepcopy(repository_container)
+    with profiler.copy_span(reason):
+        return copy.deepcopy(repository_container)
+
+
+def process_call_method(original_call, cls, name, async_=False):
+
+    def get_return_attrs():
+        try:
+            return analyze_call_method(original_call)["return_attrs"]
+        except (OSError, TypeError):
+            # source is unavailable (e.g. defined in an interactive session)
+            return []
+
     attribute_linker = get_attribute_linker()
-    attribute_linker(name, return_attrs)
+    attribute_linker.defer(name, get_return_attrs)
 
     def check_attrs(self, repository_container):
         absent_attrs = []
@@ -117,7 +189,7 @@ def process_call_method(original_call, cls, name, async_=False):
 
     def set_re_container_attrs(self, repository_container, result):
         active_container = repository_container if cls._init_kwargs.get(
-            'inplace') else copy.deepcopy(repository_container)
+            'inplace') else deepcopy_container(repository_container, "result")
         for key, value in result.items():
             setattr(active_container, key, value)
 
@@ -125,12 +197,11 @@ def process_call_method(original_call, cls, name, async_=False):
 
     if async_:
 
-        @syncify
-        async def async_wrapped_call(self, repository_container, *args,
-                                     **kwargs):
+        async def run_async_call(self, repository_container, *args, **kwargs):
             check_attrs(self, repository_container)
 
-            original_container = copy.deepcopy(repository_container)
+            original_container = deepcopy_container(repository_container,
+                                                    "modification_check")
             result = await original_call(self, repository_container, *args,
                                          **kwargs)
             assert isinstance(
@@ -140,14 +211,26 @@ def process_call_method(original_call, cls, name, async_=False):
 
             return set_re_container_attrs(self, repository_container, result)
 
+        @syncify
+        async def async_wrapped_call(self, repository_container, *args,
+                                     **kwargs):
+            profiler = get_active_profiler()
+            if profiler is None:
+                return await run_async_call(self, repository_container, *args,
+                                            **kwargs)
+            with profiler.processor_span(name):
+                return await run_async_call(self, repository_container, *args,
+                                            **kwargs)
+
         functools.wraps(original_call)(async_wrapped_call)
         setattr(cls, '__call__', async_wrapped_call)
     else:
 
-        def wrapped_call(self, repository_container, *args, **kwargs):
+        def run_call(self, repository_container, *args, **kwargs):
             check_attrs(self, repository_container)
 
-            original_container = copy.deepcopy(repository_container)
+            original_container = deepcopy_container(repository_container,
+                                                    "modification_check")
             result = original_call(self, repository_container, *args, **kwargs)
             assert isinstance(
                 result, dict
@@ -156,10 +239,17 @@ def process_call_method(original_call, cls, name, async_=False):
 
             return set_re_container_attrs(self, repository_container, result)
 
+        def wrapped_call(self, repository_container, *args, **kwargs):
+            profiler = get_active_profiler()
+            if profiler is None:
+                return run_call(self, repository_container, *args, **kwargs)
+            with profiler.processor_span(name):
+                return run_call(self, repository_container, *args, **kwargs)
+
         functools.wraps(original_call)(wrapped_call)
         setattr(cls, '__call__', wrapped_call)
 
-    setattr(cls, "required_attrs", req_attrs_list)
+    setattr(cls, "required_attrs", LazyRequiredAttrs(original_call, cls))
 
 
 class Meta(type):
@@ -224,6 +314,9 @@ class AsyncVLLMReProcessor(ABC, metaclass=AsyncCombinedMeta):
                 raise ValueError("Environment variable LLM_URL is not set")
 
         async def get_response(self, json_data):
+            # imported here so that sync pipelines do not pay for aiohttp
+            import aiohttp
+
             async with aiohttp.ClientSession() as session:
                 async with session.post(self.url, json=json_data) as response:
                     if response.status != 200:
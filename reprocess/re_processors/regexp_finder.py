@@ -1,30 +1,81 @@
 import json
 import re
+from typing import Iterable, Optional, Union
 from reprocess.re_processors.processor import ReProcessor
 from reprocess.re_container import ReContainer
+from reprocess.utils.name_index import get_name_index
+
+
+def _as_set(values: Optional[Union[str, Iterable[str]]]):
+    if values is None:
+        return None
+    return {values} if isinstance(values, str) else set(values)
 
 
 class RegExpFinder(ReProcessor):
+    """
+    Finds components whose names match regular expressions.
+
+    Several patterns can be given at once; they are answered in one pass
+    over the components, and a name index (see `reprocess.utils.name_index`)
+    narrows the pass to names containing the literal parts of the patterns.
+    Each pattern is saved in the container with the list of its components.
+
+    Args:
+        regExpStr: A pattern or a list of patterns.
+        component_type: Only components of this type (or types) are returned.
+        file_ids: Only components of these files are returned.
+        file_paths: Only components of files with these paths are returned.
+    """
 
-    def __init__(self, regExpStr: str = "*"):
+    def __init__(self,
+                 regExpStr: Union[str, Iterable[str]] = "*",
+                 component_type: Optional[Union[str, Iterable[str]]] = None,
+                 file_ids: Optional[Iterable[str]] = None,
+                 file_paths: Optional[Iterable[str]] = None):
         self.regExpStr = regExpStr
+        self.component_type = _as_set(component_type)
+        self.file_ids = _as_set(file_ids)
+        self.file_paths = _as_set(file_paths)
+
+    def _allowed_file_ids(self, repository_container: ReContainer):
+        if self.file_ids is None and self.file_paths is None:
+            return None
+        allowed = set(self.file_ids or ())
+        if self.file_paths is not None and getattr(repository_container,
+                                                   "files", None):
+            allowed.update(file.file_id for file_path in self.file_paths
+                           for file in repository_container.lookup(
+                               "files", "file_path", file_path))
+        return allowed
 
     def __call__(self, repository_container: ReContainer, **kwargs):
 
         try:
-            re.compile(self.regExpStr)
+            patterns = [self.regExpStr] if isinstance(
+                self.regExpStr, str) else list(dict.fromkeys(self.regExpStr))
+            for pattern in patterns:
+                re.compile(pattern)
 
             components = repository_container.code_components
+            allowed_files = self._allowed_file_ids(repository_container)
 
-            found_components = []
-
-            for component in components:
-                component_name = component.component_name
-                match = re.search(self.regExpStr, component_name)
-                if match:
-                    found_components.append(component)
+            found_components = {}
+            for pattern, positions in get_name_index(
+                    repository_container).search(patterns).items():
+                found_components[pattern] = []
+                for position in positions:
+                    component = components[position]
+                    if (self.component_type is not None
+                            and component.component_type
+                            not in self.component_type):
+                        continue
+                    if (allowed_files is not None
+                            and component.file_id not in allowed_files):
+                        continue
+                    found_components[pattern].append(component)
 
-            return {self.regExpStr: found_components}
+            return found_components
 
         except json.JSONDecodeError as e:
             print(f"Error decoding JSON: {e}")
@@ -0,0 +1,49 @@
+import os
+import json
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_processors.json_converter import JsonConverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.shard_storage import write_shards
+
+
+class ShardedConverter(ReProcessor):
+    """
+    A class that saves the repository container as per-file shards.
+
+    Every file is stored together with its components in its own shard under
+    `<db_path>/<repo_name>/shards`, next to a global index of edges and
+    external components and a small manifest. Saving again after
+    `GraphUpdater` only writes the shards of the changed files, the index
+    and the manifest. All files are written under temporary names and
+    renamed, and the manifest is replaced last, so an interrupted save
+    leaves the previous state intact.
+    """
+
+    def __init__(self, **kwargs):
+        self.json_converter = JsonConverter()
+
+    def set_default(self, obj):
+        """Like `JsonConverter.set_default`, but sets are sorted so unchanged shards encode identically."""
+        if isinstance(obj, set):
+            return sorted(obj)
+        return self.json_converter.set_default(obj)
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Writes the attributes of the container to `<db_path>/<repo_name>/shards`.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        shards_path = os.path.join(repository_container.db_path,
+                                   repository_container.repo_name, "shards")
+        encoder = json.JSONEncoder(separators=(",", ":"),
+                                   default=self.set_default)
+        stats = write_shards(shards_path, dict(vars(repository_container)),
+                             encoder.encode)
+        print(
+            f"The graph was saved to {shards_path} "
+            f"({stats['written']} shards written, {stats['reused']} reused).")
+
+        return {"is_sharded_saved": True}
@@ -0,0 +1,41 @@
+import os
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_processors.json_deconverter import JsonDeconverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.shard_storage import read_shards
+
+
+class ShardedDeconverter(ReProcessor):
+    """
+    A class that populates the repository container from shards written by `ShardedConverter`.
+
+    Shards are read in parallel. The result is the same as loading `data.json`
+    with `JsonDeconverter`, except that `code_components` are grouped by file.
+    """
+
+    def __init__(self,
+                 class_map: dict = {},
+                 workers: Optional[int] = None,
+                 **kwargs):
+        """
+        :param class_map: A dictionary mapping class names to their corresponding classes (see `JsonDeconverter`).
+        :param workers: Number of threads reading shards; by default chosen by `ThreadPoolExecutor`.
+        """
+        self.json_deconverter = JsonDeconverter(class_map)
+        self.workers = workers
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Loads `<db_path>/<repo_name>/shards` into the container.
+
+        :param repository_container: An instance of ReContainer to be populated with data from the shards.
+        """
+        shards_path = os.path.join(repository_container.db_path,
+                                   repository_container.repo_name, "shards")
+        class_map = self.json_deconverter.class_map
+        return read_shards(
+            shards_path, lambda value: self.json_deconverter.dict_to_class(
+                value, class_map), self.workers)
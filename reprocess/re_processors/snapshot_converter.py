@@ -0,0 +1,57 @@
+import os
+import uuid
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_processors.json_converter import JsonConverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.snapshot_format import write_snapshot
+
+
+class SnapshotConverter(ReProcessor):
+    """
+    A class that saves the repository container as a compact binary snapshot.
+
+    The snapshot (`data.snapshot` next to `data.json`) keeps names, paths and
+    ids in a deduplicated string table, components and files as fixed-width
+    records, edges as integer arrays and the code in a separate compressed
+    section, so that `SnapshotDeconverter` can load it without the object
+    churn of parsing JSON. Attributes other than `code_components`, `files`
+    and `external_components` are stored as JSON inside the snapshot.
+    """
+
+    def __init__(self, compression_level: int = 6, **kwargs):
+        """
+        :param compression_level: zlib compression level (0-9) of the code section.
+        """
+        self.compression_level = compression_level
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Writes the attributes of the container to `<db_path>/<repo_name>/data.snapshot`.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        snapshot_path = os.path.join(repository_container.db_path,
+                                     repository_container.repo_name,
+                                     "data.snapshot")
+        directory = os.path.dirname(snapshot_path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        tmp_path = f"{snapshot_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                write_snapshot(file, dict(vars(repository_container)),
+                               JsonConverter().set_default,
+                               self.compression_level)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, snapshot_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        print(f"The snapshot was successfully saved to {snapshot_path}.")
+
+        return {"is_snapshot_saved": True}
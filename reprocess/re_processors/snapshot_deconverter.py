@@ -0,0 +1,39 @@
+import os
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_processors.json_deconverter import JsonDeconverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.snapshot_format import read_snapshot
+
+
+class SnapshotDeconverter(ReProcessor):
+    """
+    A class that populates the repository container from a binary snapshot written by `SnapshotConverter`.
+
+    The result is the same as loading `data.json` with `JsonDeconverter`.
+    """
+
+    def __init__(self, class_map: dict = {}, **kwargs):
+        """
+        :param class_map: A dictionary mapping class names to their corresponding classes,
+            used for attributes stored as JSON inside the snapshot (see `JsonDeconverter`).
+        """
+        self.json_deconverter = JsonDeconverter(class_map)
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Loads `<db_path>/<repo_name>/data.snapshot` into the container.
+
+        :param repository_container: An instance of ReContainer to be populated with data from the snapshot.
+        """
+        snapshot_path = os.path.join(repository_container.db_path,
+                                     repository_container.repo_name,
+                                     "data.snapshot")
+        with open(snapshot_path, "rb") as file:
+            data = file.read()
+
+        class_map = self.json_deconverter.class_map
+        return read_snapshot(
+            data, lambda value: self.json_deconverter.dict_to_class(
+                value, class_map))
@@ -0,0 +1,52 @@
+import os
+import json
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_processors.json_converter import JsonConverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.sqlite_storage import connect, write_graph
+
+
+class SqliteConverter(ReProcessor):
+    """
+    A class that saves the repository container into an SQLite database.
+
+    Components, files, links and external components are stored in indexed
+    tables of `<db_path>/<repo_name>/data.sqlite` (by component name, file,
+    type and by both ends of links). Saving a container into an existing
+    database only writes the rows that changed, so the result of
+    `GraphUpdater` is applied as a few row-level changes instead of rewriting
+    the whole graph. The database can be queried without loading the
+    repository with `reprocess.utils.sqlite_storage.SqliteGraph`.
+    """
+
+    def __init__(self, **kwargs):
+        self.json_converter = JsonConverter()
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Writes the attributes of the container to `<db_path>/<repo_name>/data.sqlite`.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        database_path = os.path.join(repository_container.db_path,
+                                     repository_container.repo_name,
+                                     "data.sqlite")
+        directory = os.path.dirname(database_path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        encoder = json.JSONEncoder(separators=(",", ":"),
+                                   default=self.json_converter.set_default)
+        connection = connect(database_path)
+        try:
+            stats = write_graph(connection, dict(vars(repository_container)),
+                                encoder.encode)
+        finally:
+            connection.close()
+        print(f"The graph was saved to {database_path} "
+              f"({stats['written']} rows written, {stats['moved']} moved, "
+              f"{stats['deleted']} deleted).")
+
+        return {"is_sqlite_saved": True}
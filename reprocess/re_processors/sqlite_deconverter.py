@@ -0,0 +1,43 @@
+import os
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_processors.json_deconverter import JsonDeconverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.sqlite_storage import connect, read_graph
+
+
+class SqliteDeconverter(ReProcessor):
+    """
+    A class that populates the repository container from an SQLite database written by `SqliteConverter`.
+
+    The result is the same as loading `data.json` with `JsonDeconverter`.
+    """
+
+    def __init__(self, class_map: dict = {}, **kwargs):
+        """
+        :param class_map: A dictionary mapping class names to their corresponding classes,
+            used for attributes stored as JSON in the database (see `JsonDeconverter`).
+        """
+        self.json_deconverter = JsonDeconverter(class_map)
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Loads `<db_path>/<repo_name>/data.sqlite` into the container.
+
+        :param repository_container: An instance of ReContainer to be populated with data from the database.
+        """
+        database_path = os.path.join(repository_container.db_path,
+                                     repository_container.repo_name,
+                                     "data.sqlite")
+        if not os.path.exists(database_path):
+            raise FileNotFoundError(database_path)
+
+        class_map = self.json_deconverter.class_map
+        connection = connect(database_path)
+        try:
+            return read_graph(
+                connection, lambda value: self.json_deconverter.dict_to_class(
+                    value, class_map))
+        finally:
+            connection.close()
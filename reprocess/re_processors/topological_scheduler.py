@@ -0,0 +1,28 @@
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.graph_query import get_component_graph
+
+
+class TopologicalScheduler(ReProcessor):
+    """
+    A class that orders components bottom-up, dependencies first.
+
+    Cycles of `linked_component_ids` are collapsed into strongly connected
+    components, and the resulting DAG is split into levels. The container
+    gets `dependency_levels`: a list of levels, each a list of groups of
+    component ids. Every dependency of a group lies in an earlier level or
+    in the group itself, so the groups of a level can be processed in
+    parallel, e.g. summarizing leaves before the components using them.
+    """
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Computes the levels of the container's component graph.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        graph = get_component_graph(repository_container)
+
+        return {"dependency_levels": graph.topological_levels()}
@@ -0,0 +1,57 @@
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.vector_index import VectorIndex, get_vector_index_path
+
+
+class VectorIndexer(ReProcessor):
+    """
+    A class that maintains a persisted vector index of the components' code.
+
+    Components are embedded locally with a hashed n-gram vectorizer (or a
+    given one), nothing is sent to external services. The index is saved
+    to `<db_path>/<repo_name>/vector_index.npz` and is used by
+    `VectorSearch`. When an index already exists it is updated in place,
+    embedding only new and changed components. Once the index has
+    `ivf_min_size` components an IVF coarse quantizer is trained, so
+    searches score only the nearest clusters.
+    """
+
+    def __init__(self,
+                 index_path: Optional[str] = None,
+                 vectorizer=None,
+                 ivf_min_size: int = 20000,
+                 n_lists: Optional[int] = None,
+                 **kwargs):
+        """
+        :param index_path: Path of the index; by default `<db_path>/<repo_name>/vector_index.npz`.
+        :param vectorizer: Object with `transform(texts)` and `config`; by default `HashingVectorizer()`.
+        :param ivf_min_size: Number of components from which the quantizer is trained.
+        :param n_lists: Number of clusters of the quantizer; by default about the square root of the size.
+        """
+        self.index_path = index_path
+        self.vectorizer = vectorizer
+        self.ivf_min_size = ivf_min_size
+        self.n_lists = n_lists
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Builds or updates the vector index of the container and saves it.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        index_path = self.index_path or get_vector_index_path(
+            repository_container.db_path, repository_container.repo_name)
+        index = VectorIndex.load(index_path, self.vectorizer) or VectorIndex(
+            self.vectorizer)
+        stats = index.update(repository_container.code_components)
+        if index.centroids is None and len(index) >= self.ivf_min_size:
+            index.train(self.n_lists)
+        index.save(index_path)
+        print(f"The vector index was saved to {index_path} "
+              f"({stats['added']} components embedded, "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged).")
+
+        return {"is_vector_indexed": True}
@@ -0,0 +1,66 @@
+from typing import Optional
+from reprocess.re_processors.processor import ReProcessor
+from reprocess.re_container import ReContainer
+from reprocess.utils.vector_index import VectorIndex, get_vector_index_path, load_vector_index
+
+
+class VectorSearch(ReProcessor):
+    """
+    Finds the components whose code is most similar to a piece of code or text.
+
+    The query is embedded like the components and compared with the index
+    written by `VectorIndexer` by cosine similarity: exactly, with batched
+    matrix products, or through the IVF quantizer when the index has one.
+    Components missing from a stale index are embedded for the query only,
+    leaving the loaded index untouched; without a saved index one is built
+    in memory. Like `CodeSearch`, the
+    found components are saved in the container under the query, most
+    similar first.
+    """
+
+    def __init__(self,
+                 query: str,
+                 k: int = 10,
+                 nprobe: int = 8,
+                 exact: bool = False,
+                 index_path: Optional[str] = None,
+                 vectorizer=None,
+                 **kwargs):
+        """
+        :param query: Code (or text) to find similar components for.
+        :param k: Number of components to find.
+        :param nprobe: Number of quantizer clusters to score.
+        :param exact: Whether to score all components even if the index has a quantizer.
+        :param index_path: Path of the index; by default `<db_path>/<repo_name>/vector_index.npz`.
+        :param vectorizer: The vectorizer the index was built with; by default `HashingVectorizer()`.
+        """
+        self.query = query
+        self.k = k
+        self.nprobe = None if exact else nprobe
+        self.index_path = index_path
+        self.vectorizer = vectorizer
+
+    def __call__(self,
+                 repository_container: ReContainer,
+                 inplace: bool = True):
+        """
+        Searches the container's components similar to the query.
+
+        :param repository_container: An instance of ReContainer containing the repository's data.
+        """
+        components = repository_container.code_components
+        index_path = self.index_path or get_vector_index_path(
+            repository_container.db_path, repository_container.repo_name)
+        index = load_vector_index(index_path, self.vectorizer)
+        if index is None:
+            index = VectorIndex(self.vectorizer)
+            index.update(components)
+        found = index.search_components(components, [self.query], self.k,
+                                        self.nprobe)[0]
+
+        return {
+            self.query: [
+                repository_container.get_component(component_id)
+                for component_id, _ in found
+            ]
+        }
@@ -0,0 +1,472 @@
+"""
+Resident query server keeping repository graphs loaded in memory.
+
+Loading `data.json` of a large repository takes far longer than answering
+a query about it, so the server loads every repository once and answers
+name searches, component fetches, neighbour and closure queries over
+localhost HTTP or a Unix socket. Repositories are reloaded in the
+background when their saved data changes.
+
+Usage:
+    python -m reprocess.requests_handling.query_server --db-path db --port 8765
+    python -m reprocess.requests_handling.query_server --db-path db --socket /tmp/reprocess.sock
+"""
+import os
+import re
+import json
+import socket
+import logging
+import argparse
+import threading
+import http.client
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+from reprocess.re_container import ReContainer
+from reprocess.re_processors.json_deconverter import JsonDeconverter
+from reprocess.re_processors.snapshot_deconverter import SnapshotDeconverter
+from reprocess.utils.graph_query import DIRECTIONS, ComponentGraph
+from reprocess.utils.name_index import NameIndex
+
+# Saved repository data the server can load, with the processor loading it
+SOURCES = (("data.snapshot", SnapshotDeconverter), ("data.json",
+                                                    JsonDeconverter))
+
+
+def find_source(db_path: str, repo_name: str) -> Optional[tuple]:
+    """
+    Returns (path, modification time, deconverter class) of the most
+    recently saved data of a repository, or None if there is none.
+    """
+    found = None
+    for file_name, deconverter in SOURCES:
+        path = os.path.join(db_path, repo_name, file_name)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        if found is None or mtime_ns > found[1]:
+            found = (path, mtime_ns, deconverter)
+    return found
+
+
+def _to_json(value):
+    if isinstance(value, (set, frozenset, tuple)):
+        return sorted(value) if isinstance(value,
+                                           (set, frozenset)) else list(value)
+    if hasattr(value, "__dict__"):
+        return vars(value)
+    return str(value)
+
+
+class LoadedRepository:
+    """
+    A repository loaded by the server, with the indexes queries need.
+
+    It is not modified after loading (except for the memoized closures of
+    the graph), so any number of threads can query it; a reload builds a
+    new instance and replaces the old one.
+    """
+
+    def __init__(self, repo_name: str, source_path: str, mtime_ns: int,
+                 container: ReContainer):
+        self.repo_name = repo_name
+        self.source_path = source_path
+        self.mtime_ns = mtime_ns
+        self.components = list(container.code_components)
+        self.file_paths = {
+            file.file_id: file.file_path
+            for file in getattr(container, "files", [])
+        }
+        self.graph = ComponentGraph.from_components(self.components)
+        self.name_index = NameIndex(
+            [component.component_name for component in self.components])
+
+    def summary(self, node: int) -> dict:
+        component = self.components[node]
+        return {
+            "component_id": component.component_id,
+            "component_name": component.component_name,
+            "component_type": getattr(component, "component_type", None),
+            "file_path": self.file_paths.get(component.file_id)
+        }
+
+    def info(self) -> dict:
+        return {
+            "repo_name": self.repo_name,
+            "source": self.source_path,
+            "mtime_ns": self.mtime_ns,
+            "components": len(self.components),
+            "files": len(self.file_paths),
+            "links": self.graph.edge_count
+        }
+
+    def search(self, pattern: str, limit: int = 100) -> List[dict]:
+        """Components whose names match the regular expression `pattern`."""
+        try:
+            positions = self.name_index.search([pattern])[pattern]
+        except re.error as e:
+            raise ValueError(f"Invalid pattern {pattern!r}: {e}")
+        return [self.summary(node) for node in positions[:limit]]
+
+    def component(self, component_id: str) -> dict:
+        """All attributes of a component, with the path of its file."""
+        node = self.graph.index(component_id)
+        component = dict(vars(self.components[node]))
+        component["file_path"] = self.file_paths.get(component.get("file_id"))
+        return component
+
+    def neighbours(self, component_id: str, direction: str = "out") -> list:
+        """Components a component links to ("out") or that link to it ("in")."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        node = self.graph.index(component_id)
+        return [
+            self.summary(neighbour)
+            for neighbour in self.graph.neighbours(node, direction)
+        ]
+
+    def closure(self,
+                component_id: str,
+                direction: str = "out",
+                max_depth: Optional[int] = None) -> list:
+        """Components transitively reachable from a component, nearest first."""
+        return [
+            dict(self.summary(self.graph.positions[reached_id]), depth=depth)
+            for reached_id, depth in self.graph.traverse([component_id],
+                                                         direction, max_depth)
+        ]
+
+
+class QueryServer:
+    """
+    Keeps repositories loaded and answers queries about them.
+
+    Repositories are read from `<db_path>/<repo_name>/`, from `data.snapshot`
+    or `data.json`, whichever was saved last. A watcher thread checks the
+    modification times every `poll_interval` seconds and reloads changed
+    repositories in the background; queries keep being answered from the
+    previous version until the new one replaces it. Requests are served by
+    a thread each.
+
+    Queries (GET, answered with JSON):
+        /repos
+        /repos/<repo>/search?pattern=<regex>&limit=<n>
+        /repos/<repo>/components/<component id>
+        /repos/<repo>/neighbors/<component id>?direction=out|in
+        /repos/<repo>/closure/<component id>?direction=out|in&max_depth=<n>
+    """
+
+    def __init__(self,
+                 db_path: str,
+                 repo_names: Optional[Sequence[str]] = None,
+                 poll_interval: float = 2.0):
+        """
+        :param db_path: Directory the repositories were saved to.
+        :param repo_names: Repositories to serve; by default all saved ones in `db_path`.
+        :param poll_interval: Seconds between checks for changed repository data.
+        """
+        self.db_path = db_path
+        self.repo_names = list(repo_names) if repo_names is not None else [
+            name for name in sorted(os.listdir(db_path))
+            if find_source(db_path, name) is not None
+        ]
+        self.poll_interval = poll_interval
+        self.repositories: Dict[str, LoadedRepository] = {}
+        self._reload_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._server = None
+        self._threads: List[threading.Thread] = []
+        self.refresh()
+
+    def load(self, repo_name: str) -> Optional[LoadedRepository]:
+        """Loads the most recently saved data of a repository."""
+        source = find_source(self.db_path, repo_name)
+        if source is None:
+            return None
+        path, mtime_ns, deconverter = source
+        container = deconverter()(ReContainer(repo_name, "", self.db_path))
+        return LoadedRepository(repo_name, path, mtime_ns, container)
+
+    def refresh(self) -> List[str]:
+        """
+        Reloads repositories whose saved data changed since they were loaded.
+
+        :return: Names of the reloaded repositories.
+        """
+        reloaded = []
+        with self._reload_lock:
+            for repo_name in self.repo_names:
+                source = find_source(self.db_path, repo_name)
+                loaded = self.repositories.get(repo_name)
+                if source is None or (loaded is not None and
+                                      (loaded.source_path, loaded.mtime_ns)
+                                      == source[:2]):
+                    continue
+                try:
+                    repository = self.load(repo_name)
+                except Exception as e:
+                    # e.g. data written by another tool without an atomic rename
+                    logging.error(f"Failed to load {repo_name}: {e}")
+                    continue
+                self.repositories[repo_name] = repository
+                reloaded.append(repo_name)
+        return reloaded
+
+    def repository(self, repo_name: str) -> LoadedRepository:
+        repository = self.repositories.get(repo_name)
+        if repository is None:
+            raise KeyError(f"Unknown repository: {repo_name}")
+        return repository
+
+    def query(self, path: str, params: Optional[dict] = None):
+        """
+        Answers a query given as a URL path (see the class docstring).
+
+        Raises:
+            KeyError: For unknown repositories, components or queries.
+            ValueError: For invalid parameters.
+        """
+        params = params or {}
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if parts == ["repos"]:
+            return [
+                repository.info()
+                for repository in list(self.repositories.values())
+            ]
+        if len(parts) < 3 or parts[0] != "repos":
+            raise KeyError(f"Unknown query: {path}")
+        repository = self.repository(parts[1])
+        kind, arguments = parts[2], parts[3:]
+        if kind == "search" and not arguments:
+            if "pattern" not in params:
+                raise ValueError("The pattern parameter is required")
+            return repository.search(params["pattern"],
+                                     int(params.get("limit", 100)))
+        if len(arguments) == 1:
+            component_id = arguments[0]
+            direction = params.get("direction", "out")
+            if kind == "components":
+                return repository.component(component_id)
+            if kind == "neighbors":
+                return repository.neighbours(component_id, direction)
+            if kind == "closure":
+                max_depth = params.get("max_depth")
+                return repository.closure(
+                    component_id, direction,
+                    int(max_depth) if max_depth is not None else None)
+        raise KeyError(f"Unknown query: {path}")
+
+    def _watch(self):
+        while not self._stopped.wait(self.poll_interval):
+            for repo_name in self.refresh():
+                logging.info(f"Reloaded {repo_name}")
+
+    def start(self,
+              host: str = "127.0.0.1",
+              port: int = 8765,
+              socket_path: Optional[str] = None):
+        """
+        Starts serving (and watching for changes) in background threads.
+
+        :param socket_path: Serve on this Unix socket instead of `host`:`port`.
+        """
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self._server = _UnixHTTPServer(socket_path, _QueryHandler)
+        else:
+            self._server = _HTTPServer((host, port), _QueryHandler)
+        self._server.query_server = self
+        self._stopped.clear()
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+            threading.Thread(target=self._watch, daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def address(self):
+        """The address served on: (host, port) or the socket path."""
+        return self._server.server_address if self._server else None
+
+    def stop(self):
+        """Stops serving and watching."""
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if isinstance(self._server, _UnixHTTPServer) and os.path.exists(
+                    self._server.server_address):
+                os.remove(self._server.server_address)
+            self._server = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # the default backlog of 5 refuses bursts of concurrent clients
+    request_queue_size = 128
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn,
+                      socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {
+            key: values[-1]
+            for key, values in parse_qs(url.query).items()
+        }
+        try:
+            status, result = 200, self.server.query_server.query(
+                url.path, params)
+        except KeyError as e:
+            status, result = 404, {"error": str(e.args[0] if e.args else e)}
+        except ValueError as e:
+            status, result = 400, {"error": str(e)}
+        body = json.dumps(result, default=_to_json).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "local"
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class QueryClient:
+    """Sends queries to a running `QueryServer`."""
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 8765,
+                 socket_path: Optional[str] = None,
+                 timeout: float = 30.0):
+        """
+        :param socket_path: Connect to this Unix socket instead of `host`:`port`.
+        """
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def get(self, path: str, **params):
+        """
+        Sends a query and returns the decoded answer.
+
+        Raises:
+            KeyError: If the server answered 404.
+            ValueError: If the server rejected the query otherwise.
+        """
+        if self.socket_path is not None:
+            connection = _UnixHTTPConnection(self.socket_path, self.timeout)
+        else:
+            connection = http.client.HTTPConnection(self.host,
+                                                    self.port,
+                                                    timeout=self.timeout)
+        query = {
+            key: value
+            for key, value in params.items() if value is not None
+        }
+        try:
+            connection.request(
+                "GET", path + (f"?{urlencode(query)}" if query else ""))
+            response = connection.getresponse()
+            result = json.loads(response.read())
+        finally:
+            connection.close()
+        if response.status == 404:
+            raise KeyError(result["error"])
+        if response.status != 200:
+            raise ValueError(result["error"])
+        return result
+
+    def repos(self) -> list:
+        return self.get("/repos")
+
+    def search(self, repo_name: str, pattern: str, limit: int = 100) -> list:
+        return self.get(f"/repos/{quote(repo_name, safe='')}/search",
+                        pattern=pattern,
+                        limit=limit)
+
+    def component(self, repo_name: str, component_id: str) -> dict:
+        return self.get(f"/repos/{quote(repo_name, safe='')}/components/"
+                        f"{quote(component_id, safe='')}")
+
+    def neighbors(self,
+                  repo_name: str,
+                  component_id: str,
+                  direction: str = "out") -> list:
+        return self.get(
+            f"/repos/{quote(repo_name, safe='')}/neighbors/"
+            f"{quote(component_id, safe='')}",
+            direction=direction)
+
+    def closure(self,
+                repo_name: str,
+                component_id: str,
+                direction: str = "out",
+                max_depth: Optional[int] = None) -> list:
+        return self.get(
+            f"/repos/{quote(repo_name, safe='')}/closure/"
+            f"{quote(component_id, safe='')}",
+            direction=direction,
+            max_depth=max_depth)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--db-path", required=True)
+    parser.add_argument(
+        "--repo",
+        action="append",
+        dest="repos",
+        help="Repository to serve (repeatable); all by default.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Serve on a Unix socket instead.")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    server = QueryServer(args.db_path, args.repos, args.poll_interval)
+    server.start(args.host, args.port, args.socket)
+    print(f"Serving {', '.join(server.repositories) or 'no repositories'} "
+          f"on {server.address}")
+    try:
+        server._stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
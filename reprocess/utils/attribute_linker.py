@@ -16,6 +16,7 @@ class AttributeLinker:
         self.cls_to_attrs = dict()
         self.attrs_to_class = dict()
         self.registered_cls = set()
+        self.deferred_cls = dict()
 
     def __call__(self, cls_name, attr_list):
         # update register of some class
@@ -31,7 +32,17 @@ class AttributeLinker:
                 self.attrs_to_class[attr_name] = []
             self.attrs_to_class[attr_name].append(cls_name)
 
+    def defer(self, cls_name, attrs_getter):
+        # register a class whose attributes are computed only when needed
+        self.deferred_cls[cls_name] = attrs_getter
+
+    def resolve_deferred(self):
+        deferred_cls, self.deferred_cls = self.deferred_cls, dict()
+        for cls_name, attrs_getter in deferred_cls.items():
+            self(cls_name, attrs_getter())
+
     def get_classes_by_attrs(self, attr_list):
+        self.resolve_deferred()
         assert all(
             [
                 attr_name in self.attrs_to_class.keys()
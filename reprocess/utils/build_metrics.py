@@ -0,0 +1,132 @@
+import os
+import math
+from typing import Dict, List, Optional
+
+LANGUAGE_BY_EXTENSION = {
+    ".py": "python",
+    ".c": "c",
+    ".cpp": "cpp",
+    ".java": "java",
+    ".go": "go",
+    ".js": "javascript",
+    ".ts": "typescript"
+}
+
+# Stages that are not bound to a single language are accounted under this key
+ALL_LANGUAGES = "all"
+
+
+def get_language(file_path: str) -> str:
+    """Returns the language name of a code file judging by its extension."""
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(file_path)[1], "unknown")
+
+
+class BuildMetrics:
+    """
+    Collects stage-level metrics of a graph build or update.
+
+    For every stage (file discovery, parsing, name extraction, component filling,
+    file analysis, linking, residual computation, ...) the time spent and the
+    number of handled items are accumulated per language. Time spent on each
+    individual file is kept as well, which gives per-language histograms and
+    the slowest files of the run.
+
+    Attributes:
+        timers (Dict[str, Dict[str, float]]): Seconds spent, by stage and language.
+        counters (Dict[str, Dict[str, int]]): Items (files or components) handled, by stage and language.
+        file_times (Dict[str, float]): Seconds spent on each file over all per-file stages.
+        file_components (Dict[str, int]): Number of components extracted from each file.
+        total_time (float): Wall time of the whole run.
+    """
+
+    def __init__(self) -> None:
+        self.timers = {}
+        self.counters = {}
+        self.file_times = {}
+        self.file_components = {}
+        self.total_time = 0.0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BuildMetrics):
+            return vars(self) == vars(other)
+        return False
+
+    def add_time(self,
+                 stage: str,
+                 seconds: float,
+                 language: str = ALL_LANGUAGES,
+                 file_path: Optional[str] = None) -> None:
+        stage_timers = self.timers.setdefault(stage, {})
+        stage_timers[language] = stage_timers.get(language, 0.0) + seconds
+        if file_path is not None:
+            self.file_times[file_path] = self.file_times.get(file_path,
+                                                             0.0) + seconds
+
+    def add_count(self,
+                  stage: str,
+                  count: int = 1,
+                  language: str = ALL_LANGUAGES) -> None:
+        stage_counters = self.counters.setdefault(stage, {})
+        stage_counters[language] = stage_counters.get(language, 0) + count
+
+    def stage_time(self, stage: str) -> float:
+        """Returns the time spent on a stage summed over all languages."""
+        return sum(self.timers.get(stage, {}).values())
+
+    def slowest_files(self, n: int = 10) -> List[dict]:
+        """
+        Returns the `n` files on which the most time was spent.
+
+        Returns:
+            List[dict]: Entries with `file_path`, `language`, `seconds` and `components`, slowest first.
+        """
+        slowest = sorted(self.file_times.items(),
+                         key=lambda item: item[1],
+                         reverse=True)[:n]
+        return [{
+            "file_path": file_path,
+            "language": get_language(file_path),
+            "seconds": seconds,
+            "components": self.file_components.get(file_path, 0)
+        } for file_path, seconds in slowest]
+
+    def histograms(self) -> Dict[str, dict]:
+        """
+        Builds per-language histograms of file processing time and file size in components.
+
+        Time buckets are powers of two in milliseconds (`<=1ms`, `<=2ms`, ...),
+        component buckets are powers of two as well.
+
+        Returns:
+            Dict[str, dict]: For each language, `file_time_ms` and `components_per_file` histograms.
+        """
+        histograms = {}
+        for file_path, seconds in self.file_times.items():
+            language_histograms = histograms.setdefault(
+                get_language(file_path), {
+                    "file_time_ms": {},
+                    "components_per_file": {}
+                })
+            time_bucket = f"<={self._bucket(seconds * 1000)}ms"
+            component_bucket = f"<={self._bucket(self.file_components.get(file_path, 0))}"
+            for name, bucket in (("file_time_ms", time_bucket),
+                                 ("components_per_file", component_bucket)):
+                language_histograms[name][
+                    bucket] = language_histograms[name].get(bucket, 0) + 1
+        return histograms
+
+    @staticmethod
+    def _bucket(value: float) -> int:
+        if value <= 1:
+            return 1
+        return 2**math.ceil(math.log2(value))
+
+    def to_dict(self, slowest_n: int = 10) -> dict:
+        """Returns a JSON-serialisable summary of all collected metrics."""
+        return {
+            "total_time": self.total_time,
+            "timers": self.timers,
+            "counters": self.counters,
+            "histograms": self.histograms(),
+            "slowest_files": self.slowest_files(slowest_n)
+        }
@@ -0,0 +1,85 @@
+import os
+import json
+import uuid
+import marshal
+import hashlib
+from types import CodeType
+from typing import Optional
+
+
+def get_cache_dir() -> str:
+    """
+    Returns the directory where results of `__call__` source analysis are cached.
+
+    The location can be overridden with the `REPROCESS_CACHE_DIR` environment
+    variable; otherwise `$XDG_CACHE_HOME/reprocess` (or `~/.cache/reprocess`) is used.
+
+    Returns:
+        str: Path to the cache directory.
+    """
+    cache_root = os.getenv('REPROCESS_CACHE_DIR')
+    if not cache_root:
+        xdg_cache = os.getenv('XDG_CACHE_HOME') or os.path.join(
+            os.path.expanduser('~'), '.cache')
+        cache_root = os.path.join(xdg_cache, 'reprocess')
+    return os.path.join(cache_root, 'call_analysis')
+
+
+def code_hash(code: CodeType) -> str:
+    """
+    Computes a hash of a code object that is stable across interpreter runs.
+
+    The built-in `hash()` of a code object depends on string hash
+    randomization, so the marshalled representation is hashed instead.
+    It changes whenever the body, constants, names or location of the function change.
+
+    Args:
+        code (CodeType): The code object to hash.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest.
+    """
+    return hashlib.sha256(marshal.dumps(code)).hexdigest()
+
+
+def load_analysis(key: str) -> Optional[dict]:
+    """
+    Loads a cached analysis result.
+
+    Args:
+        key (str): Hash of the analysed code object.
+
+    Returns:
+        Optional[dict]: The cached result, or None if it is absent or unreadable.
+    """
+    path = os.path.join(get_cache_dir(), f"{key}.json")
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_analysis(key: str, analysis: dict) -> None:
+    """
+    Saves an analysis result to the cache.
+
+    The file is written under a temporary name and then renamed, so concurrent
+    imports never observe a partially written entry. Failures are ignored:
+    the cache is an optimisation and must never break processor usage.
+
+    Args:
+        key (str): Hash of the analysed code object.
+        analysis (dict): JSON-serialisable analysis result.
+    """
+    cache_dir = get_cache_dir()
+    path = os.path.join(cache_dir, f"{key}.json")
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, 'w') as file:
+            json.dump(analysis, file)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,426 @@
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+from typing import Callable, Dict, List, Optional
+from reprocess.utils.snapshot_format import read_snapshot, write_snapshot
+from reprocess.utils.shard_storage import append_line, write_atomic
+
+LOG_NAME = "journal.jsonl"
+# Digests of the last saved state, which new states are compared with
+STATE_NAME = "state.json"
+_BASE_PATTERN = re.compile(r"^base-(\d+)\.snapshot$")
+
+# Lists of container objects tracked one by one, with their id attribute
+TRACKED_LISTS = {"code_components": "component_id", "files": "file_id"}
+
+
+def _base_name(seq: int) -> str:
+    return f"base-{seq:010d}.snapshot"
+
+
+def _base_info_path(directory: str, seq: int) -> str:
+    return os.path.join(directory, f"base-{seq:010d}.json")
+
+
+def list_bases(directory: str) -> List[int]:
+    """Returns sequence numbers of the base snapshots in the directory, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        int(match.group(1))
+        for match in map(_BASE_PATTERN.match, os.listdir(directory)) if match)
+
+
+def read_records(directory: str) -> List[dict]:
+    """
+    Reads delta records of the journal in order.
+
+    A torn last line left by an interrupted append is ignored.
+    """
+    records = []
+    try:
+        with open(os.path.join(directory, LOG_NAME), "rb") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def append_record(directory: str, record: dict):
+    """Appends a delta record to the journal and syncs it to disk."""
+    append_line(os.path.join(directory, LOG_NAME),
+                json.dumps(record, separators=(",", ":")).encode("utf-8"))
+
+
+def write_base(directory: str, attributes: dict, seq: int, info: dict,
+               encode_default: Callable):
+    """Atomically writes a base snapshot holding the state after record `seq`."""
+    os.makedirs(directory, exist_ok=True)
+    write_atomic(_base_info_path(directory, seq),
+                 json.dumps(dict(info, seq=seq)).encode("utf-8"))
+    path = os.path.join(directory, _base_name(seq))
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            write_snapshot(file, attributes, encode_default)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_base(directory: str, seq: int, restore: Callable) -> dict:
+    with open(os.path.join(directory, _base_name(seq)), "rb") as file:
+        return read_snapshot(file.read(), restore)
+
+
+def read_base_info(directory: str, seq: int) -> dict:
+    try:
+        with open(_base_info_path(directory, seq)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {"seq": seq}
+
+
+def encode_values(attributes: dict, encode: Callable[[object],
+                                                     str]) -> Dict[str, dict]:
+    """Encodes tracked objects by id and other attributes by name for diffing."""
+    encoded = {"attributes": {}}
+    for key, value in attributes.items():
+        id_attribute = TRACKED_LISTS.get(key)
+        if id_attribute is not None and value is not None:
+            encoded[key] = {
+                getattr(element, id_attribute): encode(element)
+                for element in value
+            }
+        elif key == "external_components" and value is not None:
+            encoded[key] = dict(value)
+        else:
+            encoded["attributes"][key] = encode(value)
+    return encoded
+
+
+def _digest(data: str) -> str:
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def state_digests(attributes: dict, encoded: dict, order: List[str],
+                  seq: int) -> dict:
+    """
+    Summarizes a state encoded with `encode_values` for later diffing.
+
+    Tracked objects and plain attributes are kept as digests of their
+    encoding, in the order of the container; external components and the
+    links of components are kept as they are, since deltas list them.
+
+    :param seq: Sequence number of the record (or base) holding the state.
+    """
+    state = {
+        "seq": seq,
+        "order": order,
+        "attributes": {
+            key: _digest(data)
+            for key, data in encoded["attributes"].items()
+        },
+        "external_components": encoded.get("external_components", {}),
+        "links": {
+            component.component_id: sorted(component.linked_component_ids)
+            for component in attributes.get("code_components") or ()
+            if getattr(component, "linked_component_ids", None)
+        }
+    }
+    for key in TRACKED_LISTS:
+        if key in encoded:
+            state[key] = {
+                element_id: _digest(data)
+                for element_id, data in encoded[key].items()
+            }
+    return state
+
+
+def read_state(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, STATE_NAME)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_state(directory: str, state: dict):
+    write_atomic(os.path.join(directory, STATE_NAME),
+                 json.dumps(state, separators=(",", ":")).encode("utf-8"))
+
+
+def diff_states(old: dict, new: dict, order: List[str]) -> dict:
+    """
+    Computes a delta record between the last saved state, summarized by
+    `state_digests`, and a new state encoded with `encode_values`.
+
+    The record lists added (with their positions), modified and removed
+    components and files (as encoded objects or ids), changed external
+    components, added and removed edges between components and changed
+    plain attributes. If objects kept from the old state changed their
+    relative order, the new order of ids is recorded as well.
+    """
+    record = {"order": order}
+    changed_ids = set()
+    for key in TRACKED_LISTS:
+        before, after = old.get(key, {}), new.get(key, {})
+        added_positions, added, modified = [], [], []
+        for position, (element_id, data) in enumerate(after.items()):
+            if element_id not in before:
+                added_positions.append(position)
+                added.append(json.loads(data))
+            elif before[element_id] != _digest(data):
+                modified.append(json.loads(data))
+            else:
+                continue
+            if key == "code_components":
+                changed_ids.add(element_id)
+        removed = [
+            element_id for element_id in before if element_id not in after
+        ]
+        record[key] = {
+            "added": added,
+            "added_positions": added_positions,
+            "modified": modified,
+            "removed": removed
+        }
+        if [element_id for element_id in before if element_id in after
+            ] != [element_id for element_id in after if element_id in before]:
+            record[key]["ids"] = list(after)
+        if key == "code_components":
+            changed_ids.update(removed)
+
+    old_links = old.get("links", {})
+    old_edges = {(component_id, target)
+                 for component_id in changed_ids
+                 for target in old_links.get(component_id, ())}
+    new_edges = set()
+    for data in (record["code_components"]["added"] +
+                 record["code_components"]["modified"]):
+        for target in data.get("linked_component_ids") or ():
+            new_edges.add((data["component_id"], target))
+    record["edges"] = {
+        "added": sorted(map(list, new_edges - old_edges)),
+        "removed": sorted(map(list, old_edges - new_edges))
+    }
+    before = old.get("external_components", {})
+    after = new.get("external_components", {})
+    record["external_components"] = {
+        "set": {
+            name: component_id
+            for name, component_id in after.items()
+            if before.get(name) != component_id
+        },
+        "removed": [name for name in before if name not in after]
+    }
+    record["attributes"] = {
+        key: json.loads(data)
+        for key, data in new["attributes"].items()
+        if old["attributes"].get(key) != _digest(data)
+    }
+    return record
+
+
+def is_empty(record: dict, previous_order: List[str]) -> bool:
+    """Checks whether a delta record changes nothing compared to the previous state."""
+    return record["order"] == previous_order and not (
+        any(record[key][change] for key in TRACKED_LISTS
+            for change in ("added", "modified", "removed")) or
+        any("ids" in record[key]
+            for key in TRACKED_LISTS) or record["external_components"]["set"]
+        or record["external_components"]["removed"] or record["attributes"])
+
+
+def apply_record(attributes: dict, record: dict, restore: Callable) -> dict:
+    """
+    Applies a delta record to container attributes and returns the new attributes.
+
+    Modified objects keep their position and added ones are inserted at
+    the positions they had in the saved container, so the replayed lists
+    keep the saved order.
+    """
+    result = {}
+    for key in record["order"]:
+        id_attribute = TRACKED_LISTS.get(key)
+        if id_attribute is not None and key not in record["attributes"]:
+            changes = record[key]
+            removed = set(changes["removed"])
+            modified = {}
+            for data in changes["modified"]:
+                element = restore(dict(data))
+                modified[getattr(element, id_attribute)] = element
+            kept = iter([
+                modified.get(getattr(element, id_attribute), element)
+                for element in attributes.get(key) or ()
+                if getattr(element, id_attribute) not in removed
+            ])
+            added = [restore(dict(data)) for data in changes["added"]]
+            positions = changes.get("added_positions")
+            if positions is None:
+                # records written before positions were kept
+                elements = list(kept) + added
+            else:
+                elements = []
+                for position, element in zip(positions, added):
+                    while len(elements) < position:
+                        elements.append(next(kept))
+                    elements.append(element)
+                elements.extend(kept)
+            if "ids" in changes:
+                by_id = {
+                    getattr(element, id_attribute): element
+                    for element in elements
+                }
+                elements = [by_id[element_id] for element_id in changes["ids"]]
+            result[key] = elements
+        elif key == "external_components" and key not in record["attributes"]:
+            external_components = dict(attributes.get(key) or {})
+            for name in record[key]["removed"]:
+                external_components.pop(name, None)
+            external_components.update(record[key]["set"])
+            result[key] = external_components
+        elif key in record["attributes"]:
+            result[key] = restore(record["attributes"][key])
+        else:
+            result[key] = attributes[key]
+    return result
+
+
+def load_state(directory: str,
+               restore: Callable,
+               commit: Optional[str] = None,
+               seq: Optional[int] = None) -> dict:
+    """
+    Restores container attributes from the newest base and the journal.
+
+    :param directory: Journal directory of one repository.
+    :param restore: Converts JSON-decoded values back to objects.
+    :param commit: Restores the state recorded for this commit (a prefix of the hash is enough).
+    :param seq: Restores the state after the record with this sequence number.
+    :return: Attributes of the repository container.
+    """
+    bases = list_bases(directory)
+    if not bases:
+        raise FileNotFoundError(f"No journal base in {directory}")
+    records = read_records(directory)
+
+    if commit is not None:
+        candidates = [
+            record["seq"] for record in records
+            if (record.get("commit") or "").startswith(commit)
+        ]
+        candidates += [
+            base for base in bases
+            if (read_base_info(directory, base).get("commit") or ""
+                ).startswith(commit)
+        ]
+        if not candidates:
+            raise ValueError(f"Commit {commit} is not in the journal")
+        seq = max(candidates)
+
+    usable = [base for base in bases if seq is None or base <= seq]
+    if not usable:
+        raise ValueError(
+            f"State {seq} was compacted; the oldest base is {bases[0]}")
+    base = usable[-1]
+    attributes = read_base(directory, base, restore)
+    for record in records:
+        if record["seq"] <= base:
+            continue
+        if seq is not None and record["seq"] > seq:
+            break
+        attributes = apply_record(attributes, record, restore)
+    return attributes
+
+
+def compact(directory: str,
+            restore: Callable,
+            encode_default: Callable,
+            keep: int = 0) -> Optional[int]:
+    """
+    Folds journal records into a new base snapshot.
+
+    The newest `keep` records stay in the journal, so the states after them
+    remain readable; older records and bases are removed.
+
+    :return: Sequence number of the new base, or None if nothing was folded.
+    """
+    records = read_records(directory)
+    bases = list_bases(directory)
+    if not bases:
+        return None
+    pending = [record for record in records if record["seq"] > bases[-1]]
+    fold = pending[:len(pending) - keep] if keep else pending
+    if not fold:
+        return None
+
+    new_seq = fold[-1]["seq"]
+    attributes = load_state(directory, restore, seq=new_seq)
+    write_base(directory, attributes, new_seq, {
+        "commit": fold[-1].get("commit"),
+        "time": fold[-1].get("time")
+    }, encode_default)
+
+    # the new base is complete, so older records and bases can go
+    remaining = [record for record in records if record["seq"] > new_seq]
+    write_atomic(
+        os.path.join(directory, LOG_NAME), b"".join(
+            json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+            for record in remaining))
+    for old in bases:
+        if old < new_seq:
+            os.remove(os.path.join(directory, _base_name(old)))
+            if os.path.exists(_base_info_path(directory, old)):
+                os.remove(_base_info_path(directory, old))
+    return new_seq
+
+
+def last_seq(directory: str) -> int:
+    """
+    Returns the sequence number of the newest record or base.
+
+    Only the end of the journal is read, so the cost does not grow with
+    its history.
+    """
+    seq = max(list_bases(directory) + [0])
+    try:
+        with open(os.path.join(directory, LOG_NAME), "rb") as file:
+            position = file.seek(0, os.SEEK_END)
+            data, chunk = b"", 1 << 16
+            while position > 0:
+                size = min(chunk, position)
+                position -= size
+                file.seek(position)
+                data = file.read(size) + data
+                lines = data.split(b"\n")
+                # the first line may be cut by the chunk, the last one is
+                # empty or torn
+                for line in reversed(lines[1:-1] if position else lines[:-1]):
+                    try:
+                        return max(seq, json.loads(line)["seq"])
+                    except ValueError:
+                        continue
+                chunk *= 2
+    except FileNotFoundError:
+        pass
+    return seq
+
+
+def next_seq(directory: str) -> int:
+    return last_seq(directory) + 1
+
+
+def new_record(seq: int, commit: Optional[str], delta: dict) -> dict:
+    return dict({"seq": seq, "commit": commit, "time": time.time()}, **delta)
@@ -0,0 +1,342 @@
+import os
+import re
+import json
+import uuid
+import hashlib
+from typing import Dict, List, Optional, Sequence, Set
+from reprocess.utils.name_index import parse_pattern, postings_candidates, required_literals, trigrams
+from reprocess.utils.shard_storage import append_line, write_atomic
+
+CODE_INDEX_NAME = "code_index.json"
+CODE_INDEX_VERSION = 1
+
+
+def get_code_index_path(db_path: str, repo_name: str) -> str:
+    return os.path.join(db_path, repo_name, CODE_INDEX_NAME)
+
+
+def get_code_index_delta_path(path: str) -> str:
+    """Returns the path of the delta segments appended next to the index at `path`."""
+    return os.path.splitext(path)[0] + ".delta.jsonl"
+
+
+def code_hash(code: Optional[str]) -> str:
+    return hashlib.sha1((code or "").encode("utf-8")).hexdigest()[:16]
+
+
+def component_ids(components: Sequence) -> List[str]:
+    """
+    Ids of the components in order.
+
+    A lazily loaded list gives them from its index, without materializing
+    the components.
+    """
+    if hasattr(components, "field"):
+        return list(components.field("component_id"))
+    return [component.component_id for component in components]
+
+
+class CodeIndex:
+    """
+    Trigram index of `component_code` answering substring and regex queries.
+
+    Every indexed component is a document with a number; posting lists map
+    each trigram of the code to ascending document numbers. A query is
+    answered by intersecting the posting lists of the trigrams of its
+    literal parts, and only the candidates are checked against the code.
+
+    Updates are incremental: a changed or removed component leaves a
+    tombstone, and new or changed components are appended as new
+    documents, so only their code is split into trigrams. Posting lists are
+    rebuilt without tombstones once they make up half of the documents.
+
+    Saving is incremental as well: the documents added and tombstoned since
+    the last save are appended to the index as a delta segment, and the
+    whole index is only written again after `compact` or when the segments
+    grow to half of its size.
+    """
+
+    def __init__(self):
+        self.documents: List[Optional[str]] = []
+        self.hashes: List[Optional[str]] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.positions: Dict[str, int] = {}
+        # generation of the saved index the deltas belong to; None until the
+        # index is saved or loaded, and after `compact` renumbered documents
+        self._generation: Optional[str] = None
+        # documents [0, _saved) are in the saved index
+        self._saved = 0
+        self._removed_documents: List[int] = []
+        self._added_postings: Dict[str, List[int]] = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _add(self, component_id: str, code: Optional[str]):
+        document = len(self.documents)
+        self.documents.append(component_id)
+        self.hashes.append(code_hash(code))
+        self.positions[component_id] = document
+        track = self._generation is not None
+        for gram in trigrams(code or ""):
+            self.postings.setdefault(gram, []).append(document)
+            if track:
+                self._added_postings.setdefault(gram, []).append(document)
+
+    def _remove(self, component_id: str):
+        document = self.positions.pop(component_id)
+        self.documents[document] = None
+        self.hashes[document] = None
+        if document < self._saved:
+            self._removed_documents.append(document)
+
+    def update(self, components: Sequence) -> Dict[str, int]:
+        """
+        Brings the index in line with the given components.
+
+        Components are matched by id and by the hash of their code, so after
+        `GraphUpdater` only the components of changed files are re-indexed.
+
+        :return: Numbers of added, removed and unchanged components.
+        """
+        stats = {"added": 0, "removed": 0, "unchanged": 0}
+        # a lazily loaded list reads the code without building the component
+        get_code = getattr(
+            components, "get_code",
+            None) or (lambda position: components[position].component_code)
+        seen = set()
+        for position, component_id in enumerate(component_ids(components)):
+            code = get_code(position)
+            seen.add(component_id)
+            document = self.positions.get(component_id)
+            if document is not None:
+                if self.hashes[document] == code_hash(code):
+                    stats["unchanged"] += 1
+                    continue
+                self._remove(component_id)
+                stats["removed"] += 1
+            self._add(component_id, code)
+            stats["added"] += 1
+        for component_id in [
+                component_id for component_id in self.positions
+                if component_id not in seen
+        ]:
+            self._remove(component_id)
+            stats["removed"] += 1
+        if len(self.documents) > 2 * len(self.positions):
+            self.compact()
+        return stats
+
+    def compact(self):
+        """
+        Renumbers live documents and drops tombstones from the posting lists.
+
+        The next `save` writes the whole index and drops the delta segments.
+        """
+        renumbered = {}
+        documents, hashes = [], []
+        for document, component_id in enumerate(self.documents):
+            if component_id is not None:
+                renumbered[document] = len(documents)
+                documents.append(component_id)
+                hashes.append(self.hashes[document])
+        postings = {}
+        for gram, posting in self.postings.items():
+            posting = [
+                renumbered[document] for document in posting
+                if document in renumbered
+            ]
+            if posting:
+                postings[gram] = posting
+        self.documents, self.hashes, self.postings = documents, hashes, postings
+        self.positions = {
+            component_id: document
+            for document, component_id in enumerate(documents)
+        }
+        self._generation = None
+
+    def candidates(self, pattern: str) -> Optional[Set[str]]:
+        """
+        Returns ids of components whose code may match the regex `pattern`.
+
+        Returns:
+            Optional[Set[str]]: A superset of the matching ids, or None if the
+            pattern gives nothing to filter by.
+        """
+        parsed = parse_pattern(pattern)
+        if parsed is None:
+            return None
+        documents = postings_candidates(self.postings,
+                                        required_literals(parsed))
+        if documents is None:
+            return None
+        return {
+            self.documents[document]
+            for document in documents if self.documents[document] is not None
+        }
+
+    def search(self,
+               components: Sequence,
+               query: str,
+               regex: bool = False) -> list:
+        """
+        Finds components whose code contains `query` (or matches it as a regex).
+
+        :param components: The indexed components, used to verify candidates.
+        :return: Matching components in the order of `components`.
+        """
+        pattern = query if regex else re.escape(query)
+        compiled = re.compile(pattern)
+        candidates = self.candidates(pattern)
+        if candidates is None:
+            positions = range(len(components))
+        else:
+            positions = [
+                position for position, component_id in enumerate(
+                    component_ids(components)) if component_id in candidates
+                # components missing from a stale index are always checked
+                or component_id not in self.positions
+            ]
+        found = []
+        for position in positions:
+            component = components[position]
+            if compiled.search(component.component_code or ""):
+                found.append(component)
+        return found
+
+    def _mark_saved(self, generation: str):
+        self._generation = generation
+        self._saved = len(self.documents)
+        self._removed_documents = []
+        self._added_postings = {}
+
+    def save(self, path: str):
+        """
+        Saves the index to `path`.
+
+        Changes since the last save or load are appended as a delta segment
+        (see `get_code_index_delta_path`); the index is written atomically
+        as a whole, and the segments removed, when there is no saved index
+        to append to, after `compact`, or once the segments take more than
+        half of the size of the index.
+        """
+        delta_path = get_code_index_delta_path(path)
+        try:
+            base_size = os.stat(path).st_size
+            delta_size = os.stat(delta_path).st_size if os.path.exists(
+                delta_path) else 0
+        except OSError:
+            base_size = None
+        if (self._generation is None or base_size is None
+                or 2 * delta_size > base_size):
+            self._save_full(path)
+            if os.path.exists(delta_path):
+                os.remove(delta_path)
+            return
+        if self._saved == len(self.documents) and not self._removed_documents:
+            return
+        append_line(
+            delta_path,
+            json.dumps(
+                {
+                    "generation": self._generation,
+                    "start": self._saved,
+                    "documents": self.documents[self._saved:],
+                    "hashes": self.hashes[self._saved:],
+                    "removed": self._removed_documents,
+                    "postings": self._added_postings
+                },
+                separators=(",", ":")).encode("utf-8"))
+        self._mark_saved(self._generation)
+
+    def _save_full(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # segments of the previous generation no longer apply to this index
+        generation = uuid.uuid4().hex
+        write_atomic(
+            path,
+            json.dumps(
+                {
+                    "version": CODE_INDEX_VERSION,
+                    "generation": generation,
+                    "documents": self.documents,
+                    "hashes": self.hashes,
+                    "postings": self.postings
+                },
+                separators=(",", ":")).encode("utf-8"))
+        self._mark_saved(generation)
+
+    def _apply_delta(self, delta: dict) -> bool:
+        if (delta.get("generation") != self._generation
+                or delta.get("start") != len(self.documents)):
+            return False
+        for document in delta["removed"]:
+            self.documents[document] = None
+            self.hashes[document] = None
+        self.documents.extend(delta["documents"])
+        self.hashes.extend(delta["hashes"])
+        for gram, posting in delta["postings"].items():
+            self.postings.setdefault(gram, []).extend(posting)
+        return True
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CodeIndex"]:
+        """
+        Loads an index written by `save`, or returns None if there is no valid one.
+
+        Delta segments are applied in order up to the first one that is torn
+        or belongs to another generation of the index.
+        """
+        try:
+            with open(path, "rb") as file:
+                data = json.loads(file.read())
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != CODE_INDEX_VERSION:
+            return None
+        index = cls()
+        index.documents = data["documents"]
+        index.hashes = data["hashes"]
+        index.postings = data["postings"]
+        index._generation = data.get("generation")
+        try:
+            with open(get_code_index_delta_path(path), "rb") as file:
+                for line in file:
+                    try:
+                        delta = json.loads(line)
+                    except ValueError:
+                        break
+                    if not index._apply_delta(delta):
+                        break
+        except OSError:
+            pass
+        index._mark_saved(index._generation)
+        index.positions = {
+            component_id: document
+            for document, component_id in enumerate(index.documents)
+            if component_id is not None
+        }
+        return index
+
+
+# indexes loaded by `load_code_index`: path -> (file versions, index)
+_loaded_indexes: Dict[str, tuple] = {}
+
+
+def load_code_index(path: str) -> Optional[CodeIndex]:
+    """Loads the index at `path`, reusing the loaded copy while its files are unchanged."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    delta_path = get_code_index_delta_path(path)
+    if os.path.exists(delta_path):
+        stat = os.stat(delta_path)
+        mtime_ns = (mtime_ns, stat.st_mtime_ns, stat.st_size)
+    loaded = _loaded_indexes.get(path)
+    if loaded is None or loaded[0] != mtime_ns:
+        index = CodeIndex.load(path)
+        if index is None:
+            return None
+        loaded = _loaded_indexes[path] = (mtime_ns, index)
+    return loaded[1]
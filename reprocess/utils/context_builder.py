@@ -0,0 +1,232 @@
+import os
+import re
+import copy
+import importlib
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from reprocess.utils.graph_query import ComponentGraph
+
+# Parser modules whose `extract_code_signature` is used, by file extension
+SIGNATURE_MODULES = {
+    ".py": "reprocess.parsers.python_parsers",
+    ".c": "reprocess.parsers.c_parsers",
+    ".cpp": "reprocess.parsers.cpp_parsers",
+    ".java": "reprocess.parsers.java_parsers",
+    ".go": "reprocess.parsers.go_parsers",
+    ".js": "reprocess.parsers.java_script_parsers",
+    ".ts": "reprocess.parsers.typescript_parser"
+}
+
+# Lines of the import header of a component in the supported languages
+_IMPORT_LINE = re.compile(
+    r"^\s*(import\s|from\s+\S+\s+import\s|#\s*include\b|using\s|package\s"
+    r"|(const|let|var)\s+[\w{}\s,]+=\s*require\()")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def approximate_tokens(text: str) -> int:
+    """Counts words and punctuation marks, a close estimate of LLM tokens for code."""
+    return len(_TOKEN.findall(text))
+
+
+def split_imports(code: str) -> Tuple[Tuple[str, ...], str]:
+    """Splits the leading import lines off the code of a component."""
+    lines = (code or "").splitlines()
+    imports = []
+    position = 0
+    for position, line in enumerate(lines):
+        if _IMPORT_LINE.match(line):
+            imports.append(line.strip())
+        elif line.strip():
+            break
+    else:
+        position = len(lines)
+    return tuple(imports), "\n".join(lines[position:]).strip("\n")
+
+
+def extract_signature(code: str, file_path: Optional[str]) -> str:
+    """
+    Returns the signature of a component, i.e. its code without bodies.
+
+    The `extract_code_signature` of the parser of the file's language is
+    used. When the language is not supported or the code cannot be parsed,
+    the first line is returned.
+    """
+    module_name = SIGNATURE_MODULES.get(os.path.splitext(file_path or "")[1])
+    if module_name is not None:
+        extract = importlib.import_module(module_name).extract_code_signature
+        try:
+            return extract(code or "")
+        except (SyntaxError, ValueError):
+            # e.g. an indented method of a Python class
+            pass
+    return next((line for line in (code or "").splitlines() if line.strip()),
+                "")
+
+
+class ContextAssembler:
+    """
+    Assembles the code of a component and its dependencies within a token budget.
+
+    Dependencies are taken nearest first and, at the same distance, by rank
+    (e.g. PageRank from `CentralityRanker`; by default the number of
+    callers). Components up to `full_code_depth` hops away are included
+    with their code when it fits, farther ones (or ones too large) with
+    their signature. Import lines shared by the components are written
+    once at the top.
+
+    Import headers, bodies, signatures and their token counts are computed
+    once per component id (ids are hashes of the name and the code) and
+    cached, so after `prepare` an assembly only walks the graph.
+    """
+
+    def __init__(self,
+                 components: Sequence,
+                 file_paths: Optional[Dict[str, str]] = None,
+                 ranks: Optional[Dict[str, float]] = None,
+                 count_tokens: Callable[[str], int] = approximate_tokens,
+                 graph: Optional[ComponentGraph] = None):
+        """
+        :param components: Code components of the repository.
+        :param file_paths: File path by file id, used to choose the signature extractor.
+        :param ranks: Score by component id; higher ranked dependencies are taken first.
+        :param count_tokens: Counts the tokens of a text.
+        :param graph: Graph of the components (built if not given).
+        """
+        self.components = components
+        self.file_paths = file_paths or {}
+        self.count_tokens = count_tokens
+        self.graph = graph or ComponentGraph.from_components(components)
+        if ranks is None:
+            offsets, _ = self.graph.adjacency["in"]
+            ranks = {
+                component_id: offsets[node + 1] - offsets[node]
+                for node, component_id in enumerate(self.graph.ids)
+            }
+        self.ranks = ranks
+        self._parts: Dict[str, tuple] = {}
+        self._signatures: Dict[str, tuple] = {}
+        self._import_tokens: Dict[str, int] = {}
+
+    def rebind(self, components: Sequence) -> "ContextAssembler":
+        """The assembler for a copy of its components, sharing the cached parts."""
+        assembler = copy.copy(self)
+        assembler.components = components
+        return assembler
+
+    def prepare(self):
+        """Precomputes the parts and token counts of all components."""
+        for node in range(len(self.graph)):
+            self._code(node)
+            self._signature(node)
+
+    def _import_cost(self, line: str) -> int:
+        tokens = self._import_tokens.get(line)
+        if tokens is None:
+            tokens = self._import_tokens[line] = self.count_tokens(line)
+        return tokens
+
+    def _code(self, node: int) -> tuple:
+        """(imports, body, body tokens) of the code of a component."""
+        component_id = self.graph.ids[node]
+        parts = self._parts.get(component_id)
+        if parts is None:
+            imports, body = split_imports(self.components[node].component_code)
+            parts = self._parts[component_id] = (imports, body,
+                                                 self.count_tokens(body))
+        return parts
+
+    def _signature(self, node: int) -> tuple:
+        """(imports, body, body tokens) of the signature of a component."""
+        component_id = self.graph.ids[node]
+        parts = self._signatures.get(component_id)
+        if parts is None:
+            component = self.components[node]
+            imports, body = split_imports(
+                extract_signature(component.component_code,
+                                  self.file_paths.get(component.file_id)))
+            parts = self._signatures[component_id] = (imports, body,
+                                                      self.count_tokens(body))
+        return parts
+
+    def assemble(self,
+                 component_id: str,
+                 token_budget: int,
+                 max_depth: Optional[int] = None,
+                 full_code_depth: int = 1,
+                 ranks: Optional[Dict[str, float]] = None) -> dict:
+        """
+        Builds the context of a component.
+
+        The component itself is always included with its code. Separators
+        between the parts are not counted. Dependencies are expanded level
+        by level, and the walk stops at a level none of which fits.
+
+        :param ranks: Ranks used instead of the ones given to the assembler.
+
+        :return: A dictionary with the `text`, its `tokens` and the
+            `included` parts as (component id, "code" or "signature",
+            distance), plus the number of `omitted` dependencies that
+            were considered but did not fit.
+        """
+        ranks = self.ranks if ranks is None else ranks
+        start = self.graph.index(component_id)
+        imports = {}
+        bodies = []
+        included = []
+        used = 0
+
+        def add(node, parts, kind, distance):
+            nonlocal used
+            for line in parts[0]:
+                if line not in imports:
+                    imports[line] = None
+                    used += self._import_cost(line)
+            used += parts[2]
+            bodies.append(parts[1])
+            included.append((self.graph.ids[node], kind, distance))
+
+        def cost(parts):
+            return parts[2] + sum(
+                self._import_cost(line)
+                for line in parts[0] if line not in imports)
+
+        add(start, self._code(start), "code", 0)
+        offsets, targets = self.graph.adjacency["out"]
+        visited = {start}
+        level, distance, omitted = [start], 0, 0
+        # levels are expanded lazily, so a small budget does not walk the
+        # whole graph; the walk stops after a level of which nothing fit
+        while level and (max_depth is None or distance < max_depth):
+            distance += 1
+            next_level = []
+            for node in level:
+                for target in targets[offsets[node]:offsets[node + 1]]:
+                    if target not in visited:
+                        visited.add(target)
+                        next_level.append(target)
+            next_level.sort(
+                key=lambda node: -ranks.get(self.graph.ids[node], 0))
+            fitted = 0
+            for node in next_level:
+                options = [("signature", self._signature(node))]
+                if distance <= full_code_depth:
+                    options.insert(0, ("code", self._code(node)))
+                for kind, parts in options:
+                    if used + cost(parts) <= token_budget:
+                        add(node, parts, kind, distance)
+                        fitted += 1
+                        break
+                else:
+                    omitted += 1
+            if next_level and not fitted:
+                break
+            level = next_level
+
+        text = "\n\n".join(part for part in ["\n".join(imports)] + bodies
+                           if part)
+        return {
+            "text": text,
+            "tokens": used,
+            "included": included,
+            "omitted": omitted
+        }
@@ -0,0 +1,64 @@
+import logging
+import subprocess
+from typing import List, Sequence, Tuple
+
+
+def get_changed_files(
+    repo_path: str, diff_args: Sequence[str] = ("--cached", )
+) -> List[Tuple[str, List[str]]]:
+    """
+    Lists the files changed according to `git diff --name-status`.
+
+    Args:
+        repo_path (str): Local path of the repository.
+        diff_args (Sequence[str]): Arguments selecting the changes, staged changes by default.
+
+    Returns:
+        List[Tuple[str, List[str]]]: The status (e.g. 'M', 'D' or 'R100') and the paths of each
+        changed file, relative to the repository; renames and copies have the old and the new path.
+    """
+    try:
+        # -z keeps paths with special characters unquoted
+        result = subprocess.run([
+            'git', '-C', repo_path, 'diff', '--name-status', '-z', *diff_args
+        ],
+                                capture_output=True,
+                                text=True,
+                                check=True)
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Failed to get changed files: {e}")
+        return []
+    fields = result.stdout.split('\0')
+    changes = []
+    position = 0
+    while position < len(fields) and fields[position]:
+        status = fields[position]
+        count = 2 if status[0] in 'RC' else 1
+        changes.append((status, fields[position + 1:position + 1 + count]))
+        position += 1 + count
+    return changes
+
+
+def separate_file_changes(
+        changes: List[Tuple[str, List[str]]]) -> Tuple[List[str], List[str]]:
+    """
+    Separates changed files into removed and updated paths.
+
+    A renamed file removes its old path and updates the new one, a copied
+    file only updates the new path.
+
+    Args:
+        changes (list): Changes returned by `get_changed_files`.
+
+    Returns:
+        tuple: Lists of removed and of updated paths, without duplicates.
+    """
+    removed_paths, updated_paths = {}, {}
+    for status, paths in changes:
+        if status[0] == 'D':
+            removed_paths[paths[0]] = None
+            continue
+        if status[0] == 'R':
+            removed_paths[paths[0]] = None
+        updated_paths[paths[-1]] = None
+    return list(removed_paths), list(updated_paths)
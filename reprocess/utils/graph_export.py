@@ -0,0 +1,368 @@
+import os
+import re
+import csv
+import json
+import hashlib
+from xml.sax.saxutils import escape, quoteattr
+from typing import Dict, Iterator, List, Tuple
+
+# label -> (id property, [(property, type), ...]) of every node kind
+NODE_KINDS = {
+    "CodeComponent": ("component_id", [("repo", "string"), ("name", "string"),
+                                       ("code", "string"), ("type", "string"),
+                                       ("hash", "string")]),
+    "File": ("file_id", [("repo", "string"), ("path", "string"),
+                         ("imports", "string[]"),
+                         ("called_components", "string[]"),
+                         ("callable_components", "string[]"),
+                         ("hash", "string")]),
+    "ExternalComponent": ("component_id", [("repo", "string"),
+                                           ("name", "string"),
+                                           ("hash", "string")])
+}
+# label -> id property
+NODE_KEYS = {label: key for label, (key, _) in NODE_KINDS.items()}
+# relationship type -> (start label, end label)
+RELATIONSHIP_KINDS = {
+    "USES": ("CodeComponent", "CodeComponent"),
+    "INSIDE": ("File", "CodeComponent"),
+    "USES_EXTERNAL": ("CodeComponent", "ExternalComponent")
+}
+
+Node = Tuple[str, str, Dict[str, object]]
+Relationship = Tuple[str, str, str]
+
+
+def content_hash(*values) -> str:
+    """Hashes JSON-serialisable values; stored on nodes to detect changes."""
+    return hashlib.sha1(
+        json.dumps(values, separators=(",", ":"),
+                   default=sorted).encode("utf-8")).hexdigest()
+
+
+def component_row(component) -> dict:
+    """
+    Returns node properties of a code component.
+
+    The hash also covers the outgoing links (internal and external) and the
+    file of the component, so a changed hash means the node or its
+    relationships must be rewritten.
+    """
+    row = {
+        "component_id": component.component_id,
+        "component_name": component.component_name,
+        "component_code": component.component_code,
+        "component_type": component.component_type
+    }
+    row["hash"] = content_hash(row, sorted(component.linked_component_ids
+                                           or ()),
+                               sorted(component.external_component_ids or ()),
+                               component.file_id)
+    return row
+
+
+def file_row(file) -> dict:
+    """Returns node properties of a file."""
+    row = {
+        "file_id": file.file_id,
+        "file_path": file.file_path,
+        "imports": list(file.imports or ()),
+        "called_components": list(file.called_components or ()),
+        "callable_components": list(file.callable_components or ())
+    }
+    row["hash"] = content_hash(row)
+    return row
+
+
+def external_component_rows(external_components) -> List[dict]:
+    """
+    Returns node properties of the external components of a repository.
+
+    :param external_components: The `external_components` of a container,
+        mapping names to ids; several names may point to the same id, the
+        first one names the node.
+    """
+    names = {}
+    for name, component_id in (external_components or {}).items():
+        names.setdefault(component_id, name)
+    rows = []
+    for component_id, name in names.items():
+        row = {"component_id": component_id, "component_name": name}
+        row["hash"] = content_hash(row)
+        rows.append(row)
+    return rows
+
+
+def component_relationships(components) -> Iterator[Relationship]:
+    """Yields (type, start id, end id) of the relationships of the given components."""
+    for component in components:
+        for linked_id in component.linked_component_ids or ():
+            yield "USES", component.component_id, linked_id
+        if component.file_id is not None:
+            yield "INSIDE", component.file_id, component.component_id
+        for external_id in component.external_component_ids or ():
+            yield "USES_EXTERNAL", component.component_id, external_id
+
+
+def iter_nodes(container) -> Iterator[Node]:
+    """
+    Yields (label, id, properties) of all nodes of the repository graph.
+
+    Nodes get the `repo` and `hash` properties that `Neo4jConverter`
+    stores, so `Neo4jSync` after a bulk import only rewrites what changed
+    since.
+    """
+    repo = getattr(container, "repo_name", None)
+    for component in getattr(container, "code_components", None) or ():
+        row = component_row(component)
+        yield "CodeComponent", component.component_id, {
+            "repo": repo,
+            "name": row["component_name"],
+            "code": row["component_code"],
+            "type": row["component_type"],
+            "hash": row["hash"]
+        }
+    for file in getattr(container, "files", None) or ():
+        row = file_row(file)
+        yield "File", file.file_id, {
+            "repo": repo,
+            "path": row["file_path"],
+            "imports": row["imports"],
+            "called_components": row["called_components"],
+            "callable_components": row["callable_components"],
+            "hash": row["hash"]
+        }
+    for row in external_component_rows(
+            getattr(container, "external_components", None)):
+        yield "ExternalComponent", row["component_id"], {
+            "repo": repo,
+            "name": row["component_name"],
+            "hash": row["hash"]
+        }
+
+
+def iter_relationships(container) -> Iterator[Relationship]:
+    """Yields (type, start id, end id) of all relationships of the repository graph."""
+    return component_relationships(
+        getattr(container, "code_components", None) or ())
+
+
+class Neo4jImportWriter:
+    """
+    Writes files for `neo4j-admin database import full`.
+
+    Every node label and relationship type gets a header file and a data
+    file; ids live in per-label id spaces. `import_command.txt` contains
+    the matching command line.
+
+    The importer cannot escape the array delimiter inside array elements,
+    so the default delimiter is the ASCII unit separator, which does not
+    occur in code names, and an element containing the delimiter raises a
+    ValueError instead of being split on import.
+    """
+
+    def __init__(self, directory: str, array_delimiter: str = "\x1f"):
+        self.directory = directory
+        self.array_delimiter = array_delimiter
+        self.writers = {}
+        self.files = []
+
+    def _writer(self, name: str, header: List[str]):
+        writer = self.writers.get(name)
+        if writer is None:
+            with open(os.path.join(self.directory, f"{name}_header.csv"),
+                      "w",
+                      newline="") as file:
+                csv.writer(file).writerow(header)
+            file = open(os.path.join(self.directory, f"{name}.csv"),
+                        "w",
+                        newline="")
+            self.files.append(file)
+            writer = self.writers[name] = csv.writer(file)
+        return writer
+
+    def _value(self, value):
+        if isinstance(value, list):
+            elements = list(map(str, value))
+            for element in elements:
+                if self.array_delimiter in element:
+                    raise ValueError(
+                        f"Array element {element!r} contains the array "
+                        f"delimiter {self.array_delimiter!r}")
+            return self.array_delimiter.join(elements)
+        return "" if value is None else value
+
+    def _delimiter_option(self) -> str:
+        if self.array_delimiter == "\t":
+            return "TAB"
+        if self.array_delimiter.isprintable():
+            return f"'{self.array_delimiter}'"
+        return f"U+{ord(self.array_delimiter):04X}"
+
+    def write_node(self, label: str, node_id: str, properties: dict):
+        id_property, fields = NODE_KINDS[label]
+        header = [f"{id_property}:ID({label})"] + [
+            name if kind == "string" else f"{name}:{kind}"
+            for name, kind in fields
+        ] + [":LABEL"]
+        self._writer(label, header).writerow(
+            [node_id] + [self._value(properties[name])
+                         for name, _ in fields] + [label])
+
+    def write_relationship(self, relationship_type: str, start_id: str,
+                           end_id: str):
+        start_label, end_label = RELATIONSHIP_KINDS[relationship_type]
+        header = [
+            f":START_ID({start_label})", f":END_ID({end_label})", ":TYPE"
+        ]
+        self._writer(relationship_type,
+                     header).writerow([start_id, end_id, relationship_type])
+
+    def close(self):
+        for file in self.files:
+            file.close()
+        nodes = [
+            f"--nodes={label}={label}_header.csv,{label}.csv"
+            for label in NODE_KINDS if label in self.writers
+        ]
+        relationships = [
+            f"--relationships={name}={name}_header.csv,{name}.csv"
+            for name in RELATIONSHIP_KINDS if name in self.writers
+        ]
+        command = [
+            "neo4j-admin database import full",
+            f"--array-delimiter={self._delimiter_option()}",
+            "--multiline-fields=true", "--skip-bad-relationships=true"
+        ] + nodes + relationships + ["neo4j"]
+        with open(os.path.join(self.directory, "import_command.txt"),
+                  "w") as file:
+            file.write(" \\\n    ".join(command) + "\n")
+
+
+# characters that are not allowed in XML 1.0 documents
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _xml_text(value) -> str:
+    if isinstance(value, list):
+        value = json.dumps(value)
+    return escape(_INVALID_XML.sub("", str(value)))
+
+
+def _xml_attribute(value) -> str:
+    return quoteattr(_INVALID_XML.sub("", str(value)))
+
+
+class GraphMLWriter:
+    """
+    Writes the graph as a single GraphML document (`graph.graphml`).
+
+    List properties are stored as JSON strings.
+    """
+
+    def __init__(self, directory: str):
+        self.file = open(os.path.join(directory, "graph.graphml"),
+                         "w",
+                         encoding="utf-8")
+        self.edge_count = 0
+        keys = {"label": "node", "type": "edge"}
+        for _, fields in NODE_KINDS.values():
+            for name, _ in fields:
+                keys.setdefault(name, "node")
+        self.file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for name, domain in keys.items():
+            self.file.write(f'  <key id={quoteattr(name)} for="{domain}" '
+                            f'attr.name={quoteattr(name)} '
+                            'attr.type="string"/>\n')
+        self.file.write('  <graph id="G" edgedefault="directed">\n')
+
+    def write_node(self, label: str, node_id: str, properties: dict):
+        data = "".join(f'<data key={quoteattr(name)}>{_xml_text(value)}</data>'
+                       for name, value in properties.items()
+                       if value is not None)
+        self.file.write(f'    <node id={_xml_attribute(node_id)}>'
+                        f'<data key="label">{label}</data>{data}</node>\n')
+
+    def write_relationship(self, relationship_type: str, start_id: str,
+                           end_id: str):
+        self.edge_count += 1
+        self.file.write(
+            f'    <edge id="e{self.edge_count}" '
+            f'source={_xml_attribute(start_id)} '
+            f'target={_xml_attribute(end_id)}>'
+            f'<data key="type">{relationship_type}</data></edge>\n')
+
+    def close(self):
+        self.file.write("  </graph>\n</graphml>\n")
+        self.file.close()
+
+
+class JsonLinesWriter:
+    """Writes nodes and edges as JSON lines (`nodes.jsonl` and `edges.jsonl`)."""
+
+    def __init__(self, directory: str):
+        self.nodes = open(os.path.join(directory, "nodes.jsonl"),
+                          "w",
+                          encoding="utf-8")
+        self.edges = open(os.path.join(directory, "edges.jsonl"),
+                          "w",
+                          encoding="utf-8")
+
+    def write_node(self, label: str, node_id: str, properties: dict):
+        self.nodes.write(
+            json.dumps(dict({
+                "id": node_id,
+                "label": label
+            }, **properties)) + "\n")
+
+    def write_relationship(self, relationship_type: str, start_id: str,
+                           end_id: str):
+        self.edges.write(
+            json.dumps({
+                "source": start_id,
+                "target": end_id,
+                "type": relationship_type
+            }) + "\n")
+
+    def close(self):
+        self.nodes.close()
+        self.edges.close()
+
+
+WRITERS = {
+    "neo4j": Neo4jImportWriter,
+    "graphml": GraphMLWriter,
+    "jsonl": JsonLinesWriter
+}
+
+
+def export_graph(container, directory: str, output_format: str,
+                 **writer_kwargs) -> Dict[str, int]:
+    """
+    Streams the graph of the container to `directory` in the given format.
+
+    Nodes and relationships are written one at a time as they are
+    generated, so no intermediate copy of the graph is built.
+
+    :param container: The repository container.
+    :param directory: Output directory, created if needed.
+    :param output_format: One of `WRITERS` ("neo4j", "graphml" or "jsonl").
+    :return: Numbers of written nodes and relationships.
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown export format: {output_format}")
+    os.makedirs(directory, exist_ok=True)
+    writer = WRITERS[output_format](directory, **writer_kwargs)
+    counts = {"nodes": 0, "relationships": 0}
+    try:
+        for node in iter_nodes(container):
+            writer.write_node(*node)
+            counts["nodes"] += 1
+        for relationship in iter_relationships(container):
+            writer.write_relationship(*relationship)
+            counts["relationships"] += 1
+    finally:
+        writer.close()
+    return counts
@@ -0,0 +1,368 @@
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# "out" follows `linked_component_ids`, "in" goes back to the callers
+DIRECTIONS = ("out", "in")
+
+
+def _build_csr(neighbours: List[List[int]]) -> Tuple[array, array]:
+    """Packs neighbour lists into offsets and targets arrays."""
+    offsets = array("q", [0])
+    targets = array("q")
+    for node_neighbours in neighbours:
+        targets.extend(node_neighbours)
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+class ComponentGraph:
+    """
+    Integer-indexed dependency graph of code components.
+
+    Components are numbered in the order of the container, and both the
+    forward edges (`linked_component_ids`, "out") and the reverse edges
+    ("in", the callers) are kept in compressed sparse row form: the
+    neighbours of node `i` are `targets[offsets[i]:offsets[i + 1]]`. Links
+    to ids that are not components of the graph are ignored.
+
+    Transitive closures are memoized per node and direction. A traversal
+    that reaches a node with a known closure takes it over instead of
+    expanding the node again, so repeated queries share their work.
+    """
+
+    def __init__(self, component_ids: Sequence[str],
+                 links: Iterable[Iterable[str]]):
+        self.ids = list(component_ids)
+        self.positions: Dict[str, int] = {
+            component_id: position
+            for position, component_id in enumerate(self.ids)
+        }
+        forward = []
+        for linked_ids in links:
+            forward.append(
+                sorted({
+                    self.positions[linked_id]
+                    for linked_id in linked_ids or ()
+                    if linked_id in self.positions
+                }))
+        reverse = [[] for _ in self.ids]
+        for source, node_neighbours in enumerate(forward):
+            for target in node_neighbours:
+                reverse[target].append(source)
+        self.edge_count = sum(map(len, forward))
+        self.adjacency = {
+            "out": _build_csr(forward),
+            "in": _build_csr(reverse)
+        }
+        self._closures = {direction: {} for direction in DIRECTIONS}
+        self._condensation = None
+
+    @classmethod
+    def from_components(cls, components: Sequence) -> "ComponentGraph":
+        return cls(
+            [component.component_id for component in components],
+            [component.linked_component_ids for component in components])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def index(self, component_id: str) -> int:
+        position = self.positions.get(component_id)
+        if position is None:
+            raise KeyError(component_id)
+        return position
+
+    def neighbours(self, node: int, direction: str = "out") -> array:
+        offsets, targets = self.adjacency[direction]
+        return targets[offsets[node]:offsets[node + 1]]
+
+    def callees(self, component_id: str) -> List[str]:
+        """Ids of the components `component_id` links to."""
+        return [
+            self.ids[node]
+            for node in self.neighbours(self.index(component_id), "out")
+        ]
+
+    def callers(self, component_id: str) -> List[str]:
+        """Ids of the components linking to `component_id`."""
+        return [
+            self.ids[node]
+            for node in self.neighbours(self.index(component_id), "in")
+        ]
+
+    def traverse(self,
+                 component_ids: Iterable[str],
+                 direction: str = "out",
+                 max_depth: Optional[int] = None,
+                 order: str = "bfs") -> List[Tuple[str, int]]:
+        """
+        Visits components reachable from the given ones.
+
+        :param component_ids: Start components (not included in the result).
+        :param direction: "out" follows dependencies, "in" follows callers.
+        :param max_depth: Maximal number of hops; None means unlimited.
+        :param order: "bfs" (nearest first) or "dfs" (preorder).
+        :return: (component id, depth) pairs in visiting order. With "dfs"
+            the depth is that of the path the node was first reached by.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        if order not in ("bfs", "dfs"):
+            raise ValueError(f"Unknown traversal order: {order}")
+        offsets, targets = self.adjacency[direction]
+        starts = [self.index(component_id) for component_id in component_ids]
+        visited = bytearray(len(self.ids))
+        for node in starts:
+            visited[node] = 1
+
+        result = []
+        if order == "bfs":
+            queue = deque((node, 0) for node in starts)
+            while queue:
+                node, depth = queue.popleft()
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                for target in targets[offsets[node]:offsets[node + 1]]:
+                    if not visited[target]:
+                        visited[target] = 1
+                        result.append((self.ids[target], depth + 1))
+                        queue.append((target, depth + 1))
+        else:
+            # a node is expanded again when reached by a shorter path, so
+            # the depth limit does not hide nodes reachable within it
+            best = {node: 0 for node in starts}
+            stack = [(node, 0) for node in reversed(starts)]
+            while stack:
+                node, depth = stack.pop()
+                if depth > best[node]:
+                    continue
+                if not visited[node]:
+                    visited[node] = 1
+                    result.append((self.ids[node], depth))
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                node_targets = targets[offsets[node]:offsets[node + 1]]
+                for target in reversed(node_targets):
+                    if depth + 1 < best.get(target, len(self.ids) + 1):
+                        best[target] = depth + 1
+                        stack.append((target, depth + 1))
+        return result
+
+    def closure(self, component_id: str, direction: str = "out") -> frozenset:
+        """
+        Returns node numbers of all components transitively reachable from one.
+
+        The result is memoized; the start node itself is only included when
+        it lies on a cycle.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        start = self.index(component_id)
+        closures = self._closures[direction]
+        cached = closures.get(start)
+        if cached is not None:
+            return cached
+
+        offsets, targets = self.adjacency[direction]
+        reached = set()
+        stack = [start]
+        expanded = {start}
+        while stack:
+            node = stack.pop()
+            for target in targets[offsets[node]:offsets[node + 1]]:
+                if target in reached:
+                    continue
+                reached.add(target)
+                known = closures.get(target)
+                if known is not None:
+                    # everything reachable from `target` is already known
+                    reached |= known
+                elif target not in expanded:
+                    expanded.add(target)
+                    stack.append(target)
+        result = closures[start] = frozenset(reached)
+        return result
+
+    def dependencies(self, component_id: str) -> List[str]:
+        """Ids of all components `component_id` transitively depends on."""
+        return self._ids_of(self.closure(component_id, "out"), component_id)
+
+    def dependents(self, component_id: str) -> List[str]:
+        """Ids of all components transitively depending on `component_id`."""
+        return self._ids_of(self.closure(component_id, "in"), component_id)
+
+    def _ids_of(self, nodes: frozenset, component_id: str) -> List[str]:
+        start = self.positions[component_id]
+        return [self.ids[node] for node in sorted(nodes) if node != start]
+
+    def shortest_path(self,
+                      source_id: str,
+                      target_id: str,
+                      direction: str = "out") -> Optional[List[str]]:
+        """
+        Finds a shortest chain of links between two components.
+
+        :return: Component ids from `source_id` to `target_id`, or None if
+            the target is not reachable.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        source, target = self.index(source_id), self.index(target_id)
+        if source == target:
+            return [source_id]
+        offsets, targets = self.adjacency[direction]
+        parents = array("q", [-1]) * len(self.ids)
+        parents[source] = source
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for neighbour in targets[offsets[node]:offsets[node + 1]]:
+                if parents[neighbour] != -1:
+                    continue
+                parents[neighbour] = node
+                if neighbour == target:
+                    path = [target]
+                    while path[-1] != source:
+                        path.append(parents[path[-1]])
+                    return [self.ids[node] for node in reversed(path)]
+                queue.append(neighbour)
+        return None
+
+    def condensation(self) -> "CondensedGraph":
+        """Returns the (memoized) graph of strongly connected components."""
+        if self._condensation is None:
+            self._condensation = CondensedGraph(self)
+        return self._condensation
+
+    def topological_levels(self) -> List[List[List[str]]]:
+        """
+        Returns a bottom-up schedule of the components.
+
+        Every level is a list of groups of component ids; a group is a
+        strongly connected component (a single component unless there is a
+        cycle). All dependencies of a group lie in earlier levels or in the
+        group itself, so the groups of one level can be processed in
+        parallel once the previous levels are done.
+        """
+        condensed = self.condensation()
+        return [[[self.ids[node] for node in condensed.members[group]]
+                 for group in level] for level in condensed.levels]
+
+
+class CondensedGraph:
+    """
+    Strongly connected components of a `ComponentGraph` and the DAG they form.
+
+    Components are found with an iterative version of Tarjan's algorithm,
+    so deep dependency chains do not hit the recursion limit. Groups are
+    numbered in the order Tarjan's algorithm completes them, in which every
+    group comes after all groups it depends on.
+
+    Attributes:
+        members: Node numbers of every group.
+        group_of: Group number of every node.
+        adjacency: Offsets and targets (CSR) of the links between groups.
+        levels: Group numbers by level; groups of level 0 depend on no
+            other group, and a group of level k depends on a group of
+            level k - 1.
+    """
+
+    def __init__(self, graph: ComponentGraph):
+        offsets, targets = graph.adjacency["out"]
+        size = len(graph)
+        unvisited = -1
+        order = array("q", [unvisited]) * size
+        low = array("q", [0]) * size
+        on_stack = bytearray(size)
+        group_of = array("q", [unvisited]) * size
+        stack, members = [], []
+        counter = 0
+
+        for root in range(size):
+            if order[root] != unvisited:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            # (node, position of its next unexplored link)
+            work = [(root, offsets[root])]
+            while work:
+                node, edge = work[-1]
+                end = offsets[node + 1]
+                while edge < end:
+                    target = targets[edge]
+                    edge += 1
+                    if order[target] == unvisited:
+                        work[-1] = (node, edge)
+                        order[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        work.append((target, offsets[target]))
+                        break
+                    if on_stack[target] and order[target] < low[node]:
+                        low[node] = order[target]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+                    if low[node] == order[node]:
+                        group = len(members)
+                        group_members = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            group_of[member] = group
+                            group_members.append(member)
+                            if member == node:
+                                break
+                        group_members.sort()
+                        members.append(group_members)
+
+        successors = []
+        levels_of = []
+        for group, group_members in enumerate(members):
+            group_successors = sorted({
+                group_of[target]
+                for member in group_members
+                for target in targets[offsets[member]:offsets[member + 1]]
+            } - {group})
+            successors.append(group_successors)
+            # successors were completed earlier, so their levels are known
+            levels_of.append(
+                max((levels_of[successor] for successor in group_successors),
+                    default=-1) + 1)
+
+        self.members = members
+        self.group_of = group_of
+        self.adjacency = _build_csr(successors)
+        self.levels = [[] for _ in range(max(levels_of, default=-1) + 1)]
+        for group, level in enumerate(levels_of):
+            self.levels[level].append(group)
+
+    def __len__(self):
+        return len(self.members)
+
+    def cycles(self) -> List[List[int]]:
+        """Returns groups of more than one node."""
+        return [
+            group_members for group_members in self.members
+            if len(group_members) > 1
+        ]
+
+
+def get_component_graph(repository_container) -> ComponentGraph:
+    """
+    Returns the graph of the container's components.
+
+    The graph is kept with the container (see `ReContainer.derived`) and
+    carried over to the copies processors work on, so it is built once per
+    component list, without hashing the graph on every call, and its
+    memoized closures are reused.
+    """
+    return repository_container.derived("code_components", "graph",
+                                        ComponentGraph.from_components)
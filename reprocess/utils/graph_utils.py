@@ -1,4 +1,5 @@
 import uuid
+import time
 import hashlib
 from reprocess.code_component import CodeComponentContainer
 from reprocess.parsers.tree_sitter_parser import TreeSitterComponentFillerHelper
@@ -10,13 +11,17 @@ from reprocess.parsers.java_parsers import JavaFileParser, JavaComponentFillerHe
 from reprocess.parsers.go_parsers import GoFileParser, GoComponentFillerHelper
 from reprocess.parsers.java_script_parsers import JavaScriptFileParser, JavaScriptComponentFillerHelper
 from reprocess.parsers.typescript_parser import TypeScriptFileParser, TypeScriptComponentFillerHelper
-from typing import List
+from reprocess.utils.build_metrics import BuildMetrics, get_language
+from typing import List, Optional
 
 
-def create_parsers_map(files, repo_name):
+def create_parsers_map(files,
+                       repo_name,
+                       metrics: Optional[BuildMetrics] = None):
     """Creates a map of file parsers based on file extension."""
     parsers_map = {}
     for file in files:
+        start = time.perf_counter()
         if file.endswith('.py'):
             parsers_map[file] = PythonFileParser(file, repo_name)
         elif file.endswith('.c'):
@@ -32,16 +37,31 @@ def create_parsers_map(files, repo_name):
             parsers_map[file] = JavaScriptFileParser(file, repo_name)
         elif file.endswith('.ts'):
             parsers_map[file] = TypeScriptFileParser(file, repo_name)
+        if metrics is not None and file in parsers_map:
+            metrics.add_time("parsing",
+                             time.perf_counter() - start, get_language(file),
+                             parsers_map[file].file_path)
+            metrics.add_count("parsing", 1, get_language(file))
     return parsers_map
 
 
-def extract_components(parsers_map):
+def extract_components(parsers_map, metrics: Optional[BuildMetrics] = None):
     """Extracts component names and fillers from the parsers."""
     component_names = []
     component_fillers = {}
     for file, parser in parsers_map.items():
+        start = time.perf_counter()
         code_components_names = parser.extract_component_names()
         component_names.extend(code_components_names)
+        if metrics is not None:
+            language = get_language(file)
+            metrics.add_time("name_extraction",
+                             time.perf_counter() - start, language,
+                             parser.file_path)
+            metrics.add_count("name_extraction", 1, language)
+            metrics.file_components[parser.file_path] = len(
+                code_components_names)
+            start = time.perf_counter()
         for cmp in code_components_names:
             if file.endswith('.py'):
                 component_fillers[cmp] = PythonComponentFillerHelper(
@@ -65,13 +85,20 @@ def extract_components(parsers_map):
                 component_fillers[cmp] = TypeScriptComponentFillerHelper(
                     cmp, file, parser)
             # Add more conditions for other file types if needed
+        if metrics is not None:
+            metrics.add_time("component_filling",
+                             time.perf_counter() - start, language,
+                             parser.file_path)
+            metrics.add_count("component_filling", len(code_components_names),
+                              language)
     return component_names, component_fillers
 
 
-def map_files_to_ids(parsers_map):
+def map_files_to_ids(parsers_map, metrics: Optional[BuildMetrics] = None):
     """Maps files to their respective IDs."""
     id_files_map = {}
     for file in parsers_map.values():
+        start = time.perf_counter()
         id_files_map[file.file_id] = FileContainer(
             file_id=file.file_id,
             file_path=file.file_path,
@@ -79,10 +106,19 @@ def map_files_to_ids(parsers_map):
             called_components=file.extract_called_components(),
             callable_components=file.extract_callable_components(),
             code_formatted=file.code_formatted)
+        if metrics is not None:
+            language = get_language(file.file_path)
+            metrics.add_time("file_analysis",
+                             time.perf_counter() - start, language,
+                             file.file_path)
+            metrics.add_count("file_analysis", 1, language)
     return id_files_map
 
 
-def get_residual_cmp(files, file_cmp_map, repo_path):
+def get_residual_cmp(files,
+                     file_cmp_map,
+                     repo_path,
+                     metrics: Optional[BuildMetrics] = None):
 
     def normalize_code(code):
         code = code.replace("'", "").replace('"', "")
@@ -100,6 +136,7 @@ def get_residual_cmp(files, file_cmp_map, repo_path):
 
     residuals = []
     for file in files:
+        start = time.perf_counter()
         code = file.code_formatted
         file_lines = code.splitlines()
 
@@ -130,14 +167,22 @@ def get_residual_cmp(files, file_cmp_map, repo_path):
                                               called_objects=[],
                                               component_type="residual")
         residuals.append(residual_cmp)
+        if metrics is not None:
+            language = get_language(file.file_path)
+            metrics.add_time("residuals",
+                             time.perf_counter() - start, language,
+                             file.file_path)
+            metrics.add_count("residuals", 1, language)
     return residuals
 
 
 def construct_code_components(
-        component_filler_helpers: List[TreeSitterComponentFillerHelper]):
+        component_filler_helpers: List[TreeSitterComponentFillerHelper],
+        metrics: Optional[BuildMetrics] = None):
     """Constructs code components from component filler helpers."""
     code_components = []
     for helper in component_filler_helpers:
+        start = time.perf_counter()
         component = CodeComponentContainer(
             component_id=helper.component_id,
             component_name=helper.component_name,
@@ -148,6 +193,11 @@ def construct_code_components(
             called_objects=helper.extract_callable_objects(),
             component_type=helper.component_type)
         code_components.append(component)
+        if metrics is not None:
+            file_path = helper.file_parser.file_path
+            metrics.add_time("component_filling",
+                             time.perf_counter() - start,
+                             get_language(file_path), file_path)
 
     # Compute hashes for components and update IDs
     for component in code_components:
@@ -0,0 +1,261 @@
+import os
+import json
+import mmap
+import uuid
+from copy import deepcopy
+from collections.abc import Sequence
+from typing import Callable, Dict, List, Optional
+
+INDEX_VERSION = 1
+# Top-level lists of `data.json` whose elements are indexed one by one
+INDEXED_LISTS = {
+    "code_components": ("component_id", "component_name", "file_id"),
+    "files": ("file_id", "file_path")
+}
+
+
+def get_index_path(data_path: str) -> str:
+    """Returns the path of the offset index written next to `data_path`."""
+    return os.path.splitext(data_path)[0] + ".index.json"
+
+
+class JsonIndexBuilder:
+    """
+    Collects byte offsets of the values written by `JsonConverter`.
+
+    The compact output is pure ASCII (`ensure_ascii` is kept on), so offsets
+    are counted in characters while writing and are equal to byte offsets.
+    """
+
+    def __init__(self):
+        self.attributes = {}
+        self.lists = {}
+
+    def add_attribute(self, key: str, start: int, end: int):
+        self.attributes[key] = [start, end]
+
+    def add_element(self, key: str, element, start: int, end: int,
+                    code_span: Optional[List[int]]):
+        fields = INDEXED_LISTS[key]
+        entry = self.lists.setdefault(key, {
+            "offsets": [],
+            "code": [],
+            **{
+                field: []
+                for field in fields
+            }
+        })
+        entry["offsets"].append([start, end])
+        entry["code"].append(code_span)
+        values = vars(element) if hasattr(element, "__dict__") else {}
+        for field in fields:
+            entry[field].append(values.get(field))
+
+    def save(self, data_path: str):
+        """Atomically writes the index for the (already renamed) data file."""
+        stat = os.stat(data_path)
+        index = {
+            "version": INDEX_VERSION,
+            "data_size": stat.st_size,
+            "data_mtime_ns": stat.st_mtime_ns,
+            "attributes": self.attributes,
+            "lists": self.lists
+        }
+        index_path = get_index_path(data_path)
+        tmp_path = f"{index_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump(index, file, separators=(",", ":"))
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def load_index(data_path: str) -> Optional[dict]:
+    """
+    Loads the offset index of `data_path`.
+
+    Returns:
+        Optional[dict]: The index, or None if it is absent, unreadable or
+        was written for another version of the data file.
+    """
+    try:
+        with open(get_index_path(data_path)) as file:
+            index = json.load(file)
+        stat = os.stat(data_path)
+    except (OSError, ValueError):
+        return None
+    if (index.get("version") != INDEX_VERSION
+            or index.get("data_size") != stat.st_size
+            or index.get("data_mtime_ns") != stat.st_mtime_ns):
+        return None
+    return index
+
+
+class JsonDataReader:
+    """
+    Memory-mapped `data.json` reading single values by their offsets.
+
+    The mapping is kept until `close` (or the end of a `with` block); on
+    Windows a mapped file cannot be replaced, e.g. by the next
+    `JsonConverter`.
+    """
+
+    def __init__(self, data_path: str, index: dict):
+        self.data_path = data_path
+        self.index = index
+        self.closed = False
+        with open(data_path, "rb") as file:
+            # mmap of an empty file is not allowed
+            self.data = mmap.mmap(
+                file.fileno(), 0,
+                access=mmap.ACCESS_READ) if index["data_size"] else b""
+
+    def load(self, start: int, end: int):
+        if self.closed:
+            raise ValueError(f"{self.data_path} was closed, load it again")
+        return json.loads(self.data[start:end])
+
+    def close(self):
+        """Unmaps the file; values not loaded yet can no longer be read."""
+        if not self.closed:
+            self.closed = True
+            if isinstance(self.data, mmap.mmap):
+                self.data.close()
+            self.data = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def __deepcopy__(self, memo):
+        # the mapping is read-only and shared by all copies
+        return self
+
+
+class LazyJsonList(Sequence):
+    """
+    Read-only list of `code_components` or `files` materialized on access.
+
+    An element is parsed from the memory-mapped data file (and converted
+    with `restore`) the first time it is requested, and cached afterwards.
+    Ids, names and paths come from the index, so lookups do not parse
+    anything, and `get_code` reads `component_code` without building the
+    component. Copies share the mapping (closed with `reader.close()`, after
+    which only materialized elements can be read) and only copy the
+    materialized elements, and equality checks only compare elements
+    materialized on either side, so processors working on a few components
+    stay cheap.
+    """
+
+    def __init__(self, reader: JsonDataReader, key: str,
+                 restore: Callable[[object], object]):
+        self.reader = reader
+        self.key = key
+        self.restore = restore
+        self.entry = reader.index["lists"].get(key, {"offsets": []})
+        self.cache: Dict[int, object] = {}
+        self._positions = None
+
+    def __len__(self):
+        return len(self.entry["offsets"])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        element = self.cache.get(index)
+        if element is None:
+            start, end = self.entry["offsets"][index]
+            element = self.cache[index] = self.restore(
+                self.reader.load(start, end))
+        return element
+
+    def field(self, name: str) -> list:
+        """Returns the indexed field (e.g. `component_name`) of all elements."""
+        return self.entry[name]
+
+    def get(self, element_id: str):
+        """Materializes the element with the given component or file id."""
+        if self._positions is None:
+            id_field = "component_id" if self.key == "code_components" else "file_id"
+            self._positions = {
+                value: position
+                for position, value in enumerate(self.entry[id_field])
+            }
+        position = self._positions.get(element_id)
+        return self[position] if position is not None else None
+
+    def find(self, field: str, value) -> list:
+        """Materializes elements whose indexed `field` equals `value`."""
+        return [
+            self[position]
+            for position, field_value in enumerate(self.entry[field])
+            if field_value == value
+        ]
+
+    def get_code(self, index: int) -> Optional[str]:
+        """Reads `component_code` of an element without materializing it."""
+        if index in self.cache:
+            return getattr(self.cache[index], "component_code", None)
+        span = self.entry["code"][index]
+        return self.reader.load(*span) if span else None
+
+    def __eq__(self, other):
+        if (isinstance(other, LazyJsonList) and other.reader is self.reader
+                and other.key == self.key):
+            return all(self[index] == other[index]
+                       for index in self.cache.keys() | other.cache.keys())
+        if isinstance(other, (list, tuple, LazyJsonList)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __deepcopy__(self, memo):
+        copied = LazyJsonList(self.reader, self.key, self.restore)
+        copied.cache = deepcopy(self.cache, memo)
+        return copied
+
+    def __repr__(self):
+        return f"<LazyJsonList {self.key}: {len(self.cache)}/{len(self)} loaded>"
+
+
+def close_lazy_lists(attributes: dict):
+    """Closes the readers of the `LazyJsonList` values among container attributes."""
+    for value in attributes.values():
+        if isinstance(value, LazyJsonList):
+            value.reader.close()
+
+
+def load_lazy(data_path: str, index: dict, restore: Callable[[object],
+                                                             object]) -> dict:
+    """
+    Restores container attributes, deferring indexed lists to `LazyJsonList`.
+
+    Attributes other than `code_components` and `files` are parsed eagerly
+    from their own byte ranges.
+    """
+    reader = JsonDataReader(data_path, index)
+    attributes = {}
+    for key, (start, end) in index["attributes"].items():
+        if key in index["lists"]:
+            attributes[key] = LazyJsonList(reader, key, restore)
+        else:
+            attributes[key] = restore(reader.load(start, end))
+    return attributes
@@ -0,0 +1,90 @@
+import copy
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def short_name(component_name: str) -> str:
+    """The last part of a qualified name: `package.module.Class.method` -> `method`."""
+    return component_name.rsplit(".",
+                                 1)[-1] if component_name else component_name
+
+
+# Keys computed from a field of the elements: key -> (field, function)
+DERIVED_KEYS: Dict[str, Tuple[str, Callable]] = {
+    "short_name": ("component_name", short_name)
+}
+
+
+def key_values(elements: Sequence, key: str) -> List[Any]:
+    """Values of `key` for every element of a container list."""
+    field, function = DERIVED_KEYS.get(key, (key, None))
+    values = None
+    if hasattr(elements, "field"):
+        # a lazily loaded list reads indexed fields without building elements
+        try:
+            values = list(elements.field(field))
+        except KeyError:
+            pass
+    if values is None:
+        values = [getattr(element, field, None) for element in elements]
+    return list(map(function, values)) if function is not None else values
+
+
+class ListCache:
+    """
+    Data computed from a container list.
+
+    It remembers the list it was built for and its length, so it is not
+    used for another list (an attribute replaced by a processor) or for one
+    that was appended to or shortened; changing an element in place is not
+    detected.
+    """
+
+    def __init__(self, elements: Sequence):
+        self.elements = elements
+        self.size = len(elements)
+
+    def is_valid_for(self, elements: Sequence) -> bool:
+        return elements is self.elements and len(elements) == self.size
+
+    def rebound(self, elements: Sequence) -> "ListCache":
+        """The same data for a copy of its list."""
+        rebound = copy.copy(self)
+        rebound.elements = elements
+        return rebound
+
+
+class LookupIndex(ListCache):
+    """Positions of the elements of a container list by the value of a key."""
+
+    def __init__(self, elements: Sequence, key: str):
+        super().__init__(elements)
+        self.positions: Dict[Any, List[int]] = {}
+        for position, value in enumerate(key_values(elements, key)):
+            self.positions.setdefault(value, []).append(position)
+
+    def get(self, value) -> list:
+        return [
+            self.elements[position]
+            for position in self.positions.get(value, ())
+        ]
+
+
+class DerivedValue(ListCache):
+    """
+    A value built from a container list, e.g. the dependency graph of
+    `code_components`.
+
+    A value referring to the list itself should have a `rebind(elements)`
+    method returning the value for a copy of the list; other values are
+    shared by the copies.
+    """
+
+    def __init__(self, elements: Sequence, build: Callable[[Sequence], Any]):
+        super().__init__(elements)
+        self.value = build(elements)
+
+    def rebound(self, elements: Sequence) -> "DerivedValue":
+        rebound = super().rebound(elements)
+        if hasattr(self.value, "rebind"):
+            rebound.value = self.value.rebind(elements)
+        return rebound
@@ -0,0 +1,191 @@
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+_LITERAL = re.compile(
+    r"""\#[^\n]*|//[^\n]*|/\*.*?\*/
+    |"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'""", re.VERBOSE | re.DOTALL)
+_NUMBER = re.compile(r"\b\d[\w.]*")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+# multiply-shift hashing keeps the upper half of a 64-bit product
+_HASH_SHIFT = np.uint64(32)
+_EMPTY = np.iinfo(np.uint64).max
+
+
+def normalize_tokens(code: str) -> List[str]:
+    """
+    Splits code into tokens, ignoring layout and comments (`#` and C-style
+    ones, so also preprocessor lines).
+
+    String and number literals are replaced by placeholders, so clones
+    differing only in constants get the same tokens.
+    """
+    code = _LITERAL.sub(
+        lambda match: " "
+        if match.group()[0] in "#/" else " __str__ ", code or "")
+    return _TOKEN.findall(_NUMBER.sub(" __num__ ", code))
+
+
+def lsh_parameters(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Chooses the number of bands and rows per band for a similarity threshold.
+
+    Pairs with similarity s become candidates with probability
+    1 - (1 - s^rows)^bands; the split whose curve has its steepest point,
+    (1 / bands)^(1 / rows), closest to the threshold is chosen.
+    """
+    splits = [(num_perm // rows, rows) for rows in range(1, num_perm + 1)]
+    return min(splits,
+               key=lambda split: abs(
+                   (1 / split[0])**(1 / split[1]) - threshold))
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures of code components in vectorized batches.
+
+    Every component is turned into the set of hashed shingles (runs of
+    `shingle_size` normalized tokens), and every one of the `num_perm`
+    hash functions is a multiply-shift hash `(a * x + b) >> 32`. Shingles of
+    a batch of components are hashed by all functions at once as a NumPy
+    matrix and reduced per component with `np.minimum.reduceat`.
+
+    Signatures are cached by component id for the lifetime of the hasher;
+    since ids are hashes of the name and the code, a cached signature stays
+    valid, and later calls only hash new components.
+    """
+
+    def __init__(self,
+                 num_perm: int = 128,
+                 shingle_size: int = 5,
+                 seed: int = 1,
+                 batch_tokens: int = 1 << 16):
+        """
+        :param num_perm: Number of hash functions, the length of the signatures.
+        :param shingle_size: Number of tokens per shingle.
+        :param seed: Seed of the hash functions.
+        :param batch_tokens: Approximate number of tokens hashed at once.
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.batch_tokens = batch_tokens
+        rng = np.random.default_rng(seed)
+        # odd multipliers make multiply-shift a universal family
+        self.multipliers = rng.integers(0, 1 << 63, num_perm,
+                                        dtype=np.uint64) * np.uint64(2) + 1
+        self.increments = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+        self.signatures: Dict[str, np.ndarray] = {}
+        self._token_hashes: Dict[str, int] = {}
+
+    def _hash_batch(self, token_lists: List[List[str]]) -> np.ndarray:
+        """Computes the signatures of the token lists of a batch of components."""
+        token_hashes = self._token_hashes
+        lengths = np.fromiter(map(len, token_lists),
+                              dtype=np.int64,
+                              count=len(token_lists))
+        flat = np.fromiter(
+            (token_hashes.get(token)
+             or token_hashes.setdefault(token,
+                                        zlib.crc32(token.encode()) + 1)
+             for tokens in token_lists for token in tokens),
+            dtype=np.uint64,
+            count=int(lengths.sum()))
+        # shingles of all components at once; those crossing a boundary
+        # between components are dropped
+        count = max(len(flat) - self.shingle_size + 1, 0)
+        shingles = np.zeros(count, dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            shingles = shingles * np.uint64(1000003) + flat[offset:offset +
+                                                            count]
+        shingle_counts = np.maximum(lengths - self.shingle_size + 1, 0)
+        first = np.cumsum(shingle_counts) - shingle_counts
+        positions = np.repeat(
+            np.cumsum(lengths) - lengths - first, shingle_counts) + np.arange(
+                int(shingle_counts.sum()))
+        shingles = shingles[positions] >> _HASH_SHIFT
+
+        result = np.full((len(token_lists), self.num_perm),
+                         _EMPTY,
+                         dtype=np.uint64)
+        filled = shingle_counts > 0
+        if len(shingles):
+            hashed = (shingles[:, None] * self.multipliers +
+                      self.increments) >> _HASH_SHIFT
+            result[filled] = np.minimum.reduceat(hashed, first[filled], axis=0)
+        return result
+
+    def signatures_of(self, component_ids: Sequence[str],
+                      codes: Sequence[str]) -> np.ndarray:
+        """
+        Returns the signatures of components as a matrix with a row per component.
+
+        Components with fewer than `shingle_size` tokens get a row of the
+        maximal value.
+        """
+        missing = [
+            position for position, component_id in enumerate(component_ids)
+            if component_id not in self.signatures
+        ]
+        batch, batch_size = [], 0
+        for number, position in enumerate(missing):
+            tokens = normalize_tokens(codes[position])
+            batch.append((position, tokens))
+            batch_size += len(tokens)
+            if batch_size >= self.batch_tokens or number == len(missing) - 1:
+                rows = self._hash_batch([tokens for _, tokens in batch])
+                for (batch_position, _), row in zip(batch, rows):
+                    self.signatures[component_ids[batch_position]] = row
+                batch, batch_size = [], 0
+        if not component_ids:
+            return np.zeros((0, self.num_perm), dtype=np.uint64)
+        return np.stack(
+            [self.signatures[component_id] for component_id in component_ids])
+
+
+def find_similar_pairs(
+        signatures: np.ndarray,
+        threshold: float,
+        bands: Optional[int] = None) -> List[Tuple[int, int, float]]:
+    """
+    Finds pairs of rows whose estimated Jaccard similarity reaches the threshold.
+
+    Signatures are split into bands; rows sharing all values of a band fall
+    into the same bucket and become candidates, which are then checked by
+    the fraction of equal signature values. Rows of the maximal value (no
+    shingles) are skipped.
+
+    :return: (first row, second row, similarity) with first < second,
+        sorted by descending similarity.
+    """
+    num_perm = signatures.shape[1]
+    if bands is None:
+        bands, rows = lsh_parameters(num_perm, threshold)
+    else:
+        rows = num_perm // bands
+    usable = np.flatnonzero(~(signatures == _EMPTY).all(axis=1))
+    candidates = set()
+    for band in range(bands):
+        # rows with equal band values get equal keys; colliding keys only
+        # add candidates, which are checked below
+        keys = np.zeros(len(usable), dtype=np.uint64)
+        for column in signatures[usable, band * rows:(band + 1) * rows].T:
+            keys = keys * np.uint64(1000003) ^ column
+        order = np.argsort(keys, kind="stable")
+        boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+        for bucket in np.split(usable[order], boundaries):
+            if len(bucket) > 1:
+                members = sorted(bucket.tolist())
+                candidates.update((first, second)
+                                  for index, first in enumerate(members)
+                                  for second in members[index + 1:])
+    if not candidates:
+        return []
+    pairs = np.array(sorted(candidates), dtype=np.int64)
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:,
+                                                              1]]).mean(axis=1)
+    keep = np.flatnonzero(similarity >= threshold)
+    keep = keep[np.argsort(-similarity[keep], kind="stable")]
+    return [(int(pairs[index, 0]), int(pairs[index,
+                                             1]), float(similarity[index]))
+            for index in keep]
@@ -0,0 +1,225 @@
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Set
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Patterns with more alternatives are not prefiltered
+MAX_ALTERNATIVES = 16
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _merge(left: List[List[str]], right: List[List[str]]):
+    """Combines two requirements in disjunctive normal form with AND."""
+    merged = [a + b for a in left for b in right]
+    return merged if len(merged) <= MAX_ALTERNATIVES else None
+
+
+def required_literals(parsed) -> Optional[List[List[str]]]:
+    """
+    Extracts literal strings every match of a parsed pattern must contain.
+
+    The result is a disjunction of alternatives, each being a list of
+    literals that all occur in a matching string; `[[]]` means nothing is
+    known. None is returned when the pattern has too many alternatives.
+    """
+    alternatives = [[]]
+    run = []
+
+    def flush():
+        nonlocal alternatives, run
+        if run:
+            alternatives = [
+                alternative + ["".join(run)] for alternative in alternatives
+            ]
+            run = []
+
+    for op, argument in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(argument))
+            continue
+        flush()
+        inner = None
+        if op is sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, pattern = argument
+            if not add_flags and not del_flags:
+                inner = required_literals(pattern)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            minimum, _, pattern = argument
+            if minimum >= 1:
+                inner = required_literals(pattern)
+        elif op is sre_parse.BRANCH:
+            branches = [required_literals(branch) for branch in argument[1]]
+            if all(branch is not None for branch in branches):
+                inner = [
+                    alternative for branch in branches
+                    for alternative in branch
+                ]
+                if len(inner) > MAX_ALTERNATIVES:
+                    inner = None
+        if inner is not None and inner != [[]]:
+            if [] in inner:
+                # one of the alternatives requires nothing
+                continue
+            merged = _merge(alternatives, inner)
+            if merged is not None:
+                alternatives = merged
+    flush()
+    return alternatives
+
+
+def literal_prefix(parsed) -> Optional[str]:
+    """Returns the literal prefix of a pattern anchored with `^`, if any."""
+    items = list(parsed)
+    if not items or items[0] != (sre_parse.AT, sre_parse.AT_BEGINNING):
+        return None
+    prefix = []
+    for op, argument in items[1:]:
+        if op is not sre_parse.LITERAL:
+            break
+        prefix.append(chr(argument))
+    return "".join(prefix) or None
+
+
+def parse_pattern(pattern: str):
+    """Parses a pattern for literal extraction (None for case-insensitive patterns)."""
+    if re.compile(pattern).flags & re.IGNORECASE:
+        return None
+    return sre_parse.parse(pattern)
+
+
+def postings_candidates(
+        postings: Dict[str, List[int]],
+        alternatives: Optional[List[List[str]]]) -> Optional[Set[int]]:
+    """
+    Selects postings of strings containing the required literals.
+
+    Every alternative of `required_literals` is answered by intersecting the
+    posting lists of the trigrams of its literals, and the alternatives are
+    united. None is returned when an alternative has no trigram, as then
+    any string may match.
+    """
+    if alternatives is None:
+        return None
+    union = set()
+    for literals in alternatives:
+        grams = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        if not grams:
+            return None
+        lists = sorted((postings.get(gram, []) for gram in grams), key=len)
+        positions = set(lists[0])
+        for other in lists[1:]:
+            if not positions:
+                break
+            positions.intersection_update(other)
+        union |= positions
+    return union
+
+
+class NameIndex:
+    """
+    Index of component names for regular expression lookups.
+
+    Names are kept sorted for prefix lookups of anchored patterns, and a
+    trigram index maps every three-character substring to the positions of
+    the names containing it. Literal parts of a pattern select candidate
+    positions, and only the candidates are checked with the regular
+    expression itself.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self.sorted_names = sorted((name, position)
+                                   for position, name in enumerate(self.names)
+                                   if name is not None)
+        self.postings: Dict[str, List[int]] = {}
+        for position, name in enumerate(self.names):
+            for trigram in trigrams(name or ""):
+                self.postings.setdefault(trigram, []).append(position)
+
+    def prefix_positions(self, prefix: str) -> Set[int]:
+        start = bisect_left(self.sorted_names, (prefix, -1))
+        positions = set()
+        for name, position in self.sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            positions.add(position)
+        return positions
+
+    def candidates(self, pattern: str) -> Optional[Set[int]]:
+        """
+        Returns positions of names that may match `pattern`.
+
+        Returns:
+            Optional[Set[int]]: A superset of the matching positions, or None
+            if the pattern gives nothing to filter by.
+        """
+        parsed = parse_pattern(pattern)
+        if parsed is None:
+            return None
+
+        result = None
+        prefix = literal_prefix(parsed)
+        if prefix is not None:
+            result = self.prefix_positions(prefix)
+
+        union = postings_candidates(self.postings, required_literals(parsed))
+        if union is not None:
+            result = union if result is None else result & union
+        return result
+
+    def search(self, patterns: Sequence[str]) -> Dict[str, List[int]]:
+        """
+        Finds positions of names matching each of the patterns in one pass.
+
+        Returns:
+            Dict[str, List[int]]: Ascending positions of matching names by pattern.
+        """
+        compiled = {pattern: re.compile(pattern) for pattern in patterns}
+        candidates = {
+            pattern: self.candidates(pattern)
+            for pattern in compiled
+        }
+        if any(positions is None for positions in candidates.values()):
+            scan = range(len(self.names))
+        else:
+            scan = sorted(set().union(*candidates.values()))
+
+        found = {pattern: [] for pattern in compiled}
+        for position in scan:
+            name = self.names[position]
+            if name is None:
+                continue
+            for pattern, regexp in compiled.items():
+                pattern_candidates = candidates[pattern]
+                if (pattern_candidates is None or position
+                        in pattern_candidates) and regexp.search(name):
+                    found[pattern].append(position)
+        return found
+
+
+def _build_name_index(components: Sequence) -> NameIndex:
+    if hasattr(components, "field"):
+        # a lazily loaded list has the names in its index
+        return NameIndex(list(components.field("component_name")))
+    return NameIndex([component.component_name for component in components])
+
+
+def get_name_index(repository_container) -> NameIndex:
+    """
+    Returns the name index of the container's components.
+
+    The index is kept with the container (see `ReContainer.derived`) and
+    carried over to the copies processors work on, so repeated lookups
+    against the same components neither rebuild nor compare the names.
+    """
+    return repository_container.derived("code_components", "name_index",
+                                        _build_name_index)
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+# a context variable, so pipelines in other threads (which start with an
+# empty context) are not recorded by this thread's profiler, while asyncio
+# tasks inherit it
+_active_profiler: ContextVar[Optional["ProcessorProfiler"]] = ContextVar(
+    "active_profiler", default=None)
+
+
+def get_active_profiler():
+    """
+    Returns the profiler activated for the current pipeline, or None.
+
+    The processor wrappers call this on every invocation, so when profiling
+    is disabled the only overhead is a context variable lookup and a
+    comparison with None.
+    """
+    return _active_profiler.get()
+
+
+class ProcessorProfiler:
+    """
+    Collects per-processor timings of a pipeline run.
+
+    For every executed processor an event is recorded with its wall time,
+    CPU time, peak traced memory and the time spent deep-copying the
+    `ReContainer`. Every container copy is recorded as a separate event as well.
+    Events are plain dictionaries; they are kept in `events`, passed to
+    listeners as soon as they are produced and can be saved as a Chrome trace
+    (viewable in `chrome://tracing` or Perfetto).
+
+    The profiler is activated either by passing it to `Compose` or by using it
+    as a context manager around direct processor calls. It only records the
+    pipeline of the thread (or asyncio task) that activated it.
+
+    Attributes:
+        trace_path (Optional[str]): If set, a Chrome trace is written there when the profiler is deactivated.
+        trace_memory (bool): Whether peak memory is measured with `tracemalloc`. Tracing slows execution noticeably.
+        events (List[dict]): Recorded events in completion order.
+    """
+
+    def __init__(self,
+                 trace_path: Optional[str] = None,
+                 trace_memory: bool = True,
+                 listeners: Optional[List[Callable[[dict], None]]] = None):
+        self.trace_path = trace_path
+        self.trace_memory = trace_memory
+        self.listeners = list(listeners) if listeners else []
+        self.events = []
+        self._spans = []
+        self._previous = []
+        self._started_tracemalloc = False
+        self._origin = time.perf_counter()
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        """Registers a callable receiving every event when it is recorded."""
+        self.listeners.append(listener)
+
+    def __enter__(self):
+        self._previous.append(_active_profiler.set(self))
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_profiler.reset(self._previous.pop())
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if self.trace_path and not self._previous:
+            self.write_chrome_trace(self.trace_path)
+        return False
+
+    def _emit(self, event: dict) -> None:
+        self.events.append(event)
+        for listener in self.listeners:
+            listener(event)
+
+    @contextmanager
+    def processor_span(self, name: str):
+        """Records the execution of the processor `name`."""
+        measure_memory = self.trace_memory and tracemalloc.is_tracing()
+        if measure_memory:
+            start_memory, peak = tracemalloc.get_traced_memory()
+            if self._spans:
+                self._spans[-1]["peak"] = max(self._spans[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+        span = {"copy_time": 0.0, "peak": 0}
+        self._spans.append(span)
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            cpu_time = time.process_time() - start_cpu
+            self._spans.pop()
+            peak_memory = None
+            if measure_memory:
+                # nested spans reset the peak, so their maxima are propagated up
+                peak = max(tracemalloc.get_traced_memory()[1], span["peak"])
+                peak_memory = peak - start_memory
+                if self._spans:
+                    self._spans[-1]["peak"] = max(self._spans[-1]["peak"],
+                                                  peak)
+            self._emit({
+                "type": "processor",
+                "name": name,
+                "start": start - self._origin,
+                "wall_time": wall_time,
+                "cpu_time": cpu_time,
+                "peak_memory": peak_memory,
+                "copy_time": span["copy_time"],
+                "depth": len(self._spans),
+                "thread_id": threading.get_ident()
+            })
+
+    @contextmanager
+    def copy_span(self, reason: str):
+        """Records a deep copy of the container made for the reason given."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            if self._spans:
+                self._spans[-1]["copy_time"] += wall_time
+            self._emit({
+                "type": "container_copy",
+                "name": reason,
+                "start": start - self._origin,
+                "wall_time": wall_time,
+                "depth": len(self._spans),
+                "thread_id": threading.get_ident()
+            })
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Aggregates processor events by processor name.
+
+        Returns:
+            Dict[str, dict]: For each processor the number of calls and the summed
+            wall, CPU and copy times together with the largest peak memory.
+        """
+        summary = {}
+        for event in self.events:
+            if event["type"] != "processor":
+                continue
+            stats = summary.setdefault(
+                event["name"], {
+                    "calls": 0,
+                    "wall_time": 0.0,
+                    "cpu_time": 0.0,
+                    "copy_time": 0.0,
+                    "peak_memory": None
+                })
+            stats["calls"] += 1
+            for key in ("wall_time", "cpu_time", "copy_time"):
+                stats[key] += event[key]
+            if event["peak_memory"] is not None:
+                stats["peak_memory"] = max(stats["peak_memory"] or 0,
+                                           event["peak_memory"])
+        return summary
+
+    def to_chrome_trace(self) -> dict:
+        """Converts recorded events to the Chrome trace event format."""
+        trace_events = []
+        for event in self.events:
+            args = {
+                key: value
+                for key, value in event.items()
+                if key not in ("name", "start", "thread_id")
+            }
+            trace_events.append({
+                "name": event["name"],
+                "cat": event["type"],
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["wall_time"] * 1e6,
+                "pid": os.getpid(),
+                "tid": event["thread_id"],
+                "args": args
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Writes recorded events to `path` as a Chrome trace JSON file."""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
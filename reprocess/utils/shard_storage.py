@@ -0,0 +1,221 @@
+import os
+import json
+import uuid
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Shard of components whose `file_id` matches no file of the container
+UNASSIGNED = "__unassigned__"
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def write_atomic(path: str, data: bytes):
+    """Writes `data` under a temporary name, syncs it and renames it to `path`."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _truncate_torn_tail(file) -> None:
+    """
+    Cuts an incomplete last line, left by an interrupted append, off a file.
+
+    Only the end of the file is read: complete lines end with a newline.
+    """
+    end = position = file.seek(0, os.SEEK_END)
+    chunk = 1 << 16
+    while position > 0:
+        size = min(chunk, position)
+        position -= size
+        file.seek(position)
+        data = file.read(size)
+        if position + size == end and data.endswith(b"\n"):
+            return
+        newline = data.rfind(b"\n")
+        if newline >= 0:
+            file.truncate(position + newline + 1)
+            return
+    file.truncate(0)
+
+
+def append_line(path: str, data: bytes):
+    """
+    Appends `data`, which must not contain a newline, as a line and syncs it.
+
+    A torn line of an interrupted append would glue to the new one and hide
+    it from readers stopping at the first invalid line, so it is cut off
+    first.
+    """
+    if os.path.exists(path):
+        with open(path, "rb+") as file:
+            _truncate_torn_tail(file)
+    with open(path, "ab") as file:
+        file.write(data + b"\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _shard_name(key: str, data_hash: str) -> str:
+    # names are content-addressed: a shard is never overwritten in place, so
+    # the manifest always points to complete files
+    return f"{_content_hash(key.encode('utf-8'))[:16]}-{data_hash[:16]}.json"
+
+
+def load_manifest(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def group_by_file(attributes: dict) -> Dict[str, Tuple[object, List[object]]]:
+    """Groups components by their file: {file_id: (file, components)}."""
+    shards = {}
+    for code_file in attributes.get("files") or ():
+        shards[code_file.file_id] = (code_file, [])
+    for component in attributes.get("code_components") or ():
+        file_id = getattr(component, "file_id", None)
+        if file_id not in shards:
+            file_id = UNASSIGNED
+            shards.setdefault(UNASSIGNED, (None, []))
+        shards[file_id][1].append(component)
+    return shards
+
+
+def write_shards(directory: str, attributes: dict,
+                 encode: Callable[[object], str]) -> Dict[str, int]:
+    """
+    Saves container attributes as per-file shards.
+
+    Every file is stored with its components, and so with their links, in
+    its own shard. A global index keeps the external components, and the
+    manifest lists shards with the remaining container attributes.
+    Shards whose content did not change since the previous save are reused;
+    new shards are written first, the manifest is swapped in atomically
+    last and unreferenced shards are removed afterwards, so an interrupted
+    save leaves the previous state readable.
+
+    :param directory: Directory of the shards of one repository.
+    :param attributes: Attributes of the repository container.
+    :param encode: Serialises values to JSON (supports sets and class instances).
+    :return: Numbers of written and reused shards.
+    """
+    os.makedirs(directory, exist_ok=True)
+    previous = load_manifest(directory) or {"shards": [], "index": None}
+    existing = {shard["name"] for shard in previous["shards"]}
+    stats = {"written": 0, "reused": 0}
+
+    shards = []
+    for key, (code_file, components) in group_by_file(attributes).items():
+        data = encode({
+            "file": code_file,
+            "components": components
+        }).encode("utf-8")
+        name = _shard_name(key, _content_hash(data))
+        if name in existing:
+            stats["reused"] += 1
+        else:
+            write_atomic(os.path.join(directory, name), data)
+            stats["written"] += 1
+        shards.append({
+            "name": name,
+            "file_id": None if key == UNASSIGNED else key,
+            "file_path": getattr(code_file, "file_path", None),
+            "components": len(components)
+        })
+
+    # edges are kept with their components in the file shards
+    index_data = encode({
+        "external_components":
+        attributes.get("external_components")
+    }).encode("utf-8")
+    index_name = _shard_name("index", _content_hash(index_data))
+    if index_name != previous.get("index"):
+        write_atomic(os.path.join(directory, index_name), index_data)
+
+    structured = ("code_components", "files", "external_components")
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "order": list(attributes),
+        "attributes": {
+            key: value
+            for key, value in attributes.items()
+            if key not in structured or value is None
+        },
+        "index": index_name,
+        "shards": shards
+    }
+    write_atomic(os.path.join(directory, MANIFEST_NAME),
+                 encode(manifest).encode("utf-8"))
+
+    referenced = {shard["name"] for shard in shards} | {index_name}
+    for name in os.listdir(directory):
+        if name.endswith(".json") and name != MANIFEST_NAME and (
+                name not in referenced):
+            os.remove(os.path.join(directory, name))
+    return stats
+
+
+def _read_json(path: str):
+    with open(path, "rb") as file:
+        return json.loads(file.read())
+
+
+def read_shards(directory: str,
+                restore: Callable[[object], object],
+                workers: Optional[int] = None) -> dict:
+    """
+    Restores container attributes from shards, reading them in parallel.
+
+    Components are grouped by file in the order of the files.
+
+    :param directory: Directory of the shards of one repository.
+    :param restore: Converts JSON-decoded values back to objects
+        (e.g. `JsonDeconverter.dict_to_class` bound to a class map).
+    :param workers: Number of reading threads (`None` lets the executor decide).
+    :return: Attributes of the repository container.
+    """
+    manifest = load_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(os.path.join(directory, MANIFEST_NAME))
+
+    paths = [
+        os.path.join(directory, shard["name"]) for shard in manifest["shards"]
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        index_future = executor.submit(
+            _read_json, os.path.join(directory, manifest["index"]))
+        shards = list(executor.map(_read_json, paths))
+        index = index_future.result()
+
+    files, components = [], []
+    for shard in shards:
+        if shard["file"] is not None:
+            files.append(shard["file"])
+        components += shard["components"]
+    structured = {
+        "code_components": restore(components),
+        "files": restore(files),
+        "external_components": index["external_components"]
+    }
+    attributes = restore(manifest["attributes"])
+    return {
+        key: attributes[key] if key in attributes else structured[key]
+        for key in manifest["order"]
+    }
@@ -0,0 +1,333 @@
+import sys
+import json
+import zlib
+import struct
+from array import array
+from typing import BinaryIO, Callable, Dict, List, Optional
+from reprocess.code_component import CodeComponentContainer
+from reprocess.file_analyzer import FileContainer
+
+MAGIC = b"RPSNAP\x00\x01"
+VERSION = 1
+# Marks a missing (None) string in string references
+NONE_REF = 0xFFFFFFFF
+
+COMPONENT_FIELDS = ("component_id", "component_name", "component_code",
+                    "linked_component_ids", "file_id",
+                    "external_component_ids", "called_objects",
+                    "component_type")
+FILE_FIELDS = ("file_id", "file_path", "imports", "called_components",
+               "callable_components", "code_formatted")
+
+# Columns of the fixed-width component and file records; `*_start`/`*_count`
+# columns address a slice of the shared reference array
+COMPONENT_COLUMNS = ("id", "name", "type", "file_id", "code", "linked_start",
+                     "linked_count", "external_start", "external_count",
+                     "called_start", "called_count")
+FILE_COLUMNS = ("id", "path", "code", "imports_start", "imports_count",
+                "called_start", "called_count", "callable_start",
+                "callable_count")
+
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<8sQQ")
+
+
+def _u32_array(values=()) -> array:
+    result = array("I", values)
+    assert result.itemsize == 4, "unsigned int must be 4 bytes wide"
+    return result
+
+
+def _to_le_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le_bytes(data, typecode: str = "I") -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class _StringTable:
+    """Deduplicating table of short strings (names, paths, ids)."""
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def ref(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE_REF
+        ref = self.index.get(value)
+        if ref is None:
+            ref = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return ref
+
+
+def _pack_strings(strings: List[str]) -> bytes:
+    """Packs strings as a char offsets array followed by their UTF-8 concatenation."""
+    offsets = _u32_array([0])
+    total = 0
+    for string in strings:
+        total += len(string)
+        offsets.append(total)
+    data = "".join(strings).encode("utf-8")
+    return (struct.pack("<I", len(strings)) + _to_le_bytes(offsets) + data)
+
+
+def _unpack_strings(data) -> List[str]:
+    (count, ) = struct.unpack_from("<I", data, 0)
+    offsets_end = 4 + 4 * (count + 1)
+    offsets = _from_le_bytes(data[4:offsets_end])
+    text = bytes(data[offsets_end:]).decode("utf-8")
+    return [text[offsets[i]:offsets[i + 1]] for i in range(count)]
+
+
+def _pack_columns(columns: Dict[str, array], names) -> bytes:
+    count = len(columns[names[0]]) if names else 0
+    return struct.pack("<I", count) + b"".join(
+        _to_le_bytes(columns[name]) for name in names)
+
+
+def _unpack_columns(data, names) -> Dict[str, array]:
+    (count, ) = struct.unpack_from("<I", data, 0)
+    columns = {}
+    position = 4
+    for name in names:
+        columns[name] = _from_le_bytes(data[position:position + 4 * count])
+        position += 4 * count
+    return columns
+
+
+def write_snapshot(file: BinaryIO,
+                   attributes: dict,
+                   encode_default: Callable,
+                   compression_level: int = 6) -> None:
+    """
+    Writes container attributes to a binary snapshot.
+
+    `code_components`, `files` and `external_components` are stored in
+    dedicated binary sections: a string table with names, paths and ids,
+    fixed-width columns of component and file records, one array of string
+    references for all their lists (edges included) and a zlib-compressed
+    section with the code. All remaining attributes, as well as attributes of
+    components and files beyond the standard ones, are kept as JSON.
+
+    :param file: A binary file object opened for writing.
+    :param attributes: Attributes of the repository container.
+    :param encode_default: `default` hook of the JSON encoder for the remaining attributes.
+    :param compression_level: zlib compression level of the code section.
+    """
+    strings = _StringTable()
+    refs = _u32_array()
+    codes = []
+
+    def add_list(values):
+        start = len(refs)
+        refs.extend(strings.ref(value) for value in values or ())
+        return start, len(refs) - start
+
+    def add_code(code):
+        if code is None:
+            return NONE_REF
+        codes.append(code)
+        return len(codes) - 1
+
+    meta = {"attributes": {}, "component_extras": {}, "file_extras": {}}
+    components = attributes.get("code_components")
+    files = attributes.get("files")
+    external_components = attributes.get("external_components")
+
+    component_columns = {name: _u32_array() for name in COMPONENT_COLUMNS}
+    for index, component in enumerate(components or ()):
+        values = vars(component)
+        row = (strings.ref(values.get("component_id")),
+               strings.ref(values.get("component_name")),
+               strings.ref(values.get("component_type")),
+               strings.ref(values.get("file_id")),
+               add_code(values.get("component_code")),
+               *add_list(values.get("linked_component_ids")),
+               *add_list(values.get("external_component_ids")),
+               *add_list(values.get("called_objects")))
+        for name, value in zip(COMPONENT_COLUMNS, row):
+            component_columns[name].append(value)
+        extras = {
+            key: value
+            for key, value in values.items() if key not in COMPONENT_FIELDS
+        }
+        if extras:
+            meta["component_extras"][index] = extras
+
+    file_columns = {name: _u32_array() for name in FILE_COLUMNS}
+    for index, code_file in enumerate(files or ()):
+        values = vars(code_file)
+        row = (strings.ref(values.get("file_id")),
+               strings.ref(values.get("file_path")),
+               add_code(values.get("code_formatted")),
+               *add_list(values.get("imports")),
+               *add_list(values.get("called_components")),
+               *add_list(values.get("callable_components")))
+        for name, value in zip(FILE_COLUMNS, row):
+            file_columns[name].append(value)
+        extras = {
+            key: value
+            for key, value in values.items() if key not in FILE_FIELDS
+        }
+        if extras:
+            meta["file_extras"][index] = extras
+
+    external_refs = _u32_array()
+    for name, component_id in (external_components or {}).items():
+        external_refs.append(strings.ref(name))
+        external_refs.append(strings.ref(component_id))
+
+    structured = {
+        "code_components": components,
+        "files": files,
+        "external_components": external_components
+    }
+    for key, value in attributes.items():
+        if key in structured and value is not None:
+            continue
+        meta["attributes"][key] = value
+    # keeps the original order of attributes in the restored container
+    meta["order"] = list(attributes)
+
+    sections = [
+        (b"META", json.dumps(meta, default=encode_default).encode("utf-8")),
+        (b"STRINGS", _pack_strings(strings.strings)),
+        (b"COMPS", _pack_columns(component_columns, COMPONENT_COLUMNS)),
+        (b"FILES", _pack_columns(file_columns, FILE_COLUMNS)),
+        (b"REFS", _to_le_bytes(refs)),
+        (b"EXTCOMP", _to_le_bytes(external_refs)),
+        (b"CODE", zlib.compress(_pack_strings(codes), compression_level)),
+    ]
+
+    position = _HEADER.size + _SECTION.size * len(sections)
+    file.write(_HEADER.pack(MAGIC, VERSION, len(sections)))
+    for name, data in sections:
+        file.write(_SECTION.pack(name, position, len(data)))
+        position += len(data)
+    for _, data in sections:
+        file.write(data)
+
+
+def read_sections(data) -> Dict[str, memoryview]:
+    """Parses the header of a snapshot and returns its sections by name."""
+    view = memoryview(data)
+    magic, version, section_count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a ReProcess snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    sections = {}
+    for index in range(section_count):
+        name, offset, length = _SECTION.unpack_from(
+            view, _HEADER.size + index * _SECTION.size)
+        sections[name.rstrip(b"\x00").decode()] = view[offset:offset + length]
+    return sections
+
+
+def read_snapshot(data, restore_meta: Callable) -> dict:
+    """
+    Restores container attributes from the bytes of a snapshot.
+
+    :param data: Snapshot content (bytes, bytearray or mmap).
+    :param restore_meta: Converts JSON-decoded values back to objects
+        (e.g. `JsonDeconverter.dict_to_class` bound to a class map).
+    :return: Attributes of the repository container.
+    """
+    sections = read_sections(data)
+    meta = json.loads(bytes(sections["META"]).decode("utf-8"))
+    strings = _unpack_strings(sections["STRINGS"])
+    refs = _from_le_bytes(sections["REFS"])
+    codes = _unpack_strings(zlib.decompress(sections["CODE"]))
+
+    def string(ref):
+        return strings[ref] if ref != NONE_REF else None
+
+    def code(ref):
+        return codes[ref] if ref != NONE_REF else None
+
+    def string_list(start, count):
+        return [string(ref) for ref in refs[start:start + count]]
+
+    restored = {}
+    comps = _unpack_columns(sections["COMPS"], COMPONENT_COLUMNS)
+    component_extras = meta["component_extras"]
+    components = []
+    for index, row in enumerate(
+            zip(*(comps[name] for name in COMPONENT_COLUMNS))):
+        (component_id, name, component_type, file_id, code_ref, linked_start,
+         linked_count, external_start, external_count, called_start,
+         called_count) = row
+        component = CodeComponentContainer.__new__(CodeComponentContainer)
+        component.__dict__.update({
+            "component_id":
+            string(component_id),
+            "component_name":
+            string(name),
+            "component_code":
+            code(code_ref),
+            "linked_component_ids":
+            string_list(linked_start, linked_count),
+            "file_id":
+            string(file_id),
+            "external_component_ids":
+            string_list(external_start, external_count),
+            "called_objects":
+            string_list(called_start, called_count),
+            "component_type":
+            string(component_type)
+        })
+        extras = component_extras.get(str(index))
+        if extras:
+            component.__dict__.update(restore_meta(extras))
+        components.append(component)
+    restored["code_components"] = components
+
+    file_columns = _unpack_columns(sections["FILES"], FILE_COLUMNS)
+    file_extras = meta["file_extras"]
+    files = []
+    for index, row in enumerate(
+            zip(*(file_columns[name] for name in FILE_COLUMNS))):
+        (file_id, path, code_ref, imports_start, imports_count, called_start,
+         called_count, callable_start, callable_count) = row
+        code_file = FileContainer.__new__(FileContainer)
+        code_file.__dict__.update({
+            "file_id":
+            string(file_id),
+            "file_path":
+            string(path),
+            "imports":
+            string_list(imports_start, imports_count),
+            "called_components":
+            string_list(called_start, called_count),
+            "callable_components":
+            string_list(callable_start, callable_count),
+            "code_formatted":
+            code(code_ref)
+        })
+        extras = file_extras.get(str(index))
+        if extras:
+            code_file.__dict__.update(restore_meta(extras))
+        files.append(code_file)
+    restored["files"] = files
+
+    external_refs = _from_le_bytes(sections["EXTCOMP"])
+    restored["external_components"] = {
+        string(external_refs[i]): string(external_refs[i + 1])
+        for i in range(0, len(external_refs), 2)
+    }
+
+    attributes = restore_meta(meta["attributes"])
+    return {
+        key: attributes[key] if key in attributes else restored[key]
+        for key in meta["order"]
+    }
@@ -0,0 +1,463 @@
+import json
+import sqlite3
+import hashlib
+from typing import Callable, Dict, Iterable, List, Optional
+from reprocess.code_component import CodeComponentContainer
+from reprocess.file_analyzer import FileContainer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS components (
+    component_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    component_name TEXT,
+    component_type TEXT,
+    file_id TEXT,
+    component_code TEXT,
+    called_objects TEXT,
+    extras TEXT,
+    row_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS components_by_name ON components (component_name);
+CREATE INDEX IF NOT EXISTS components_by_file ON components (file_id);
+CREATE INDEX IF NOT EXISTS components_by_type ON components (component_type);
+
+CREATE TABLE IF NOT EXISTS links (
+    source_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    target_id TEXT,
+    PRIMARY KEY (source_id, kind, position)
+);
+CREATE INDEX IF NOT EXISTS links_by_target ON links (target_id, kind);
+
+CREATE TABLE IF NOT EXISTS files (
+    file_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    file_path TEXT,
+    imports TEXT,
+    called_components TEXT,
+    callable_components TEXT,
+    code_formatted TEXT,
+    extras TEXT,
+    row_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_by_path ON files (file_path);
+
+CREATE TABLE IF NOT EXISTS external_components (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    component_id TEXT
+);
+CREATE INDEX IF NOT EXISTS external_components_by_id ON external_components (component_id);
+
+CREATE TABLE IF NOT EXISTS attributes (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Kinds of rows in the `links` table
+LINKED = "linked"
+EXTERNAL = "external"
+
+COMPONENT_FIELDS = ("component_id", "component_name", "component_code",
+                    "linked_component_ids", "file_id",
+                    "external_component_ids", "called_objects",
+                    "component_type")
+FILE_FIELDS = ("file_id", "file_path", "imports", "called_components",
+               "callable_components", "code_formatted")
+STRUCTURED_ATTRIBUTES = ("code_components", "files", "external_components")
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens (and creates if needed) a repository database."""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _row_hash(values: tuple) -> str:
+    return hashlib.sha1(
+        json.dumps(values, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _as_list(values) -> list:
+    if values is None:
+        return []
+    # sets have no stable order across runs, which would change row hashes
+    return sorted(values) if isinstance(values, set) else list(values)
+
+
+# Stays below SQLITE_MAX_VARIABLE_NUMBER of old SQLite builds (999)
+_MAX_PARAMS = 900
+
+
+def _chunks(values: list) -> Iterable[list]:
+    for start in range(0, len(values), _MAX_PARAMS):
+        yield values[start:start + _MAX_PARAMS]
+
+
+def _extras(obj, fields, dumps) -> Optional[str]:
+    extras = {
+        key: value
+        for key, value in vars(obj).items() if key not in fields
+    }
+    return dumps(extras) if extras else None
+
+
+def write_graph(connection: sqlite3.Connection, attributes: dict,
+                dumps: Callable[[object], str]) -> Dict[str, int]:
+    """
+    Applies container attributes to the database as row-level changes.
+
+    Every component and file row keeps a hash of its content. Rows whose hash
+    is unchanged are left untouched (only their position is updated when the
+    order changed), changed and new rows are upserted together with their
+    links, and rows absent from the container are deleted. All changes are
+    applied in one transaction with batched statements.
+
+    :param connection: Connection returned by `connect`.
+    :param attributes: Attributes of the repository container.
+    :param dumps: Serialises values to JSON (supports sets and class instances).
+    :return: Numbers of written, moved and deleted rows.
+    """
+    stats = {"written": 0, "moved": 0, "deleted": 0}
+    with connection:
+        existing = {
+            row[0]: (row[1], row[2])
+            for row in connection.execute(
+                "SELECT component_id, position, row_hash FROM components")
+        }
+        upserts, link_rows, moves = [], [], []
+        seen = set()
+        for position, component in enumerate(
+                attributes.get("code_components") or ()):
+            linked = _as_list(component.linked_component_ids)
+            external = _as_list(component.external_component_ids)
+            content = (component.component_name, component.component_type,
+                       component.file_id, component.component_code,
+                       dumps(_as_list(component.called_objects)),
+                       _extras(component, COMPONENT_FIELDS, dumps))
+            row_hash = _row_hash(content + (linked, external))
+            component_id = component.component_id
+            seen.add(component_id)
+            old = existing.get(component_id)
+            if old is not None and old[1] == row_hash:
+                if old[0] != position:
+                    moves.append((position, component_id))
+                continue
+            upserts.append((component_id, position) + content + (row_hash, ))
+            link_rows += [(component_id, LINKED, index, target)
+                          for index, target in enumerate(linked)]
+            link_rows += [(component_id, EXTERNAL, index, target)
+                          for index, target in enumerate(external)]
+        removed = [(key, ) for key in existing if key not in seen]
+
+        connection.executemany("DELETE FROM components WHERE component_id = ?",
+                               removed)
+        connection.executemany("DELETE FROM links WHERE source_id = ?",
+                               removed + [(row[0], ) for row in upserts])
+        connection.executemany(
+            """
+            INSERT INTO components (component_id, position, component_name,
+                component_type, file_id, component_code, called_objects,
+                extras, row_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (component_id) DO UPDATE SET
+                position = excluded.position,
+                component_name = excluded.component_name,
+                component_type = excluded.component_type,
+                file_id = excluded.file_id,
+                component_code = excluded.component_code,
+                called_objects = excluded.called_objects,
+                extras = excluded.extras,
+                row_hash = excluded.row_hash
+            """, upserts)
+        connection.executemany("INSERT INTO links VALUES (?, ?, ?, ?)",
+                               link_rows)
+        connection.executemany(
+            "UPDATE components SET position = ? WHERE component_id = ?", moves)
+        stats["written"] += len(upserts)
+        stats["moved"] += len(moves)
+        stats["deleted"] += len(removed)
+
+        existing = {
+            row[0]: (row[1], row[2])
+            for row in connection.execute(
+                "SELECT file_id, position, row_hash FROM files")
+        }
+        upserts, moves = [], []
+        seen = set()
+        for position, code_file in enumerate(attributes.get("files") or ()):
+            content = (code_file.file_path, dumps(_as_list(code_file.imports)),
+                       dumps(_as_list(code_file.called_components)),
+                       dumps(_as_list(code_file.callable_components)),
+                       code_file.code_formatted,
+                       _extras(code_file, FILE_FIELDS, dumps))
+            row_hash = _row_hash(content)
+            seen.add(code_file.file_id)
+            old = existing.get(code_file.file_id)
+            if old is not None and old[1] == row_hash:
+                if old[0] != position:
+                    moves.append((position, code_file.file_id))
+                continue
+            upserts.append((code_file.file_id, position) + content +
+                           (row_hash, ))
+        removed = [(key, ) for key in existing if key not in seen]
+        connection.executemany("DELETE FROM files WHERE file_id = ?", removed)
+        connection.executemany(
+            """
+            INSERT INTO files (file_id, position, file_path, imports,
+                called_components, callable_components, code_formatted,
+                extras, row_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (file_id) DO UPDATE SET
+                position = excluded.position,
+                file_path = excluded.file_path,
+                imports = excluded.imports,
+                called_components = excluded.called_components,
+                callable_components = excluded.callable_components,
+                code_formatted = excluded.code_formatted,
+                extras = excluded.extras,
+                row_hash = excluded.row_hash
+            """, upserts)
+        connection.executemany(
+            "UPDATE files SET position = ? WHERE file_id = ?", moves)
+        stats["written"] += len(upserts)
+        stats["moved"] += len(moves)
+        stats["deleted"] += len(removed)
+
+        # external components and plain attributes are small, so they are
+        # simply replaced
+        connection.execute("DELETE FROM external_components")
+        connection.executemany(
+            "INSERT INTO external_components VALUES (?, ?, ?)",
+            [(name, position, component_id)
+             for position, (name, component_id) in enumerate((
+                 attributes.get("external_components") or {}).items())])
+        connection.execute("DELETE FROM attributes")
+        connection.executemany(
+            "INSERT INTO attributes VALUES (?, ?)",
+            [(key, dumps(value)) for key, value in attributes.items()
+             if key not in STRUCTURED_ATTRIBUTES or value is None])
+        connection.execute("INSERT INTO attributes VALUES (?, ?)",
+                           ("__order__", dumps(list(attributes))))
+    return stats
+
+
+def _links(connection, source_ids: Optional[Iterable[str]] = None):
+    """Returns {source_id: {kind: [target_id, ...]}} in the stored order."""
+    query = "SELECT source_id, kind, target_id FROM links"
+    order = " ORDER BY source_id, kind, position"
+    if source_ids is None:
+        rows = connection.execute(query + order)
+    else:
+        rows = (
+            row for chunk in _chunks(list(source_ids))
+            for row in connection.execute(
+                f"{query} WHERE source_id IN ({','.join('?' * len(chunk))})" +
+                order, chunk))
+    links = {}
+    for source_id, kind, target_id in rows:
+        links.setdefault(source_id, {}).setdefault(kind, []).append(target_id)
+    return links
+
+
+def _component_from_row(row, links, restore) -> CodeComponentContainer:
+    (component_id, name, component_type, file_id, code, called_objects,
+     extras) = row
+    component_links = links.get(component_id, {})
+    component = CodeComponentContainer.__new__(CodeComponentContainer)
+    component.__dict__.update({
+        "component_id":
+        component_id,
+        "component_name":
+        name,
+        "component_code":
+        code,
+        "linked_component_ids":
+        component_links.get(LINKED, []),
+        "file_id":
+        file_id,
+        "external_component_ids":
+        component_links.get(EXTERNAL, []),
+        "called_objects":
+        json.loads(called_objects),
+        "component_type":
+        component_type
+    })
+    if extras:
+        component.__dict__.update(restore(json.loads(extras)))
+    return component
+
+
+_COMPONENT_COLUMNS = ("component_id, component_name, component_type, file_id, "
+                      "component_code, called_objects, extras")
+
+
+def read_graph(connection: sqlite3.Connection,
+               restore: Callable[[object], object]) -> dict:
+    """
+    Restores all container attributes from the database.
+
+    :param connection: Connection returned by `connect`.
+    :param restore: Converts JSON-decoded values back to objects
+        (e.g. `JsonDeconverter.dict_to_class` bound to a class map).
+    :return: Attributes of the repository container.
+    """
+    links = _links(connection)
+    components = [
+        _component_from_row(row, links, restore) for row in connection.execute(
+            f"SELECT {_COMPONENT_COLUMNS} FROM components ORDER BY position")
+    ]
+    files = []
+    for row in connection.execute(
+            "SELECT file_id, file_path, imports, called_components, "
+            "callable_components, code_formatted, extras FROM files "
+            "ORDER BY position"):
+        (file_id, file_path, imports, called_components, callable_components,
+         code_formatted, extras) = row
+        code_file = FileContainer.__new__(FileContainer)
+        code_file.__dict__.update({
+            "file_id":
+            file_id,
+            "file_path":
+            file_path,
+            "imports":
+            json.loads(imports),
+            "called_components":
+            json.loads(called_components),
+            "callable_components":
+            json.loads(callable_components),
+            "code_formatted":
+            code_formatted
+        })
+        if extras:
+            code_file.__dict__.update(restore(json.loads(extras)))
+        files.append(code_file)
+    external_components = dict(
+        connection.execute("SELECT name, component_id FROM "
+                           "external_components ORDER BY position"))
+
+    stored = dict(connection.execute("SELECT name, value FROM attributes"))
+    order = json.loads(stored.pop("__order__", "[]"))
+    attributes = {
+        key: restore(json.loads(value))
+        for key, value in stored.items()
+    }
+    structured = {
+        "code_components": components,
+        "files": files,
+        "external_components": external_components
+    }
+    return {
+        key: attributes[key] if key in attributes else structured[key]
+        for key in order
+    }
+
+
+class SqliteGraph:
+    """
+    Read-only queries over a repository database written by `SqliteConverter`.
+
+    Only the requested rows are loaded, so a component and its neighborhood
+    can be inspected without restoring the whole repository.
+    """
+
+    def __init__(self,
+                 path: str,
+                 restore: Optional[Callable[[object], object]] = None):
+        """
+        :param path: Path to the database file.
+        :param restore: Converts JSON-decoded extra attributes back to objects;
+            by default they are returned as plain dictionaries.
+        """
+        self.connection = connect(path)
+        self.restore = restore or (lambda value: value)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _components(self, where: str,
+                    params: tuple) -> List[CodeComponentContainer]:
+        rows = self.connection.execute(
+            f"SELECT {_COMPONENT_COLUMNS} FROM components WHERE {where} "
+            "ORDER BY position", params).fetchall()
+        links = _links(self.connection, [row[0] for row in rows])
+        return [_component_from_row(row, links, self.restore) for row in rows]
+
+    def get_component(self,
+                      component_id: str) -> Optional[CodeComponentContainer]:
+        components = self._components("component_id = ?", (component_id, ))
+        return components[0] if components else None
+
+    def find_by_name(self, name: str) -> List[CodeComponentContainer]:
+        return self._components("component_name = ?", (name, ))
+
+    def find_by_file(self, file_id: str) -> List[CodeComponentContainer]:
+        return self._components("file_id = ?", (file_id, ))
+
+    def find_by_type(self,
+                     component_type: str) -> List[CodeComponentContainer]:
+        return self._components("component_type = ?", (component_type, ))
+
+    def callers(self, component_id: str) -> List[str]:
+        """Returns ids of components linked to the given one."""
+        return [
+            row[0] for row in self.connection.execute(
+                "SELECT DISTINCT source_id FROM links "
+                "WHERE target_id = ? AND kind = ?", (component_id, LINKED))
+        ]
+
+    def callees(self, component_id: str) -> List[str]:
+        """Returns ids of components the given one is linked to."""
+        return [
+            row[0] for row in self.connection.execute(
+                "SELECT target_id FROM links WHERE source_id = ? AND kind = ? "
+                "ORDER BY position", (component_id, LINKED))
+        ]
+
+    def neighborhood(self,
+                     component_id: str,
+                     depth: int = 1,
+                     direction: str = "both") -> List[CodeComponentContainer]:
+        """
+        Loads the components reachable from `component_id` within `depth` links.
+
+        :param component_id: Id of the central component.
+        :param depth: Maximal number of links between the central component and a neighbor.
+        :param direction: "out" follows links of the component, "in" follows
+            links to it and "both" follows both.
+        :return: The central component and its neighbors.
+        """
+        if direction not in ("in", "out", "both"):
+            raise ValueError(f"Unknown direction: {direction}")
+        visited = {component_id}
+        frontier = [component_id]
+        for _ in range(depth):
+            next_frontier = []
+            for current in frontier:
+                neighbors = []
+                if direction in ("out", "both"):
+                    neighbors += self.callees(current)
+                if direction in ("in", "both"):
+                    neighbors += self.callers(current)
+                for neighbor in neighbors:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        components = []
+        for chunk in _chunks(list(visited)):
+            components += self._components(
+                f"component_id IN ({','.join('?' * len(chunk))})",
+                tuple(chunk))
+        return components
@@ -0,0 +1,424 @@
+import io
+import os
+import re
+import json
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from reprocess.utils.code_index import code_hash, component_ids
+from reprocess.utils.shard_storage import write_atomic
+
+VECTOR_INDEX_NAME = "vector_index.npz"
+VECTOR_INDEX_VERSION = 1
+
+# parts of identifiers: "parseHTTPResponse_v2" -> parse, http, response, v, 2
+_SUBWORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def get_vector_index_path(db_path: str, repo_name: str) -> str:
+    return os.path.join(db_path, repo_name, VECTOR_INDEX_NAME)
+
+
+class _SubwordHashes(dict):
+    """crc32 of subwords, computed on the first lookup."""
+
+    def __missing__(self, subword: str) -> int:
+        hashed = self[subword] = zlib.crc32(subword.encode())
+        return hashed
+
+
+class HashingVectorizer:
+    """
+    Embeds code as hashed bag of token n-grams, without any trained model.
+
+    Identifiers are split into lowercase subwords, and every n-gram of
+    subwords is hashed (crc32 of the subwords, combined for all texts of a
+    batch with NumPy) to one of `dimensions` columns with a sign taken from
+    the hash, which keeps collisions from adding up. Counts are
+    scaled sublinearly and rows are normalized, so dot products are cosine
+    similarities.
+
+    Any object with a `transform(texts) -> np.ndarray` method and a
+    JSON-serializable `config` can replace it in `VectorIndex`.
+    """
+
+    def __init__(self, dimensions: int = 1024, max_ngram: int = 2):
+        """
+        :param dimensions: Number of columns of the vectors.
+        :param max_ngram: Longest n-gram of subwords.
+        """
+        self.dimensions = dimensions
+        self.max_ngram = max_ngram
+        self.config = {
+            "name": "hashing",
+            "dimensions": dimensions,
+            "max_ngram": max_ngram
+        }
+        self._hashes = _SubwordHashes()
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        """Returns a float32 matrix with a normalized row per text."""
+        lengths, hashes = [], []
+        for text in texts:
+            subwords = " ".join(_SUBWORD.findall(text or "")).lower().split()
+            lengths.append(len(subwords))
+            hashes.extend(map(self._hashes.__getitem__, subwords))
+        lengths = np.asarray(lengths, dtype=np.int64)
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        starts = np.cumsum(lengths) - lengths
+        rows, features = [], []
+        ngram_hashes = np.zeros(len(hashes), dtype=np.uint64)
+        for size in range(1, self.max_ngram + 1):
+            # hashes of the n-grams of all texts at once, dropping the
+            # ones crossing a boundary between texts
+            count = len(hashes) - size + 1
+            ngram_hashes = (ngram_hashes[:count] * np.uint64(1000003) +
+                            hashes[size - 1:]) & np.uint64(0xFFFFFFFF)
+            ngram_counts = np.maximum(lengths - size + 1, 0)
+            positions = np.repeat(
+                starts - (np.cumsum(ngram_counts) - ngram_counts),
+                ngram_counts)
+            positions += np.arange(len(positions))
+            rows.append(np.repeat(np.arange(len(texts)), ngram_counts))
+            features.append(ngram_hashes[positions])
+        features = np.concatenate(features).astype(np.int64)
+        # the lowest bit of the hash gives the sign
+        signs = 1.0 - 2.0 * (features & 1)
+        # counts are summed and scaled sparsely, only the result is dense
+        cells, inverse = np.unique(np.concatenate(rows) * self.dimensions +
+                                   (features >> 1) % self.dimensions,
+                                   return_inverse=True)
+        values = np.bincount(inverse, weights=signs, minlength=len(cells))
+        values = np.sign(values) * np.log1p(np.abs(values))
+        norms = np.sqrt(
+            np.bincount(cells // self.dimensions,
+                        weights=values * values,
+                        minlength=len(texts)))
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        norms = np.where(norms > 0, norms, 1.0)
+        matrix.ravel()[cells] = values / norms[cells // self.dimensions]
+        return matrix
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions and values of the `k` highest scores of every row, best first."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.zeros((len(scores), 0))
+        return empty.astype(np.int64), empty
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(values,
+                                                                      order,
+                                                                      axis=1)
+
+
+def _code_getter(components: Sequence):
+    """Returns a function giving the code of the component at a position."""
+    # a lazily loaded list reads the code without building the component
+    return getattr(
+        components, "get_code",
+        None) or (lambda position: components[position].component_code)
+
+
+class VectorIndex:
+    """
+    Matrix of component embeddings answering nearest-neighbour queries.
+
+    Exact search scores all rows with batched matrix products. For large
+    corpora an IVF coarse quantizer can be trained (`train`): rows are
+    clustered with spherical k-means, and a query only scores the rows of
+    the `nprobe` clusters whose centroids are closest to it.
+
+    Updates are incremental by component id and the hash of the code:
+    only new or changed components are embedded, and they are assigned to
+    the nearest existing centroid. The quantizer is retrained once the
+    index has grown to twice the size it was trained on.
+    """
+
+    def __init__(self, vectorizer=None):
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.ids: List[str] = []
+        self.hashes: List[str] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.positions: Dict[str, int] = {}
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.zeros(0, dtype=np.int64)
+        self.trained_size = 0
+        self._lists = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def update(self,
+               components: Sequence,
+               batch: int = 4096) -> Dict[str, int]:
+        """
+        Brings the index in line with the given components.
+
+        :param batch: Number of components embedded at once.
+        :return: Numbers of added, removed and unchanged components.
+        """
+        get_code = _code_getter(components)
+        keep = np.zeros(len(self.ids), dtype=bool)
+        added_ids, added_hashes, added_codes = [], [], []
+        for position, component_id in enumerate(component_ids(components)):
+            code = get_code(position)
+            hashed = code_hash(code)
+            row = self.positions.get(component_id)
+            if row is not None and self.hashes[row] == hashed:
+                keep[row] = True
+            else:
+                added_ids.append(component_id)
+                added_hashes.append(hashed)
+                added_codes.append(code)
+        stats = {
+            "added": len(added_ids),
+            "removed": len(self.ids) - int(keep.sum()),
+            "unchanged": int(keep.sum())
+        }
+        if not stats["added"] and not stats["removed"]:
+            return stats
+
+        # embedded in batches to bound the memory of dense intermediate rows
+        added = np.concatenate([
+            self.vectorizer.transform(added_codes[start:start + batch])
+            for start in range(0, len(added_codes), batch)
+        ] or [self.vectorizer.transform([])])
+        kept_rows = np.flatnonzero(keep)
+        matrix = self.matrix[kept_rows] if len(self.ids) else self.matrix
+        self.matrix = np.concatenate((matrix.reshape(-1,
+                                                     added.shape[1]), added))
+        self.ids = [self.ids[row] for row in kept_rows] + added_ids
+        self.hashes = [self.hashes[row] for row in kept_rows] + added_hashes
+        self.positions = {
+            component_id: row
+            for row, component_id in enumerate(self.ids)
+        }
+        if self.centroids is not None:
+            if len(self.ids) > 2 * self.trained_size:
+                self.train(len(self.centroids))
+            else:
+                self.assignments = np.concatenate(
+                    (self.assignments[kept_rows], self._assign(added)))
+                self._lists = None
+        return stats
+
+    def _assign(self, vectors: np.ndarray, batch: int = 8192) -> np.ndarray:
+        """Numbers of the nearest centroids of the vectors."""
+        return np.concatenate(
+            [(vectors[start:start + batch] @ self.centroids.T).argmax(axis=1)
+             for start in range(0, len(vectors), batch)]
+            or [np.zeros(0, dtype=np.int64)])
+
+    def train(self,
+              n_lists: Optional[int] = None,
+              iterations: int = 10,
+              sample_size: int = 65536,
+              seed: int = 0):
+        """
+        Trains the IVF quantizer with spherical k-means on a sample of the rows.
+
+        :param n_lists: Number of clusters; by default about the square root of the size.
+        """
+        size = len(self.ids)
+        if not size:
+            return
+        n_lists = min(n_lists or max(int(size**0.5), 1), max(size, 1))
+        rng = np.random.default_rng(seed)
+        sample = self.matrix[rng.permutation(size)[:max(sample_size, n_lists)]]
+        self.centroids = sample[:n_lists].copy()
+        for _ in range(iterations):
+            assignments = self._assign(sample)
+            order = np.argsort(assignments, kind="stable")
+            counts = np.bincount(assignments, minlength=n_lists)
+            filled = np.flatnonzero(counts)
+            starts = np.cumsum(counts) - counts
+            sums = np.add.reduceat(sample[order], starts[filled], axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # empty clusters keep their centroid
+            self.centroids[filled] = sums / np.where(norms > 0, norms, 1.0)
+        self.assignments = self._assign(self.matrix)
+        self.trained_size = size
+        self._lists = None
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows grouped by cluster: (offsets, rows) in CSR form."""
+        if self._lists is None:
+            counts = np.bincount(self.assignments,
+                                 minlength=len(self.centroids))
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            self._lists = (offsets, np.argsort(self.assignments,
+                                               kind="stable"))
+        return self._lists
+
+    def search(self,
+               queries: Sequence[str],
+               k: int = 10,
+               nprobe: Optional[int] = 8,
+               batch: int = 16384) -> List[List[Tuple[str, float]]]:
+        """
+        Finds the components most similar to each query text.
+
+        :param nprobe: Number of clusters scored with a trained quantizer;
+            None (or an untrained index) scores all rows exactly.
+        :return: (component id, cosine similarity) pairs per query, best first.
+        """
+        vectors = self.vectorizer.transform(queries)
+        if not len(self.ids):
+            return [[] for _ in queries]
+        if nprobe is None or self.centroids is None:
+            return self._exact_search(vectors, k, batch)
+
+        offsets, rows = self._inverted_lists()
+        probed, _ = _top_k(vectors @ self.centroids.T, nprobe)
+        results = []
+        for vector, clusters in zip(vectors, probed):
+            candidates = np.concatenate([
+                rows[offsets[cluster]:offsets[cluster + 1]]
+                for cluster in clusters
+            ])
+            top, values = _top_k((self.matrix[candidates] @ vector)[None], k)
+            results.append([(self.ids[candidates[position]], float(value))
+                            for position, value in zip(top[0], values[0])])
+        return results
+
+    def search_components(self,
+                          components: Sequence,
+                          queries: Sequence[str],
+                          k: int = 10,
+                          nprobe: Optional[int] = 8,
+                          batch: int = 16384) -> List[List[Tuple[str, float]]]:
+        """
+        Like `search`, but only finds the given components, also if the index is stale.
+
+        Components whose ids are missing from the index (component ids
+        change with the code) are embedded for this call only and scored
+        exactly; rows of components no longer present are skipped. The index
+        is not changed, so a loaded index shared between calls stays valid,
+        and the code of indexed components is neither read nor hashed.
+        """
+        ids = component_ids(components)
+        missing = [
+            position for position, component_id in enumerate(ids)
+            if component_id not in self.positions
+        ]
+        stale = 0
+        present = None
+        if missing or len(ids) != len(self.ids):
+            present = set(ids)
+            stale = sum(component_id not in present
+                        for component_id in self.ids)
+        results = self.search(queries, k + stale, nprobe, batch)
+        if present is not None:
+            results = [[(component_id, score) for component_id, score in result
+                        if component_id in present][:k] for result in results]
+        if not missing:
+            return results
+
+        get_code = _code_getter(components)
+        added = np.concatenate([
+            self.vectorizer.transform([
+                get_code(position) for position in missing[start:start + batch]
+            ]) for start in range(0, len(missing), batch)
+        ])
+        scores = self.vectorizer.transform(queries) @ added.T
+        top, values = _top_k(scores, k)
+        merged = []
+        for result, query_top, query_values in zip(results, top, values):
+            result = result + [(ids[missing[row]], float(value))
+                               for row, value in zip(query_top, query_values)]
+            result.sort(key=lambda pair: -pair[1])
+            merged.append(result[:k])
+        return merged
+
+    def _exact_search(self, vectors: np.ndarray, k: int,
+                      batch: int) -> List[List[Tuple[str, float]]]:
+        best_rows = np.zeros((len(vectors), 0), dtype=np.int64)
+        best_values = np.zeros((len(vectors), 0), dtype=np.float32)
+        # the matrix is scored in blocks, keeping the best k rows so far
+        for start in range(0, len(self.ids), batch):
+            scores = vectors @ self.matrix[start:start + batch].T
+            top, values = _top_k(scores, k)
+            merged_rows = np.concatenate((best_rows, top + start), axis=1)
+            merged_values = np.concatenate((best_values, values), axis=1)
+            top, best_values = _top_k(merged_values, k)
+            best_rows = np.take_along_axis(merged_rows, top, axis=1)
+        return [[(self.ids[row], float(value))
+                 for row, value in zip(query_rows, query_values)]
+                for query_rows, query_values in zip(best_rows, best_values)]
+
+    def save(self, path: str):
+        """Atomically writes the index to `path` as a NumPy archive."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {
+            "metadata":
+            np.array(
+                json.dumps({
+                    "version": VECTOR_INDEX_VERSION,
+                    "vectorizer": self.vectorizer.config,
+                    "ids": self.ids,
+                    "hashes": self.hashes,
+                    "trained_size": self.trained_size
+                })),
+            "matrix":
+            self.matrix,
+            "assignments":
+            self.assignments
+        }
+        if self.centroids is not None:
+            arrays["centroids"] = self.centroids
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        write_atomic(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path: str, vectorizer=None) -> Optional["VectorIndex"]:
+        """
+        Loads an index written by `save`, or returns None if there is no valid one.
+
+        An index written with a differently configured vectorizer is not valid.
+        """
+        index = cls(vectorizer)
+        try:
+            with np.load(path) as data:
+                metadata = json.loads(str(data["metadata"]))
+                if (metadata.get("version") != VECTOR_INDEX_VERSION
+                        or metadata["vectorizer"] != index.vectorizer.config):
+                    return None
+                index.matrix = data["matrix"]
+                index.assignments = data["assignments"]
+                if "centroids" in data:
+                    index.centroids = data["centroids"]
+        except (OSError, ValueError, KeyError):
+            return None
+        index.ids = metadata["ids"]
+        index.hashes = metadata["hashes"]
+        index.trained_size = metadata["trained_size"]
+        index.positions = {
+            component_id: row
+            for row, component_id in enumerate(index.ids)
+        }
+        return index
+
+
+# indexes loaded by `load_vector_index`: path -> (modification time, index)
+_loaded_indexes: Dict[str, tuple] = {}
+
+
+def load_vector_index(path: str, vectorizer=None) -> Optional[VectorIndex]:
+    """Loads the index at `path`, reusing the loaded copy while the file is unchanged."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    loaded = _loaded_indexes.get(path)
+    if (loaded is None or loaded[0] != mtime_ns
+            or (vectorizer is not None
+                and loaded[1].vectorizer.config != vectorizer.config)):
+        index = VectorIndex.load(path, vectorizer)
+        if index is None:
+            return None
+        loaded = _loaded_indexes[path] = (mtime_ns, index)
+    return loaded[1]
@@ -0,0 +1,41 @@
+from reprocess.re_processors import GraphBuilder, JsonConverter, RegExpFinder
+
+
+def test_build_metrics(small_repo):
+    container = GraphBuilder(collect_metrics=True)(small_repo)
+    metrics = container.build_metrics
+
+    assert metrics.counters["discovery"] == {"python": 2, "c": 1}
+    assert metrics.counters["parsing"] == {"python": 2, "c": 1}
+    assert metrics.counters["component_filling"]["python"] == 3
+    assert metrics.counters["linking"]["all"] == 4
+    for stage in ("discovery", "parsing", "name_extraction",
+                  "component_filling", "linking", "residuals"):
+        assert stage in metrics.timers, f"Stage {stage} was not timed"
+    assert metrics.total_time >= metrics.stage_time("parsing")
+
+    slowest = metrics.slowest_files(1)
+    assert len(slowest) == 1
+    assert slowest[0]["file_path"] in ("module.py", "caller.py", "math.c")
+    summary = metrics.to_dict()
+    assert set(summary["histograms"]) == {"python", "c"}
+
+
+def test_metrics_disabled_by_default(small_repo):
+    container = GraphBuilder()(small_repo)
+    assert not hasattr(container, "build_metrics")
+
+
+def test_processors_after_metrics_build(small_repo):
+    built = GraphBuilder(collect_metrics=True)(small_repo)
+    container = JsonConverter()(built)
+    container = RegExpFinder("helper")(container)
+    assert [component.component_name
+            for component in container.helper] == ["module.helper"]
+    assert container.build_metrics == built.build_metrics
+
+
+def test_metrics_of_earlier_build_are_reset(small_repo):
+    container = GraphBuilder(collect_metrics=True)(small_repo)
+    rebuilt = GraphBuilder()(container)
+    assert rebuilt.build_metrics is None
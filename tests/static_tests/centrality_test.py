@@ -0,0 +1,63 @@
+import numpy as np
+from reprocess.re_processors import CentralityRanker
+from reprocess.utils.centrality import LinkMatrix
+
+
+def reference_pagerank(ids, links, damping=0.85, iterations=200):
+    size = len(ids)
+    rank = {component_id: 1.0 / size for component_id in ids}
+    for _ in range(iterations):
+        dangling = sum(rank[component_id] for component_id in ids
+                       if not links[component_id])
+        updated = {
+            component_id: (1 - damping + damping * dangling) / size
+            for component_id in ids
+        }
+        for source in ids:
+            for target in links[source]:
+                updated[target] += damping * rank[source] / len(links[source])
+        rank = updated
+    return rank
+
+
+def test_link_matrix_scores():
+    ids = ["a", "b", "c", "d"]
+    # duplicated and external links are dropped
+    links = {"a": ["b", "c", "c"], "b": ["c", "external"], "c": ["a"], "d": []}
+    matrix = LinkMatrix(ids, [links[component_id] for component_id in ids])
+    assert matrix.indptr.tolist() == [0, 2, 3, 4, 4]
+    assert matrix.in_degree().tolist() == [1, 1, 2, 0]
+    assert matrix.out_degree().tolist() == [2, 1, 1, 0]
+
+    deduplicated = {
+        source: [target for target in dict.fromkeys(targets) if target in ids]
+        for source, targets in links.items()
+    }
+    expected = reference_pagerank(ids, deduplicated)
+    pagerank = matrix.pagerank()
+    assert abs(pagerank.sum() - 1) < 1e-9
+    assert np.allclose(pagerank,
+                       [expected[component_id] for component_id in ids])
+
+    hubs, authorities = matrix.hits()
+    assert authorities.argmax() == ids.index("c")
+    assert hubs.argmax() == ids.index("a")
+    assert hubs[ids.index("d")] == 0
+
+
+def test_centrality_ranker(built_repo):
+    container = CentralityRanker(["in_degree", "pagerank"])(built_repo)
+    assert set(container.centrality) == {"in_degree", "pagerank"}
+    helper_id = next(component.component_id
+                     for component in built_repo.code_components
+                     if component.component_name == "module.helper")
+    pagerank = container.centrality["pagerank"]
+    assert container.centrality["in_degree"][helper_id] >= 2
+    assert pagerank[helper_id] == max(pagerank.values())
+
+
+def test_link_matrix_without_links():
+    assert LinkMatrix([], []).scores()["pagerank"].tolist() == []
+    scores = LinkMatrix(["a", "b"], [[], None]).scores()
+    assert scores["pagerank"].tolist() == [0.5, 0.5]
+    assert scores["hubs"].tolist() == [0.0, 0.0]
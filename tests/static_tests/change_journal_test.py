@@ -0,0 +1,97 @@
+import os
+from copy import deepcopy
+import pytest
+from reprocess.re_processors import JournalConverter, JournalDeconverter
+from reprocess.re_processors import journal_converter
+from reprocess.utils.change_journal import LOG_NAME, STATE_NAME, append_record, list_bases, read_records
+
+
+def test_journal_replays_and_compacts(built_repo):
+    original = deepcopy(built_repo)
+    original.repo_name = "journal_repo"
+    journal_path = os.path.join(original.db_path, original.repo_name,
+                                "journal")
+    JournalConverter(commit="c1")(original)
+
+    updated = deepcopy(original)
+    removed = updated.code_components.pop()
+    updated.code_components[0].component_code += "\n"
+    updated.external_components["new_external"] = "some-id"
+    JournalConverter(commit="c2")(updated)
+    # saving the same state again appends nothing
+    JournalConverter(commit="c2")(updated)
+
+    records = read_records(journal_path)
+    assert len(records) == 1
+    assert records[0]["code_components"]["removed"] == [removed.component_id]
+    assert len(records[0]["code_components"]["modified"]) == 1
+    assert records[0]["external_components"]["set"] == {
+        "new_external": "some-id"
+    }
+    assert JournalDeconverter()(original) == updated
+    assert JournalDeconverter(commit="c1")(original) == original
+
+    latest = deepcopy(updated)
+    latest.summary = "compacted"
+    JournalConverter(commit="c3", compact_after=1, keep=0)(latest)
+    assert read_records(journal_path) == []
+    assert list_bases(journal_path) == [2]
+    assert JournalDeconverter()(original) == latest
+    assert JournalDeconverter(commit="c3")(original) == latest
+    with pytest.raises(ValueError):
+        JournalDeconverter(commit="c1")(original)
+
+
+def test_journal_keeps_order_without_replaying(built_repo, monkeypatch):
+    original = deepcopy(built_repo)
+    original.repo_name = "journal_order_repo"
+    journal_path = os.path.join(original.db_path, original.repo_name,
+                                "journal")
+    JournalConverter(commit="c1")(original)
+
+    # saves compare with the stored digests instead of replaying the journal
+    def replay(*args, **kwargs):
+        raise AssertionError("the journal was replayed")
+
+    monkeypatch.setattr(journal_converter, "load_state", replay)
+    inserted = deepcopy(original)
+    new_component = deepcopy(inserted.code_components[0])
+    new_component.component_id = "inserted-id"
+    new_component.linked_component_ids = [
+        inserted.code_components[1].component_id
+    ]
+    inserted.code_components.insert(1, new_component)
+    JournalConverter(commit="c2")(inserted)
+    record = read_records(journal_path)[-1]
+    assert record["code_components"]["added_positions"] == [1]
+    assert record["edges"]["added"] == [[
+        "inserted-id", inserted.code_components[2].component_id
+    ]]
+
+    reordered = deepcopy(inserted)
+    reordered.code_components.reverse()
+    JournalConverter(commit="c3")(reordered)
+    monkeypatch.undo()
+
+    assert JournalDeconverter(commit="c2")(original) == inserted
+    assert JournalDeconverter()(original) == reordered
+
+    # without the digests the journal is replayed once to rebuild them
+    os.remove(os.path.join(journal_path, STATE_NAME))
+    JournalConverter(commit="c3")(reordered)
+    assert len(read_records(journal_path)) == 2
+
+
+def test_append_cuts_torn_record(tmp_path):
+    directory = str(tmp_path)
+    append_record(directory, {"seq": 1})
+    with open(os.path.join(directory, LOG_NAME), "ab") as file:
+        file.write(b'{"seq":2,"co')
+    append_record(directory, {"seq": 2})
+    append_record(directory, {"seq": 3})
+    assert [record["seq"] for record in read_records(directory)] == [1, 2, 3]
+
+    with open(os.path.join(directory, LOG_NAME), "wb") as file:
+        file.write(b'{"seq":1')
+    append_record(directory, {"seq": 1})
+    assert read_records(directory) == [{"seq": 1}]
@@ -0,0 +1,135 @@
+import os
+import re
+from reprocess.code_component import CodeComponentContainer
+from reprocess.re_processors import CodeIndexer, CodeSearch, JsonConverter, JsonDeconverter
+from reprocess.utils.code_index import CodeIndex, get_code_index_delta_path, get_code_index_path
+
+
+def make_component(component_id, code):
+    return CodeComponentContainer(component_id=component_id,
+                                  component_name=component_id,
+                                  component_code=code,
+                                  linked_component_ids=[],
+                                  file_id="file",
+                                  external_component_ids=[],
+                                  called_objects=[],
+                                  component_type="function")
+
+
+def scan(components, pattern):
+    return [
+        component.component_id for component in components
+        if re.search(pattern, component.component_code)
+    ]
+
+
+def test_code_index_queries_and_updates(tmp_path):
+    components = [
+        make_component("a", "if retries > RETRY_BUDGET:\n    raise"),
+        make_component("b", "RETRY_BUDGET = 3"),
+        make_component("c", "def retry(budget):\n    return budget"),
+        make_component("d", "x = 1")
+    ]
+    index = CodeIndex()
+    assert index.update(components) == {
+        "added": 4,
+        "removed": 0,
+        "unchanged": 0
+    }
+    for query, regex in (("RETRY_BUDGET", False), (r"retr(y|ies)\b", True),
+                         (r"(?i)budget", True), ("x", False)):
+        pattern = query if regex else re.escape(query)
+        found = index.search(components, query, regex)
+        assert [component.component_id
+                for component in found] == scan(components, pattern)
+    assert index.candidates(re.escape("RETRY_BUDGET")) == {"a", "b"}
+
+    path = str(tmp_path / "code_index.json")
+    index.save(path)
+    updated = [
+        components[0],
+        make_component("b", "RETRY_BUDGET = 5"),
+        make_component("e", "budget = RETRY_BUDGET * 2")
+    ]
+    loaded = CodeIndex.load(path)
+    assert loaded.update(updated) == {"added": 2, "removed": 3, "unchanged": 1}
+    assert loaded.candidates(re.escape("RETRY_BUDGET")) == {"a", "b", "e"}
+    assert [
+        component.component_id
+        for component in loaded.search(updated, "RETRY_BUDGET")
+    ] == ["a", "b", "e"]
+
+    # compaction keeps the answers
+    loaded.compact()
+    assert loaded.documents == ["a", "b", "e"]
+    assert loaded.candidates("retries") == {"a"}
+
+
+def test_code_index_saves_delta_segments(tmp_path):
+    path = str(tmp_path / "code_index.json")
+    delta_path = get_code_index_delta_path(path)
+    components = [
+        make_component(name, f"def {name}_handler():\n    return {number}")
+        for number, name in enumerate(["alpha", "beta", "gamma", "delta"])
+    ] + [
+        make_component(f"filler{number}",
+                       f"def filler_{number}(value):\n    return value * 2")
+        for number in range(30)
+    ]
+    index = CodeIndex()
+    index.update(components)
+    index.save(path)
+    base = open(path, "rb").read()
+    assert not os.path.exists(delta_path)
+
+    components[1] = make_component("beta", "def beta_handler():\n    pass")
+    index.update(components[:3] + components[4:] +
+                 [make_component("eps", "eps = 5")])
+    index.save(path)
+    # the index itself is not rewritten, the changes are appended
+    assert open(path, "rb").read() == base
+    assert len(open(delta_path).readlines()) == 1
+    index.save(path)
+    assert len(open(delta_path).readlines()) == 1
+
+    loaded = CodeIndex.load(path)
+    assert (loaded.documents, loaded.hashes, loaded.postings,
+            loaded.positions) == (index.documents, index.hashes,
+                                  index.postings, index.positions)
+    assert loaded.candidates("pass") == {"beta"}
+    assert loaded.candidates("delta_handler") == set()
+
+    # a torn segment is ignored, and cut off by the next append
+    with open(delta_path, "ab") as file:
+        file.write(b'{"generation":')
+    assert CodeIndex.load(path).documents == index.documents
+    loaded.update(components[:2] + components[4:])
+    loaded.save(path)
+    assert len(open(delta_path).readlines()) == 2
+    assert CodeIndex.load(path).positions == loaded.positions
+
+    # compaction writes the whole index again
+    loaded.compact()
+    loaded.save(path)
+    assert not os.path.exists(delta_path)
+    assert CodeIndex.load(path).documents == loaded.documents
+
+
+def test_code_search_processor(built_repo):
+    container = CodeSearch("helper(")(built_repo)
+    assert {
+        component.component_name
+        for component in getattr(container, "helper(")
+    } >= {"module.main", "caller.caller"}
+
+    JsonConverter()(built_repo)
+    CodeIndexer()(built_repo)
+    assert os.path.exists(
+        get_code_index_path(built_repo.db_path, built_repo.repo_name))
+    lazy = JsonDeconverter(lazy=True)(built_repo)
+    found = getattr(
+        CodeSearch(r"return \w+ \+ 1", regex=True)(lazy), r"return \w+ \+ 1")
+    assert [component.component_name
+            for component in found] == ["module.helper"]
+    # only the candidates were materialized
+    assert len(lazy.code_components.cache) < len(lazy.code_components)
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import pytest
+from reprocess.re_processors import GraphBuilder
+from reprocess.re_container import ReContainer
+
+
+@pytest.fixture(scope='session')
+def small_repo():
+    """
+    Fixture creating a repository with two Python files and one C file,
+    and returning a `ReContainer` pointing to it.
+    """
+    python_code = r"""
+def helper(x):
+    return x + 1
+
+def main():
+    return helper(2)
+"""
+    python_caller_code = r"""
+from module import helper
+
+def caller():
+    return helper(3)
+"""
+    c_code = r"""
+int add(int a, int b) {
+    return a + b;
+}
+"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = os.path.join(temp_dir, "small_repo")
+        os.makedirs(repo_path)
+        for file_name, code in (("module.py", python_code),
+                                ("caller.py", python_caller_code), ("math.c",
+                                                                    c_code)):
+            with open(os.path.join(repo_path, file_name), "w") as file:
+                file.write(code)
+        yield ReContainer("small_repo", repo_path,
+                          os.path.join(temp_dir, "db"))
+
+
+@pytest.fixture(scope='session')
+def built_repo(small_repo):
+    """
+    Fixture returning the container of `small_repo` with the built graph.
+    """
+    return GraphBuilder()(small_repo)
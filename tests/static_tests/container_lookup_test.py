@@ -0,0 +1,104 @@
+import copy
+import os
+import subprocess
+from reprocess.re_container import ReContainer
+from reprocess.re_processors import GraphBuilder, GraphUpdater, JsonConverter, JsonDeconverter
+
+
+def scan(components, **fields):
+    return [
+        component for component in components if all(
+            getattr(component, key) == value for key, value in fields.items())
+    ]
+
+
+def test_container_lookups(built_repo):
+    components = built_repo.code_components
+    helper = scan(components, component_name="module.helper")[0]
+    assert built_repo.get_component(helper.component_id) is helper
+    assert built_repo.get_component("unknown") is None
+    assert built_repo.components_by_name("module.helper") == [helper]
+    assert helper in built_repo.components_by_name("helper", short=True)
+
+    module_file = built_repo.get_file(file_id=helper.file_id)
+    assert built_repo.get_file(file_path=module_file.file_path) is module_file
+    assert built_repo.components_in_file(
+        file_path=module_file.file_path) == scan(components,
+                                                 file_id=helper.file_id)
+    assert built_repo.lookup("code_components", "component_type",
+                             "function") == scan(components,
+                                                 component_type="function")
+    # indexes are not part of the repository's data
+    assert "_lookup_indexes" not in vars(built_repo)
+    assert copy.deepcopy(built_repo) == built_repo
+
+
+def test_lookup_indexes_are_invalidated(built_repo):
+    container = copy.copy(built_repo)
+    helper = container.components_by_name("module.helper")[0]
+    container.code_components = [
+        component for component in container.code_components
+        if component is not helper
+    ]
+    assert container.components_by_name("module.helper") == []
+
+    container.code_components.append(helper)
+    assert container.components_by_name("module.helper") == [helper]
+
+
+def test_lookups_on_lazy_container(built_repo):
+    JsonConverter()(built_repo)
+    lazy = JsonDeconverter(lazy=True)(ReContainer(built_repo.repo_name,
+                                                  built_repo.repo_path,
+                                                  built_repo.db_path))
+    helper = lazy.components_by_name("module.helper")[0]
+    assert helper.component_code.strip().startswith("def helper")
+    # only the found component was materialized
+    assert len(lazy.code_components.cache) == 1
+
+
+def test_graph_updater_with_lookups(tmp_path):
+    repo_path = str(tmp_path / "repo")
+    os.makedirs(repo_path)
+    for name, code in (("a.py", "def f():\n    return 1\n"),
+                       ("b.py",
+                        "from a import f\n\ndef g():\n    return f()\n"),
+                       ("c.py", "def h():\n    return 3\n")):
+        with open(os.path.join(repo_path, name), "w") as file:
+            file.write(code)
+
+    def git(*args):
+        subprocess.run([
+            "git", "-C", repo_path, "-c", "user.name=test", "-c",
+            "user.email=test@localhost", *args
+        ],
+                       capture_output=True,
+                       check=True)
+
+    git("init", "-q")
+    git("add", "-A")
+    git("commit", "-q", "-m", "initial")
+    built = GraphBuilder()(ReContainer("repo", repo_path,
+                                       str(tmp_path / "db")))
+    with open(os.path.join(repo_path, "a.py"), "w") as file:
+        file.write("def f():\n    return 2\n")
+    git("rm", "-q", "c.py")
+    git("add", "-A")
+
+    updated = GraphUpdater()(built)
+    assert sorted(file.file_path for file in updated.files) == ["a.py", "b.py"]
+    assert updated.components_by_name("c.h") == []
+    [f] = updated.components_by_name("a.f")
+    assert "return 2" in f.component_code
+    assert updated.get_component(f.component_id) is f
+
+    # a rename drops the old path and parses the new one
+    git("commit", "-q", "-m", "update")
+    git("mv", "b.py", "renamed.py")
+    renamed = GraphUpdater()(updated)
+    assert sorted(file.file_path
+                  for file in renamed.files) == ["a.py", "renamed.py"]
+    assert [
+        component.component_name
+        for component in renamed.components_by_name("renamed.g")
+    ]
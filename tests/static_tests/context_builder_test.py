@@ -0,0 +1,109 @@
+from copy import deepcopy
+from reprocess.re_processors import ContextBuilder
+from reprocess.utils.context_builder import ContextAssembler, approximate_tokens, extract_signature, split_imports
+
+
+class Component:
+
+    def __init__(self, component_id, code, linked_ids, file_id="f"):
+        self.component_id = component_id
+        self.component_code = code
+        self.linked_component_ids = linked_ids
+        self.file_id = file_id
+
+
+def find(container, name):
+    return next(component for component in container.code_components
+                if component.component_name == name)
+
+
+def test_split_imports():
+    code = "import os\nfrom typing import List\n\ndef f():\n    import re\n"
+    imports, body = split_imports(code)
+    assert imports == ("import os", "from typing import List")
+    assert body == "def f():\n    import re"
+
+
+def test_context_builder(built_repo):
+    caller = find(built_repo, "caller.caller")
+    helper = find(built_repo, "module.helper")
+    context = ContextBuilder(
+        caller.component_id)(built_repo).dependency_context
+    assert context["included"] == [(caller.component_id, "code", 0),
+                                   (helper.component_id, "code", 1)]
+    assert context["text"].startswith("from module import helper\n\n")
+    assert "return x + 1" in context["text"]
+    assert context["tokens"] == approximate_tokens(
+        "from module import helper") + approximate_tokens(
+            "def caller():\n    return helper(3)") + approximate_tokens(
+                "def helper(x):\n    return x + 1")
+
+    # the dependency does not fit with its code, but with its signature
+    budget = context["tokens"] - 1
+    context = ContextBuilder(
+        caller.component_id,
+        token_budget=budget)(built_repo).dependency_context
+    assert context["included"][1] == (helper.component_id, "signature", 1)
+    assert "return x + 1" not in context["text"]
+    assert context["tokens"] <= budget
+
+
+def test_context_assembler_budget():
+    components = [
+        Component("a", "import os\n\ndef a():\n    b()\n    c()", ["b", "c"]),
+        Component("b", "import os\nimport sys\n\ndef b():\n    d()", ["d"]),
+        Component("c", "def c():\n    pass", []),
+        Component("d", "def d():\n    return 1", [])
+    ]
+    assembler = ContextAssembler(components, ranks={"c": 1.0, "b": 0.5})
+    context = assembler.assemble("a", 1000)
+    # higher ranked first at the same distance, far dependencies as signatures
+    assert context["included"] == [("a", "code", 0), ("c", "code", 1),
+                                   ("b", "code", 1), ("d", "signature", 2)]
+    assert context["text"].count("import os") == 1
+    assert context["text"].startswith("import os\nimport sys\n\n")
+    assert "return 1" not in context["text"]
+
+    context = assembler.assemble("a", 1000, max_depth=1, full_code_depth=0)
+    assert [kind for _, kind, _ in context["included"]
+            ] == ["code", "signature", "signature"]
+
+    # the component itself is always included, and the walk stops at a
+    # level of which nothing fits
+    context = assembler.assemble("a", 0)
+    assert context["included"] == [("a", "code", 0)]
+    assert context["omitted"] == 2
+
+
+def test_extract_signature():
+    assert extract_signature("def f(x):\n    return x\n",
+                             "a.py") == "def f(x):"
+    assert extract_signature("int add(int a, int b) {\n    return a + b;\n}",
+                             "math.c") == "int add(int a, int b) {"
+    # code that does not parse on its own gives its first line
+    assert extract_signature("    def method(self):\n        return 1",
+                             "a.py") == "    def method(self):"
+    assert extract_signature("first line\nsecond line",
+                             "notes.txt") == "first line"
+
+
+def test_assembler_is_kept_with_the_container(built_repo):
+    container = deepcopy(built_repo)
+    caller = find(container, "caller.caller")
+    built = ContextBuilder(caller.component_id)(container)
+    assembler = container.derived("code_components", "context_assembler", None)
+    assert built.derived("code_components", "context_assembler",
+                         None)._parts is assembler._parts
+    assert assembler.components is container.code_components
+
+    # ranks of a call replace the default ones
+    components = [
+        Component("a", "def a():\n    b()\n    c()", ["b", "c"]),
+        Component("b", "def b():\n    pass", []),
+        Component("c", "def c():\n    pass", [])
+    ]
+    assembler = ContextAssembler(components, ranks={"b": 1.0})
+    assert [
+        component_id for component_id, _, _ in assembler.assemble(
+            "a", 1000, ranks={"c": 1.0})["included"]
+    ] == ["a", "c", "b"]
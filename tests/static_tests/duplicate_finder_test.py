@@ -0,0 +1,103 @@
+import random
+from reprocess.code_component import CodeComponentContainer
+from reprocess.re_container import ReContainer
+from reprocess.re_processors import DuplicateFinder
+from reprocess.utils.minhash import MinHasher, find_similar_pairs, normalize_tokens
+
+ORIGINAL = """
+def load_config(path):
+    # read the settings
+    with open(path) as file:
+        data = json.load(file)
+    if "timeout" not in data:
+        data["timeout"] = 30
+    return {key: value for key, value in data.items() if value is not None}
+"""
+
+
+def make_component(component_id, code):
+    return CodeComponentContainer(component_id=component_id,
+                                  component_name=component_id,
+                                  component_code=code,
+                                  linked_component_ids=[],
+                                  file_id="file",
+                                  external_component_ids=[],
+                                  called_objects=[],
+                                  component_type="function")
+
+
+def test_normalize_tokens():
+    assert normalize_tokens(
+        'x = "a # b" + 3.5  # comment\n/* c */ y(0x1F)') == [
+            "x", "=", "__str__", "+", "__num__", "y", "(", "__num__", ")"
+        ]
+
+
+def test_min_hasher_signatures():
+    hasher = MinHasher(num_perm=64, batch_tokens=10)
+    codes = [ORIGINAL, ORIGINAL.replace("30", "60"), "x = 1", ORIGINAL + "\n"]
+    signatures = hasher.signatures_of(["a", "b", "c", "d"], codes)
+    # constants and layout are normalized away
+    assert (signatures[0] == signatures[1]).all()
+    assert (signatures[0] == signatures[3]).all()
+    assert (signatures[2] == signatures.max()).all()
+    # cached rows are reused
+    assert hasher.signatures_of(
+        ["b"], ["unused"]).tolist() == [signatures[1].tolist()]
+
+
+def test_duplicate_finder(tmp_path):
+    random.seed(0)
+    words = [f"name_{number}" for number in range(300)]
+    unrelated = [
+        " ".join(random.choice(words) for _ in range(80)) for _ in range(30)
+    ]
+    renamed = ORIGINAL.replace("data", "settings")
+    edited = ORIGINAL.replace("return", "result =") + "    return result\n"
+    components = [
+        make_component(f"unrelated_{number}", code)
+        for number, code in enumerate(unrelated)
+    ] + [
+        make_component("original", ORIGINAL),
+        make_component("edited", edited),
+        make_component("renamed", renamed)
+    ]
+    container = ReContainer("repo", str(tmp_path), str(tmp_path / "db"))
+    container.code_components = components
+
+    pairs = DuplicateFinder(threshold=0.7)(container).duplicate_pairs
+    assert [(first, second)
+            for first, second, _ in pairs] == [("original", "edited")]
+    assert 0.7 <= pairs[0][2] < 1
+
+    pairs = DuplicateFinder(threshold=0.3)(container).duplicate_pairs
+    assert {frozenset(pair[:2])
+            for pair in pairs} == {
+                frozenset(("original", "edited")),
+                frozenset(("original", "renamed")),
+                frozenset(("edited", "renamed"))
+            }
+
+
+def test_find_similar_pairs_without_shingles():
+    hasher = MinHasher()
+    signatures = hasher.signatures_of(["a", "b"], ["x", "x"])
+    assert find_similar_pairs(signatures, 0.5) == []
+
+
+def test_signatures_are_kept_with_the_container(tmp_path, monkeypatch):
+    container = ReContainer("repo", str(tmp_path), str(tmp_path / "db"))
+    container.code_components = [
+        make_component("original", ORIGINAL),
+        make_component("renamed", ORIGINAL.replace("data", "settings"))
+    ]
+    found = DuplicateFinder(threshold=0.3)(container)
+
+    # another threshold reuses the signatures, also in the copy returned
+    def hash_again(*args, **kwargs):
+        raise AssertionError("the signatures were computed again")
+
+    monkeypatch.setattr(MinHasher, "signatures_of", hash_again)
+    assert DuplicateFinder(threshold=0.9)(container).duplicate_pairs == []
+    assert DuplicateFinder(
+        threshold=0.3)(found).duplicate_pairs == found.duplicate_pairs
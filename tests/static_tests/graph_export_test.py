@@ -0,0 +1,88 @@
+import os
+import csv
+import json
+import xml.etree.ElementTree as ElementTree
+from copy import deepcopy
+import pytest
+from reprocess.re_processors import GraphExporter
+from reprocess.utils.graph_export import component_row, export_graph, file_row
+
+
+def count_rows(path):
+    with open(path, newline="") as file:
+        return sum(1 for _ in csv.reader(file))
+
+
+def test_graph_export_formats(built_repo, tmp_path):
+    components = built_repo.code_components
+    uses = sum(len(component.linked_component_ids) for component in components)
+    external = len(set(built_repo.external_components.values()))
+    nodes = len(components) + len(built_repo.files) + external
+
+    neo4j_path = str(tmp_path / "neo4j")
+    GraphExporter("neo4j", neo4j_path)(built_repo)
+    assert count_rows(os.path.join(neo4j_path,
+                                   "CodeComponent.csv")) == len(components)
+    assert count_rows(os.path.join(neo4j_path,
+                                   "File.csv")) == len(built_repo.files)
+    assert count_rows(os.path.join(neo4j_path, "USES.csv")) == uses
+    with open(os.path.join(neo4j_path, "CodeComponent_header.csv")) as file:
+        assert file.read().startswith("component_id:ID(CodeComponent)")
+    with open(os.path.join(neo4j_path, "import_command.txt")) as file:
+        assert "--relationships=USES=USES_header.csv,USES.csv" in file.read()
+
+    graphml_path = str(tmp_path / "graphml")
+    GraphExporter("graphml", graphml_path)(built_repo)
+    namespace = "{http://graphml.graphdrawing.org/xmlns}"
+    graph = ElementTree.parse(os.path.join(graphml_path,
+                                           "graph.graphml")).getroot()[-1]
+    assert len(graph.findall(f"{namespace}node")) == nodes
+
+    jsonl_path = str(tmp_path / "jsonl")
+    GraphExporter("jsonl", jsonl_path)(built_repo)
+    with open(os.path.join(jsonl_path, "edges.jsonl")) as file:
+        edges = [json.loads(line) for line in file]
+    assert len([edge for edge in edges if edge["type"] == "USES"]) == uses
+    assert len(graph.findall(f"{namespace}edge")) == len(edges)
+
+
+def read_rows(directory, name):
+    with open(os.path.join(directory, f"{name}_header.csv"),
+              newline="") as file:
+        header = next(csv.reader(file))
+    with open(os.path.join(directory, f"{name}.csv"), newline="") as file:
+        return [dict(zip(header, row)) for row in csv.reader(file)]
+
+
+def test_neo4j_export_hashes_and_arrays(built_repo, tmp_path):
+    container = deepcopy(built_repo)
+    container.files[0].imports = ["std::vector; std::map", "os"]
+    neo4j_path = str(tmp_path / "neo4j")
+    GraphExporter("neo4j", neo4j_path)(container)
+
+    # the hashes Neo4jSync compares with
+    hashes = {
+        row["component_id:ID(CodeComponent)"]: row["hash"]
+        for row in read_rows(neo4j_path, "CodeComponent")
+    }
+    assert hashes == {
+        component.component_id: component_row(component)["hash"]
+        for component in container.code_components
+    }
+    [exported] = [
+        row for row in read_rows(neo4j_path, "File")
+        if row["file_id:ID(File)"] == container.files[0].file_id
+    ]
+    assert exported["hash"] == file_row(container.files[0])["hash"]
+    assert exported["repo"] == container.repo_name
+    assert exported["imports:string[]"].split("\x1f") == [
+        "std::vector; std::map", "os"
+    ]
+    with open(os.path.join(neo4j_path, "import_command.txt")) as file:
+        assert "--array-delimiter=U+001F" in file.read()
+
+    with pytest.raises(ValueError):
+        export_graph(container,
+                     str(tmp_path / "semicolon"),
+                     "neo4j",
+                     array_delimiter=";")
@@ -0,0 +1,160 @@
+import random
+from copy import deepcopy
+from collections import deque
+from reprocess.re_processors import DependencyFinder, TopologicalScheduler
+from reprocess.utils.graph_query import ComponentGraph, get_component_graph
+
+
+def brute_force_reachable(links, start):
+    reached, queue = set(), deque([start])
+    while queue:
+        node = queue.popleft()
+        for target in links[node]:
+            if target not in reached:
+                reached.add(target)
+                queue.append(target)
+    return reached
+
+
+def test_component_graph_queries():
+    random.seed(3)
+    ids = [f"c{number}" for number in range(200)]
+    links = {
+        component_id: random.sample(ids, random.randint(0, 4)) + ["external"]
+        for component_id in ids
+    }
+    graph = ComponentGraph(ids, [links[component_id] for component_id in ids])
+    reverse = {component_id: set() for component_id in ids}
+    for source, targets in links.items():
+        for target in targets:
+            if target in reverse:
+                reverse[target].add(source)
+    forward = {
+        source: {target
+                 for target in targets if target in reverse}
+        for source, targets in links.items()
+    }
+
+    for component_id in ids[:50]:
+        assert set(graph.callers(component_id)) == reverse[component_id]
+        assert set(graph.callees(component_id)) == forward[component_id]
+        expected = brute_force_reachable(forward, component_id)
+        assert set(
+            graph.dependencies(component_id)) == expected - {component_id}
+        assert set(graph.dependents(component_id)) == brute_force_reachable(
+            reverse, component_id) - {component_id}
+        for order in ("bfs", "dfs"):
+            assert {
+                found
+                for found, _ in graph.traverse([component_id], order=order)
+            } == expected - {component_id}
+        near = graph.traverse([component_id], max_depth=2)
+        assert all(depth <= 2 for _, depth in near)
+        assert {found
+                for found, _ in near} == {
+                    found
+                    for found, _ in graph.traverse(
+                        [component_id], max_depth=2, order="dfs")
+                }
+
+        for target in ids[150:160]:
+            path = graph.shortest_path(component_id, target)
+            if target == component_id:
+                assert path == [component_id]
+            elif target not in expected:
+                assert path is None
+            else:
+                assert path[0] == component_id and path[-1] == target
+                assert all(b in forward[a] for a, b in zip(path, path[1:]))
+                depths = dict(graph.traverse([component_id]))
+                assert len(path) - 1 == depths[target]
+
+
+def test_dependency_finder(built_repo):
+    components = {
+        component.component_name: component
+        for component in built_repo.code_components
+    }
+    helper_id = components["module.helper"].component_id
+    container = DependencyFinder(helper_id, "dependents")(built_repo)
+    assert {component.component_name
+            for component in container.dependents
+            } >= {"module.main", "caller.caller"}
+    container = DependencyFinder(components["module.main"].component_id,
+                                 max_depth=1)(built_repo)
+    assert "module.helper" in {
+        component.component_name
+        for component in container.dependencies
+    }
+
+
+def test_condensation_and_levels():
+    # a <-> b form a cycle using c; d uses a; e is isolated
+    ids = ["a", "b", "c", "d", "e"]
+    links = [["b"], ["a", "c"], [], ["a"], []]
+    graph = ComponentGraph(ids, links)
+    condensed = graph.condensation()
+    assert len(condensed) == 4
+    assert condensed.cycles() == [[0, 1]]
+    assert graph.topological_levels() == [[["c"], ["e"]], [["a", "b"]],
+                                          [["d"]]]
+
+
+def test_levels_of_long_chain_and_random_graph():
+    # a chain deeper than the recursion limit
+    size = 20000
+    ids = [str(number) for number in range(size)]
+    graph = ComponentGraph(ids,
+                           [[str(number + 1)] if number + 1 < size else []
+                            for number in range(size)])
+    levels = graph.topological_levels()
+    assert len(levels) == size and levels[0] == [[str(size - 1)]]
+
+    random.seed(5)
+    ids = [f"c{number}" for number in range(300)]
+    links = [random.sample(ids, random.randint(0, 3)) for _ in ids]
+    graph = ComponentGraph(ids, links)
+    level_of = {}
+    for level, groups in enumerate(graph.topological_levels()):
+        for group in groups:
+            for component_id in group:
+                level_of[component_id] = (level, tuple(group))
+    assert len(level_of) == len(ids)
+    for source, targets in zip(ids, links):
+        for target in targets:
+            # a dependency is in an earlier level or in the same group
+            assert level_of[target][0] < level_of[source][0] or (
+                level_of[target][1] == level_of[source][1])
+            # groups are exactly the sets of mutually reachable components
+            mutual = source in graph.dependencies(target) or source == target
+            assert (level_of[target][1] == level_of[source][1]) == mutual
+
+
+def test_topological_scheduler(built_repo):
+    levels = TopologicalScheduler()(built_repo).dependency_levels
+    order = {
+        component_id: level
+        for level, groups in enumerate(levels)
+        for group in groups
+        for component_id in group
+    }
+    names = {
+        component.component_name: component.component_id
+        for component in built_repo.code_components
+    }
+    assert order[names["module.helper"]] < order[names["module.main"]]
+
+
+def test_graph_is_kept_with_the_container(built_repo):
+    container = deepcopy(built_repo)
+    graph = get_component_graph(container)
+    helper_id = container.components_by_name("module.helper")[0].component_id
+    # the copies made by processors reuse the graph
+    found = DependencyFinder(helper_id, "dependents")(container)
+    assert get_component_graph(found) is graph
+    assert get_component_graph(deepcopy(found)) is graph
+
+    # a replaced component list gets a new graph
+    found.code_components = found.code_components[:-1]
+    assert get_component_graph(found) is not graph
+    assert len(get_component_graph(found)) == len(graph) - 1
@@ -0,0 +1,84 @@
+import os
+import subprocess
+from reprocess.re_container import ReContainer
+from reprocess.re_processors import GraphBuilder, ImpactAnalyzer
+
+FILES = {
+    "module.py":
+    """
+def helper(x):
+    return x + 1
+
+def main():
+    return helper(2)
+
+def unrelated():
+    return 0
+""",
+    "tests/test_module.py":
+    """
+from module import main, unrelated
+
+def test_main():
+    assert main() == 3
+
+def test_unrelated():
+    assert unrelated() == 0
+"""
+}
+
+
+def git(repo_path, *args):
+    subprocess.run([
+        "git", "-C", repo_path, "-c", "user.name=test", "-c",
+        "user.email=test@localhost", *args
+    ],
+                   capture_output=True,
+                   check=True)
+
+
+def write(repo_path, path, code):
+    os.makedirs(os.path.dirname(os.path.join(repo_path, path)), exist_ok=True)
+    with open(os.path.join(repo_path, path), "w") as file:
+        file.write(code)
+
+
+def names(components):
+    return {component.component_name for component in components}
+
+
+def test_impact_of_staged_changes(tmp_path):
+    repo_path = str(tmp_path / "impact_repo")
+    for path, code in FILES.items():
+        write(repo_path, path, code)
+    git(repo_path, "init", "-q")
+    git(repo_path, "add", "-A")
+    git(repo_path, "commit", "-q", "-m", "initial")
+    built = GraphBuilder()(ReContainer("impact_repo", repo_path,
+                                       str(tmp_path / "db")))
+
+    write(repo_path, "module.py",
+          FILES["module.py"].replace("return x + 1", "return x + 2"))
+    git(repo_path, "add", "-A")
+    impact = ImpactAnalyzer()(built)
+    assert names(impact.changed_components) == {"module.helper"}
+    assert {"module.helper", "module.main",
+            "tests.test_module.test_main"} <= names(impact.affected_components)
+    assert "module.unrelated" not in names(impact.affected_components)
+    assert names(impact.affected_tests) == {"tests.test_module.test_main"}
+
+    # the same graph answers again from the memoized closures
+    assert names(ImpactAnalyzer()(built).affected_tests) == names(
+        impact.affected_tests)
+
+    git(repo_path, "commit", "-q", "-m", "change helper")
+    committed = ImpactAnalyzer(diff_args=("HEAD~1", "HEAD"))(built)
+    assert names(committed.changed_components) == {"module.helper"}
+
+    git(repo_path, "rm", "-q", "module.py")
+    impact = ImpactAnalyzer()(built)
+    assert {"module.helper", "module.main",
+            "module.unrelated"} <= names(impact.changed_components)
+    assert names(impact.affected_tests) == {
+        "tests.test_module.test_main", "tests.test_module.test_unrelated"
+    }
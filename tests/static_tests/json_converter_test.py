@@ -0,0 +1,105 @@
+import os
+import json
+import pytest
+from reprocess.re_processors import JsonConverter, JsonDeconverter, RegExpFinder
+from reprocess.re_container import ReContainer
+from reprocess.utils.json_index import JsonDataReader, LazyJsonList, get_index_path, load_index
+
+
+def class_to_dict(obj):
+    """The whole container as nested dictionaries, as it was saved before streaming."""
+    if isinstance(obj, dict):
+        return {key: class_to_dict(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [class_to_dict(element) for element in obj]
+    if hasattr(obj, "__dict__"):
+        return dict(class_to_dict(vars(obj)), __class__=type(obj).__name__)
+    return obj
+
+
+def test_streamed_json_matches_class_to_dict(built_repo):
+    converter = JsonConverter()
+    converter(built_repo)
+    data_path = os.path.join(built_repo.db_path, built_repo.repo_name,
+                             "data.json")
+    with open(data_path) as file:
+        streamed = json.load(file)
+
+    expected = json.loads(
+        json.dumps(class_to_dict(vars(built_repo)),
+                   default=converter.set_default))
+    assert streamed == expected
+    assert not [
+        name for name in os.listdir(os.path.dirname(data_path))
+        if name.endswith(".tmp")
+    ], "Temporary files should be renamed or removed"
+
+
+def test_json_round_trip(built_repo):
+    JsonConverter(indent=4)(built_repo)
+    restored = JsonDeconverter()(built_repo)
+    for attribute in ("code_components", "files", "external_components"):
+        assert getattr(restored, attribute) == getattr(built_repo, attribute)
+
+
+def test_lazy_json_deconverter(built_repo):
+    JsonConverter()(built_repo)
+    empty = ReContainer(built_repo.repo_name, built_repo.repo_path,
+                        built_repo.db_path)
+    restored = JsonDeconverter(lazy=True)(empty)
+    components = restored.code_components
+
+    assert isinstance(components, LazyJsonList)
+    assert len(components) == len(built_repo.code_components)
+    assert not components.cache
+
+    for position, component in enumerate(built_repo.code_components):
+        assert components.get_code(position) == component.component_code
+    assert not components.cache
+
+    helper = components.find("component_name", "module.helper")[0]
+    assert helper == components.get(helper.component_id)
+    assert len(components.cache) == 1
+
+    # processors keep working and only materialize what they touch
+    found = RegExpFinder("helper")(restored)
+    assert found.code_components == built_repo.code_components
+    assert restored.files == built_repo.files
+    assert JsonDeconverter()(empty) == restored
+
+
+def test_lazy_json_deconverter_falls_back_without_index(built_repo):
+    JsonConverter(indent=2)(built_repo)
+    data_path = os.path.join(built_repo.db_path, built_repo.repo_name,
+                             "data.json")
+    assert not os.path.exists(get_index_path(data_path))
+    restored = JsonDeconverter(lazy=True)(built_repo)
+    assert isinstance(restored.code_components, list)
+
+
+def test_lazy_json_reader_is_closed_on_reload(built_repo):
+    JsonConverter()(built_repo)
+    empty = ReContainer(built_repo.repo_name, built_repo.repo_path,
+                        built_repo.db_path)
+    restored = JsonDeconverter(lazy=True)(empty)
+    reader = restored.code_components.reader
+    helper = restored.components_by_name("module.helper")[0]
+
+    reloaded = JsonDeconverter(lazy=True)(restored)
+    assert reader.closed
+    assert reloaded.code_components.reader is not reader
+    assert reloaded.components_by_name("module.helper") == [helper]
+    # materialized elements stay readable
+    assert restored.get_component(helper.component_id) is helper
+    components = restored.code_components
+    position = next(position for position in range(len(components))
+                    if position not in components.cache)
+    with pytest.raises(ValueError):
+        components[position]
+
+    data_path = os.path.join(built_repo.db_path, built_repo.repo_name,
+                             "data.json")
+    with JsonDataReader(data_path, load_index(data_path)) as reader:
+        start, end = load_index(data_path)["attributes"]["repo_name"]
+        assert reader.load(start, end) == built_repo.repo_name
+    assert reader.closed
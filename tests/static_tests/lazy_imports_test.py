@@ -0,0 +1,26 @@
+import sys
+import subprocess
+
+CHECK_SNIPPET = """
+import sys
+from reprocess.re_processors import JsonDeconverter, RegExpFinder
+heavy = ("neo4j", "aiohttp", "tree_sitter")
+print(",".join(name for name in heavy if name in sys.modules))
+"""
+
+
+def test_heavy_dependencies_are_not_imported():
+    result = subprocess.run([sys.executable, "-c", CHECK_SNIPPET],
+                            capture_output=True,
+                            text=True,
+                            check=True)
+    assert result.stdout.strip() == "", \
+        f"Unexpectedly imported: {result.stdout.strip()}"
+
+
+def test_lazy_exports_resolve():
+    import reprocess.re_processors as re_processors
+    from reprocess.re_processors.graph_builder import GraphBuilder
+
+    assert re_processors.GraphBuilder is GraphBuilder
+    assert set(re_processors.__all__) <= set(dir(re_processors))
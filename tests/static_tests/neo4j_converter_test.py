@@ -0,0 +1,168 @@
+from copy import deepcopy
+from reprocess.re_processors import Neo4jConverter, Neo4jSync
+from reprocess.utils.graph_export import component_row, external_component_rows, file_row
+
+
+class RecordingTransaction:
+
+    def __init__(self, queries):
+        self.queries = queries
+
+    def run(self, query, **parameters):
+        self.queries.append((" ".join(query.split()), parameters))
+
+
+class RecordingSession:
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query, **parameters):
+        if query.startswith("MATCH (n:"):
+            label = query[len("MATCH (n:"):].split(" ", 1)[0]
+            return self.driver.stored.get((parameters["repo"], label), [])
+        self.driver.schema.append(query)
+
+    def execute_write(self, work, *args):
+        self.driver.transactions += 1
+        return work(RecordingTransaction(self.driver.queries), *args)
+
+
+class RecordingDriver:
+
+    def __init__(self, *stored_repos):
+        # (repo, label) -> records of the stored nodes
+        self.stored = {}
+        for container in stored_repos:
+            for label, rows, key in (("CodeComponent",
+                                      map(component_row,
+                                          container.code_components),
+                                      "component_id"),
+                                     ("File", map(file_row,
+                                                  container.files), "file_id"),
+                                     ("ExternalComponent",
+                                      external_component_rows(
+                                          container.external_components),
+                                      "component_id")):
+                self.stored[(container.repo_name, label)] = [{
+                    "id":
+                    row[key],
+                    "hash":
+                    row["hash"]
+                } for row in rows]
+        self.schema = []
+        self.queries = []
+        self.transactions = 0
+
+    def session(self, **kwargs):
+        return RecordingSession(self)
+
+    def close(self):
+        pass
+
+
+def test_neo4j_converter_writes_in_batches(built_repo):
+    converter = Neo4jConverter(None, None, None, batch_size=2)
+    driver = converter.driver = RecordingDriver()
+    converter(built_repo)
+
+    constraints = [query for query in driver.schema if "CREATE" in query]
+    assert len(constraints) == 3
+    assert all("(n.repo, n." in query and "IS UNIQUE" in query
+               for query in constraints)
+
+    components = built_repo.code_components
+    edges = sum(
+        len(component.linked_component_ids) +
+        len(component.external_component_ids) for component in components)
+    expected_rows = 2 * len(components) + len(built_repo.files) + len(
+        set(built_repo.external_components.values())) + edges
+    assert sum(len(parameters["rows"])
+               for _, parameters in driver.queries) == expected_rows
+    assert all(
+        len(parameters["rows"]) <= 2 for _, parameters in driver.queries)
+    assert driver.transactions == len(driver.queries)
+
+    relationship_queries = [
+        query for query, _ in driver.queries if "MERGE (a)-" in query
+    ]
+    assert relationship_queries
+    assert all("MATCH (a:" in query and "MATCH (b:" in query
+               for query in relationship_queries)
+    assert all(parameters["repo"] == built_repo.repo_name
+               for _, parameters in driver.queries)
+
+
+def test_neo4j_sync_writes_only_changes(built_repo):
+    other_repo = deepcopy(built_repo)
+    other_repo.repo_name = "other_repo"
+    driver = RecordingDriver(built_repo, other_repo)
+    container = deepcopy(built_repo)
+    removed = container.code_components.pop()
+    modified = container.code_components[0]
+    modified.component_code += "\n"
+
+    synchronizer = Neo4jSync(None, None, None)
+    synchronizer.driver = driver
+    synchronizer(container)
+
+    deleted = [
+        row for query, parameters in driver.queries if "DETACH" in query
+        for row in parameters["rows"]
+    ]
+    upserted = [
+        row["component_id"] for query, parameters in driver.queries
+        if "MERGE (c:CodeComponent" in query for row in parameters["rows"]
+    ]
+    # nodes of the other repository with the same ids are left alone
+    assert deleted == [removed.component_id]
+    assert upserted == [modified.component_id]
+    assert all(parameters["repo"] == built_repo.repo_name
+               for _, parameters in driver.queries)
+    assert not any("MERGE (f:File" in query for query, _ in driver.queries)
+    # a handful of statements, independent of the graph size
+    assert driver.transactions <= 5
+
+
+def test_neo4j_sync_keeps_external_links(built_repo):
+    driver = RecordingDriver(built_repo)
+    container = deepcopy(built_repo)
+    modified = container.code_components[0]
+    modified.component_code += "\n"
+    modified.external_component_ids.append("os-id")
+    container.external_components = dict(container.external_components,
+                                         os="os-id")
+
+    synchronizer = Neo4jSync(None, None, None)
+    synchronizer.driver = driver
+    synchronizer(container)
+
+    written = {
+        query.split("MERGE ", 1)[1].split(" ", 1)[0]: parameters["rows"]
+        for query, parameters in driver.queries if "MERGE" in query
+    }
+    assert [row["component_id"]
+            for row in written["(e:ExternalComponent"]] == ["os-id"]
+    # the links of the rewritten component are written again
+    assert {
+        "source_id": modified.component_id,
+        "target_id": "os-id"
+    } in written["(a)-[r:USES_EXTERNAL]->(b)"]
+    assert any("USES_EXTERNAL" in query for query, _ in driver.queries
+               if "DELETE uses" in query)
+
+    # an external component no longer used is deleted
+    driver = RecordingDriver(container)
+    synchronizer.driver = driver
+    synchronizer(built_repo)
+    assert [
+        row for query, parameters in driver.queries
+        if "MATCH (n:ExternalComponent" in query and "DETACH" in query
+        for row in parameters["rows"]
+    ] == ["os-id"]
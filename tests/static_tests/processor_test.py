@@ -0,0 +1,103 @@
+import os
+import pytest
+from reprocess.re_processors.processor import ReProcessor, AbsentAttributesException, LazyRequiredAttrs
+from reprocess.re_container import ReContainer
+
+
+@pytest.fixture()
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Fixture isolating the on-disk cache of `__call__` analysis results.
+    """
+    monkeypatch.setenv("REPROCESS_CACHE_DIR", str(tmp_path))
+    yield os.path.join(tmp_path, "call_analysis")
+
+
+def test_lazy_required_attrs(cache_dir):
+
+    class ProducerProcessor(ReProcessor):
+
+        def __call__(self, repository_container: ReContainer):
+            return {"produced_attr": 1}
+
+    class ConsumerProcessor(ReProcessor):
+
+        def __call__(self, repository_container: ReContainer):
+            return {"consumed_attr": repository_container.produced_attr + 1}
+
+    assert isinstance(vars(ConsumerProcessor)["required_attrs"],
+                      LazyRequiredAttrs), \
+        "Analysis should not run at class creation"
+    assert not os.path.exists(cache_dir), "Nothing should be cached yet"
+
+    container = ReContainer("test", "/test", "/db")
+    with pytest.raises(AbsentAttributesException) as error:
+        ConsumerProcessor()(container)
+    assert "ProducerProcessor" in str(error.value), \
+        "Producers of absent attributes should be suggested"
+    assert ConsumerProcessor.required_attrs == ["produced_attr"]
+    assert os.listdir(cache_dir), "Analysis results should be cached"
+
+    new_container = ConsumerProcessor()(ProducerProcessor()(container))
+    assert new_container.consumed_attr == 2
+
+
+def test_compose_profiling(cache_dir, tmp_path):
+    import json
+    from reprocess.re_processors import Compose
+    from reprocess.utils.profiling import ProcessorProfiler
+
+    class AllocatingProcessor(ReProcessor):
+
+        def __call__(self, repository_container: ReContainer):
+            return {"payload": list(range(10000))}
+
+    trace_path = os.path.join(tmp_path, "trace.json")
+    received = []
+    profiler = ProcessorProfiler(trace_path=trace_path,
+                                 listeners=[received.append])
+    container = ReContainer("test", "/test", "/db")
+    Compose([AllocatingProcessor()], profiler=profiler)(container)
+
+    processor_events = [
+        event for event in profiler.events if event["type"] == "processor"
+    ]
+    assert [event["name"]
+            for event in processor_events] == ["AllocatingProcessor"]
+    event = processor_events[0]
+    assert event["wall_time"] >= event["copy_time"] > 0
+    assert event["peak_memory"] > 0
+    assert any(event["type"] == "container_copy" for event in received)
+    assert profiler.summary()["AllocatingProcessor"]["calls"] == 1
+
+    with open(trace_path) as file:
+        trace = json.load(file)
+    assert len(trace["traceEvents"]) == len(profiler.events)
+
+
+def test_profiler_ignores_other_threads(cache_dir):
+    import threading
+    from reprocess.utils.profiling import ProcessorProfiler
+
+    class NamedProcessor(ReProcessor):
+
+        def __call__(self, repository_container: ReContainer):
+            return {"name": type(self).__name__}
+
+    class OtherThreadProcessor(ReProcessor):
+
+        def __call__(self, repository_container: ReContainer):
+            return {"name": type(self).__name__}
+
+    container = ReContainer("test", "/test", "/db")
+    with ProcessorProfiler(trace_memory=False) as profiler:
+        thread = threading.Thread(
+            target=lambda: OtherThreadProcessor()(container))
+        thread.start()
+        thread.join()
+        NamedProcessor()(container)
+
+    assert [
+        event["name"] for event in profiler.events
+        if event["type"] == "processor"
+    ] == ["NamedProcessor"]
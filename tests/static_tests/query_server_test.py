@@ -0,0 +1,94 @@
+import os
+import copy
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from reprocess.re_processors import JsonConverter, SnapshotConverter
+from reprocess.requests_handling.query_server import QueryClient, QueryServer
+
+
+def find(container, name):
+    return next(component for component in container.code_components
+                if component.component_name == name)
+
+
+@pytest.fixture
+def saved_repo(built_repo, tmp_path):
+    container = copy.copy(built_repo)
+    container.db_path = str(tmp_path)
+    JsonConverter()(container)
+    return container
+
+
+def test_query_server(saved_repo, tmp_path):
+    helper = find(saved_repo, "module.helper")
+    caller = find(saved_repo, "caller.caller")
+    server = QueryServer(saved_repo.db_path, poll_interval=60)
+    assert list(server.repositories) == ["small_repo"]
+
+    for address in ({"port": 0}, {"socket_path": str(tmp_path / "sock")}):
+        server.start(**address)
+        if "port" in address:
+            client = QueryClient(*server.address)
+        else:
+            client = QueryClient(socket_path=server.address)
+        try:
+            [info] = client.repos()
+            assert info["components"] == len(saved_repo.code_components)
+
+            found = client.search("small_repo", r"helper$")
+            assert [component["component_name"]
+                    for component in found] == ["module.helper"]
+            assert found[0]["file_path"].endswith("module.py")
+            component = client.component("small_repo", helper.component_id)
+            assert component["component_code"] == helper.component_code
+
+            callers = client.neighbors("small_repo", helper.component_id, "in")
+            assert caller.component_id in {
+                component["component_id"]
+                for component in callers
+            }
+            closure = client.closure("small_repo", caller.component_id)
+            assert {
+                component["component_id"]: component["depth"]
+                for component in closure
+            }[helper.component_id] == 1
+
+            # concurrent readers
+            with ThreadPoolExecutor(8) as executor:
+                results = list(
+                    executor.map(
+                        lambda _: client.search("small_repo", "helper"),
+                        range(32)))
+            assert all(result == results[0] for result in results)
+
+            with pytest.raises(KeyError):
+                client.component("small_repo", "unknown")
+            with pytest.raises(KeyError):
+                client.search("unknown", "x")
+            with pytest.raises(ValueError):
+                client.search("small_repo", "(")
+        finally:
+            server.stop()
+    assert not os.path.exists(tmp_path / "sock")
+
+
+def test_query_server_reloads_changed_data(saved_repo):
+    server = QueryServer(saved_repo.db_path, ["small_repo"])
+    loaded = server.repositories["small_repo"]
+    assert server.refresh() == []
+
+    # a snapshot saved later replaces the loaded data
+    changed = copy.copy(saved_repo)
+    changed.code_components = [
+        component for component in saved_repo.code_components
+        if component.component_name != "module.helper"
+    ]
+    SnapshotConverter()(changed)
+    snapshot_path = os.path.join(saved_repo.db_path, "small_repo",
+                                 "data.snapshot")
+    os.utime(snapshot_path, ns=(loaded.mtime_ns + 1, loaded.mtime_ns + 1))
+    assert server.refresh() == ["small_repo"]
+    repository = server.repositories["small_repo"]
+    assert repository is not loaded
+    assert repository.source_path == snapshot_path
+    assert repository.search("helper$") == []
@@ -0,0 +1,66 @@
+import re
+from copy import deepcopy
+from reprocess.re_processors import RegExpFinder
+from reprocess.utils.name_index import NameIndex, get_name_index
+
+
+def names_of(components):
+    return [component.component_name for component in components]
+
+
+def test_regexp_finder_multiple_patterns(built_repo):
+    container = RegExpFinder([r"^module\.", "caller",
+                              r"residual$"])(built_repo)
+    assert names_of(getattr(container,
+                            r"^module\.")) == ["module.helper", "module.main"]
+    assert names_of(container.caller) == ["caller.caller"]
+    assert len(getattr(container, r"residual$")) == len(built_repo.files)
+
+    # same results as scanning every name
+    for pattern in (r"^module\.", "caller", r"residual$"):
+        assert getattr(container, pattern) == [
+            component for component in built_repo.code_components
+            if re.search(pattern, component.component_name)
+        ]
+
+
+def test_regexp_finder_filters(built_repo):
+    container = RegExpFinder(".",
+                             component_type="function",
+                             file_paths=["module.py"])(built_repo)
+    assert names_of(getattr(container,
+                            ".")) == ["module.helper", "module.main"]
+
+    module_file_id = built_repo.code_components[0].file_id
+    container = RegExpFinder("module",
+                             component_type="residual",
+                             file_ids=[module_file_id])(built_repo)
+    assert names_of(container.module) == []
+
+
+def test_name_index_candidates():
+    names = ["load_json", "save_json", "json_loader", "parse", "load", None]
+    index = NameIndex(names)
+    assert index.candidates("^load") == {0, 4}
+    assert index.candidates(r"json_(load|save)") == {2}
+    assert index.candidates(r"(save|load)_json") == {0, 1}
+    # nothing literal to filter by
+    assert index.candidates(r"\w+") is None
+    assert index.candidates("(?i)JSON") is None
+    assert index.search(["json$", "^par", "o"]) == {
+        "json$": [0, 1],
+        "^par": [3],
+        "o": [0, 1, 2, 4]
+    }
+
+
+def test_name_index_is_kept_with_the_container(built_repo):
+    container = deepcopy(built_repo)
+    index = get_name_index(container)
+    found = RegExpFinder("helper")(container)
+    assert get_name_index(found) is index
+
+    found.code_components = found.code_components[:1]
+    assert get_name_index(found).names == [
+        found.code_components[0].component_name
+    ]
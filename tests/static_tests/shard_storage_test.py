@@ -0,0 +1,59 @@
+import os
+from copy import deepcopy
+from reprocess.re_processors import JsonConverter, JsonDeconverter, ShardedConverter, ShardedDeconverter
+from reprocess.re_container import ReContainer
+
+
+def shard_names(container):
+    return set(
+        os.listdir(
+            os.path.join(container.db_path, container.repo_name, "shards")))
+
+
+def test_sharded_round_trip(built_repo):
+    container = deepcopy(built_repo)
+    container.repo_name = "sharded_round_trip"
+    container.code_components[0].summary = {"text": "extra attribute"}
+    JsonConverter()(container)
+    ShardedConverter()(container)
+
+    empty = ReContainer(container.repo_name, container.repo_path,
+                        container.db_path)
+    from_json = JsonDeconverter()(empty)
+    from_shards = ShardedDeconverter(workers=2)(empty)
+
+    assert list(vars(from_shards)) == list(vars(from_json))
+    assert from_shards.files == from_json.files
+    assert from_shards.external_components == from_json.external_components
+    key = lambda component: component.component_id  # noqa: E731
+    assert sorted(from_shards.code_components,
+                  key=key) == sorted(from_json.code_components, key=key)
+
+
+def test_sharded_save_rewrites_only_changed_shards(built_repo):
+    container = deepcopy(built_repo)
+    container.repo_name = "sharded_update"
+    ShardedConverter()(container)
+    before = shard_names(container)
+    ShardedConverter()(container)
+    assert shard_names(container) == before
+
+    changed = container.code_components[0]
+    changed.component_code += "\n"
+    ShardedConverter()(container)
+    after = shard_names(container)
+    # the shard of the changed file and the manifest are the only new files
+    assert len(after - before) == 1
+    assert len(before - after) == 1
+    assert "manifest.json" in after
+    restored = ShardedDeconverter()(container)
+    assert changed in restored.code_components
+
+    # links are stored in the file shards only, so the index stays as it is
+    before = after
+    linked = restored.code_components[0]
+    linked.linked_component_ids = list(linked.linked_component_ids or
+                                       ()) + ["new-target"]
+    ShardedConverter()(restored)
+    assert len(shard_names(restored) - before) == 1
+    assert linked in ShardedDeconverter()(restored).code_components
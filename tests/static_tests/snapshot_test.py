@@ -0,0 +1,25 @@
+import os
+from reprocess.re_processors import JsonConverter, JsonDeconverter, SnapshotConverter, SnapshotDeconverter, RegExpFinder
+from reprocess.re_container import ReContainer
+
+
+def test_snapshot_matches_json_round_trip(built_repo):
+    container = RegExpFinder("helper")(built_repo)
+    container.code_components[0].summary = {"text": "extra attribute"}
+
+    JsonConverter()(container)
+    SnapshotConverter()(container)
+    assert os.path.exists(
+        os.path.join(container.db_path, container.repo_name, "data.snapshot"))
+
+    empty = ReContainer(container.repo_name, container.repo_path,
+                        container.db_path)
+    from_json = JsonDeconverter()(empty)
+    from_snapshot = SnapshotDeconverter()(empty)
+
+    assert from_snapshot == from_json
+    assert list(vars(from_snapshot)) == list(vars(from_json))
+    assert from_snapshot.code_components[0].summary == {
+        "text": "extra attribute"
+    }
+    assert from_snapshot.helper == from_json.helper
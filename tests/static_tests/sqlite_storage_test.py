@@ -0,0 +1,57 @@
+import os
+import json
+from copy import deepcopy
+from reprocess.re_processors import JsonConverter, JsonDeconverter, SqliteConverter, SqliteDeconverter
+from reprocess.re_container import ReContainer
+from reprocess.utils.sqlite_storage import SqliteGraph, connect, write_graph
+
+
+def test_sqlite_matches_json_round_trip(built_repo):
+    container = deepcopy(built_repo)
+    container.code_components[0].summary = {"text": "extra attribute"}
+
+    JsonConverter()(container)
+    SqliteConverter()(container)
+
+    empty = ReContainer(container.repo_name, container.repo_path,
+                        container.db_path)
+    from_json = JsonDeconverter()(empty)
+    from_sqlite = SqliteDeconverter()(empty)
+
+    assert from_sqlite == from_json
+    assert list(vars(from_sqlite)) == list(vars(from_json))
+    assert from_sqlite.code_components[0].summary == {
+        "text": "extra attribute"
+    }
+
+
+def test_sqlite_writes_only_changed_rows(built_repo, tmp_path):
+    attributes = dict(vars(deepcopy(built_repo)))
+    connection = connect(str(tmp_path / "data.sqlite"))
+    total = len(attributes["code_components"]) + len(attributes["files"])
+    assert write_graph(connection, attributes, json.dumps)["written"] == total
+    assert write_graph(connection, attributes, json.dumps)["written"] == 0
+
+    removed = attributes["code_components"].pop(0)
+    attributes["code_components"][0].component_code += "\n"
+    stats = write_graph(connection, attributes, json.dumps)
+    assert stats["written"] == 1
+    assert stats["deleted"] == 1
+    assert connection.execute("SELECT COUNT(*) FROM links WHERE source_id = ?",
+                              (removed.component_id, )).fetchone()[0] == 0
+    connection.close()
+
+
+def test_sqlite_graph_neighborhood(built_repo):
+    SqliteConverter()(built_repo)
+    path = os.path.join(built_repo.db_path, built_repo.repo_name,
+                        "data.sqlite")
+    with SqliteGraph(path) as graph:
+        helper = graph.find_by_name("module.helper")[0]
+        callers = {
+            component.component_name
+            for component in graph.neighborhood(helper.component_id,
+                                                direction="in")
+        }
+        assert callers == {"module.helper", "module.main", "caller.caller"}
+        assert graph.get_component("missing") is None
@@ -0,0 +1,122 @@
+import random
+import numpy as np
+from reprocess.code_component import CodeComponentContainer
+from reprocess.re_container import ReContainer
+from reprocess.re_processors import VectorIndexer, VectorSearch
+from reprocess.utils.vector_index import HashingVectorizer, VectorIndex, get_vector_index_path, load_vector_index
+
+
+def make_component(component_id, code):
+    return CodeComponentContainer(component_id=component_id,
+                                  component_name=component_id,
+                                  component_code=code,
+                                  linked_component_ids=[],
+                                  file_id="file",
+                                  external_component_ids=[],
+                                  called_objects=[],
+                                  component_type="function")
+
+
+def random_components(count, seed=0):
+    rng = random.Random(seed)
+    words = [f"word{number}" for number in range(200)]
+    return [
+        make_component(f"c{number}",
+                       " ".join(rng.choice(words) for _ in range(20)))
+        for number in range(count)
+    ]
+
+
+def ids_of(results):
+    return [[component_id for component_id, _ in result] for result in results]
+
+
+def test_hashing_vectorizer():
+    vectorizer = HashingVectorizer(dimensions=64)
+    vectors = vectorizer.transform(
+        ["parseHttpResponse(data)", "parse_http_response(data)", "", "x = 1"])
+    assert vectors.shape == (4, 64) and vectors.dtype == np.float32
+    # identifiers are compared by their subwords
+    assert np.allclose(vectors[0], vectors[1])
+    assert np.allclose(np.linalg.norm(vectors[[0, 3]], axis=1), 1)
+    assert not vectors[2].any()
+
+
+def test_vector_index_search_and_updates():
+    components = random_components(500)
+    index = VectorIndex()
+    assert index.update(components) == {
+        "added": 500,
+        "removed": 0,
+        "unchanged": 0
+    }
+    queries = [component.component_code for component in components[:20]]
+    expected_scores = index.vectorizer.transform(queries) @ index.matrix.T
+    exact = index.search(queries, k=5, batch=64)
+    for query, (result, scores) in enumerate(zip(exact, expected_scores)):
+        assert result[0] == (f"c{query}", result[0][1])
+        assert [component_id for component_id, _ in result
+                ] == [f"c{row}" for row in np.argsort(-scores)[:5]]
+
+    index.train(n_lists=10)
+    # probing all clusters is exact, probing a few finds the same component
+    assert ids_of(index.search(queries, k=5, nprobe=10)) == ids_of(
+        index.search(queries, k=5, nprobe=None))
+    assert all(result[0][0] == f"c{query}"
+               for query, result in enumerate(index.search(queries, k=1)))
+
+    changed = components[:450]
+    changed[0] = make_component("c0", "def new_code(): pass")
+    stats = index.update(changed)
+    # a changed component is removed and added again
+    assert stats == {"added": 1, "removed": 51, "unchanged": 449}
+    assert len(index) == 450 and len(index.assignments) == 450
+    assert index.search(["new code"], k=1, nprobe=None)[0][0][0] == "c0"
+
+
+def test_vector_indexer_and_search(tmp_path):
+    container = ReContainer("repo", str(tmp_path), str(tmp_path / "db"))
+    container.code_components = random_components(50) + [
+        make_component(
+            "loader",
+            "def load_config(path):\n    return json.load(open(path))")
+    ]
+    VectorIndexer(ivf_min_size=10)(container)
+    index_path = get_vector_index_path(container.db_path, container.repo_name)
+    index = VectorIndex.load(index_path)
+    assert len(index) == 51 and index.centroids is not None
+
+    found = VectorSearch("loadConfig(config_path)", k=3)(container)
+    assert getattr(found,
+                   "loadConfig(config_path)")[0].component_id == "loader"
+    # an index built with another vectorizer is not used
+    assert VectorIndex.load(index_path,
+                            HashingVectorizer(dimensions=8)) is None
+
+
+def test_vector_search_on_stale_index(tmp_path):
+    container = ReContainer("stale_repo", str(tmp_path), str(tmp_path / "db"))
+    container.code_components = random_components(50)
+    VectorIndexer()(container)
+    index_path = get_vector_index_path(container.db_path, container.repo_name)
+    loaded = load_vector_index(index_path)
+    indexed_ids = list(loaded.ids)
+
+    removed = container.code_components[0]
+    container.code_components = container.code_components[1:] + [
+        make_component(
+            "loader",
+            "def load_config(path):\n    return json.load(open(path))")
+    ]
+    found = VectorSearch("loadConfig(config_path)", k=3)(container)
+    assert getattr(found,
+                   "loadConfig(config_path)")[0].component_id == "loader"
+    found = VectorSearch(removed.component_code, k=50)(container)
+    assert removed.component_id not in [
+        component.component_id
+        for component in getattr(found, removed.component_code)
+    ]
+    assert len(getattr(found, removed.component_code)) == 50
+    # the shared loaded index is left as it was saved
+    assert load_vector_index(index_path) is loaded
+    assert loaded.ids == indexed_ids